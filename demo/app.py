@@ -103,6 +103,41 @@ DEMO_SENDER = "+919876543210"
 API_BASE = "http://localhost:8000"
 
 
+def sse_events(resp):
+    """Parse a text/event-stream response into (event, data) pairs."""
+    event, data = "message", []
+    for line in resp.iter_lines(decode_unicode=True):
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+        elif line.startswith("data: "):
+            data.append(line[len("data: "):])
+        elif not line and data:
+            yield event, json.loads("\n".join(data))
+            event, data = "message", []
+
+
+STAGE_LABELS = {"queued": "⏳ Waiting in line...", "thinking": "💭 Thinking..."}
+
+
+def stream_reply(resp, status, final):
+    """Yield reply text from /chat/stream; status events update ``status``, the last event fills ``final``."""
+    streamed = False
+    for event, data in sse_events(resp):
+        if event == "status":
+            status.caption(STAGE_LABELS.get(data["stage"], data["stage"]))
+        elif event == "delta":
+            status.empty()
+            streamed = True
+            yield data["text"]
+        elif event == "done":
+            final.update(data)
+            if not streamed:
+                status.empty()
+                yield data["reply"]  # fastpath, closed or fallback: arrives in one piece
+        elif event == "error":
+            final["error"] = data["detail"]
+
+
 # ── API key dialog gate ────────────────────────────────────────────────────────
 @st.dialog("Welcome to Comverse 💬")
 def api_key_dialog():
@@ -220,44 +255,50 @@ with tab_chat:
         with chat_container:
             with st.chat_message("user"):
                 st.write(user_input)
-            # Show loader while waiting for the response
+            # Stream the reply in as it is generated
             with st.chat_message("assistant"):
-                with st.spinner("Thinking..."):
-                    headers = {"X-Lyzr-Api-Key": st.session_state.lyzr_api_key}
-                    if st.session_state.get("lyzr_agent_id"):
-                        headers["X-Lyzr-Agent-Id"] = st.session_state.lyzr_agent_id
-
-                    try:
-                        resp = requests.post(
-                            f"{API_BASE}/chat",
-                            json={
-                                "merchant_id": selected_id,
-                                "sender": DEMO_SENDER,
-                                "message": user_input,
-                            },
-                            headers=headers,
-                            timeout=120,
-                        )
+                headers = {"X-Lyzr-Api-Key": st.session_state.lyzr_api_key}
+                if st.session_state.get("lyzr_agent_id"):
+                    headers["X-Lyzr-Agent-Id"] = st.session_state.lyzr_agent_id
+
+                status = st.empty()
+                final = {}
+                try:
+                    with requests.post(
+                        f"{API_BASE}/chat/stream",
+                        json={
+                            "merchant_id": selected_id,
+                            "sender": DEMO_SENDER,
+                            "message": user_input,
+                        },
+                        headers=headers,
+                        stream=True,
+                        timeout=(5, 120),
+                    ) as resp:
                         resp.raise_for_status()
-                        data = resp.json()
-                        assistant_msg = {
-                            "role": "assistant",
-                            "content": data["reply"],
-                            "raw_response": data,
-                        }
-                    except requests.exceptions.ConnectionError:
-                        assistant_msg = {
-                            "role": "assistant",
-                            "content": (
-                                "⚠️ Cannot reach the Comverse service. "
-                                "Start it with `make dev` in `comverse/service/`."
-                            ),
-                        }
-                    except Exception as e:
+                        streamed = st.write_stream(stream_reply(resp, status, final))
+                    status.empty()
+                    if "error" in final:
+                        assistant_msg = {"role": "assistant", "content": f"⚠️ {final['error']}"}
+                    else:
                         assistant_msg = {
                             "role": "assistant",
-                            "content": f"⚠️ Error: {e}",
+                            "content": final.get("reply") or streamed,
+                            "raw_response": final,
                         }
+                except requests.exceptions.ConnectionError:
+                    assistant_msg = {
+                        "role": "assistant",
+                        "content": (
+                            "⚠️ Cannot reach the Comverse service. "
+                            "Start it with `make dev` in `comverse/service/`."
+                        ),
+                    }
+                except Exception as e:
+                    assistant_msg = {
+                        "role": "assistant",
+                        "content": f"⚠️ Error: {e}",
+                    }
 
         # Persist both messages and rerender cleanly
         st.session_state.messages.append({"role": "user", "content": user_input})
@@ -332,6 +373,15 @@ with tab_about:
             language="json",
         )
 
+        st.markdown("**`POST /chat/stream`**")
+        st.markdown("Same request; Server-Sent Events response:")
+        st.code(
+            'event: status\ndata: {"stage": "thinking"}\n\n'
+            'event: delta\ndata: {"text": "Namaste! "}\n\n'
+            'event: done\ndata: {"session_id": "string", "reply": "string", "source": "agent"}',
+            language=None,
+        )
+
 # ── Settings tab ──────────────────────────────────────────────────────────────
 with tab_settings:
     st.subheader("Lyzr Configuration")
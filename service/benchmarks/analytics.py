@@ -0,0 +1,85 @@
+"""Order rollup latency: NumPy columns vs looping over Order objects.
+
+    python -m benchmarks.analytics [--orders 1000000] [--merchants 1000]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from models.order import Order, OrderItem, OrderStatus, PaymentStatus
+from services.analytics import OrderAnalytics
+from services.orders import IST, order_id_for
+
+_ITEMS = [
+    OrderItem(catalog_item_id=f"item_{n:02d}", name=f"Item {n}", quantity=q, unit_price_inr=p, total_price_inr=q * p)
+    for n, (q, p) in enumerate([(1, 500), (2, 250), (3, 80), (1, 120), (4, 60), (2, 350)])
+]
+
+
+def make_orders(count: int, merchants: int) -> list[Order]:
+    rng = random.Random(7)
+    start = datetime(2026, 1, 1, tzinfo=IST)
+    orders = []
+    for n in range(count):
+        merchant_id = f"merchant_{rng.randrange(merchants):04d}"
+        when = start + timedelta(minutes=rng.randrange(60 * 24 * 60))
+        items = rng.sample(_ITEMS, rng.randint(1, 3))
+        orders.append(Order.model_construct(
+            id=order_id_for(merchant_id, when.date(), n), merchant_id=merchant_id, customer_phone="+919800000001",
+            session_id=f"{merchant_id}:+919800000001", items=items, subtotal_inr=sum(i.total_price_inr for i in items),
+            status=OrderStatus.cancelled if n % 20 == 0 else OrderStatus.delivered, payment_status=PaymentStatus.paid,
+            payment_link=None, delivery_address=None, notes=None, created_at=when, updated_at=when,
+        ))
+    return orders
+
+
+def timed(label: str, fn, repeat: int = 5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<42} {best * 1000:9.1f} ms")
+    return result
+
+
+def loop_by_day(orders: list[Order], merchant_id: str | None) -> dict:
+    totals: dict = {}
+    for order in orders:
+        if order.status == OrderStatus.cancelled or (merchant_id and order.merchant_id != merchant_id):
+            continue
+        day = order.created_at.astimezone(IST).date()
+        count, gmv = totals.get(day, (0, 0))
+        totals[day] = (count + 1, gmv + order.subtotal_inr)
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--merchants", type=int, default=1000)
+    args = parser.parse_args()
+
+    orders = make_orders(args.orders, args.merchants)
+    analytics = OrderAnalytics()
+    start = time.perf_counter()
+    analytics.extend(orders[:-10_000])
+    print(f"backfill of {args.orders - 10_000:,} orders: {time.perf_counter() - start:.2f}s")
+    start = time.perf_counter()
+    for order in orders[-10_000:]:
+        analytics.add(order)
+    print(f"incremental: {10_000 / (time.perf_counter() - start):,.0f} orders/s")
+
+    print(f"{args.orders:,} orders, {args.merchants} merchants, 60 days")
+    timed("loop over Order objects: all by day", lambda: loop_by_day(orders, None), repeat=1)
+    timed("columnar: all by day", lambda: analytics.rollup(("day",)))
+    timed("columnar: by merchant, day", lambda: analytics.rollup(("merchant", "day")), repeat=2)
+    timed("loop over Order objects: one merchant by day", lambda: loop_by_day(orders, "merchant_0001"), repeat=1)
+    timed("columnar: one merchant by day", lambda: analytics.rollup(("day",), "merchant_0001"))
+    timed("columnar: one merchant by hour", lambda: analytics.rollup(("hour",), "merchant_0001"))
+    timed("columnar: one merchant top items", lambda: analytics.top_items("merchant_0001"))
+    timed("columnar: all top items", lambda: analytics.top_items())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Baseline results to compare benchmark runs against, in benchmarks/baseline.json.
+
+Each benchmark owns one section of flat ``{metric: number}`` results.
+Only timings are compared: ``_per_s`` metrics are better higher, ``_ms``
+and ``_ns`` ones better lower. Saturation and error-rate figures are
+recorded for reference but too noisy at these run lengths to gate on.
+"""
+import argparse
+import json
+import platform
+from pathlib import Path
+
+BASELINE = Path(__file__).with_name("baseline.json")
+_COMPARED = ("_per_s", "_ms", "_ns")
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--baseline", type=Path, default=None, metavar="PATH",
+                        help=f"compare against this baseline file (e.g. {BASELINE.name}); exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown before a metric counts as a regression (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", type=Path, default=None, metavar="PATH",
+                        help="write these results into this baseline file")
+
+
+def load(path: Path) -> dict:
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def save(path: Path, section: str, results: dict[str, float]) -> None:
+    """Replace one section of the baseline, keeping the others."""
+    baseline = load(path)
+    rounded = {name: round(value, 3) for name, value in results.items()}
+    baseline[section] = {"recorded_on": f"{platform.machine()} / Python {platform.python_version()}", **rounded}
+    path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+
+
+def regressions(baseline: dict[str, float], results: dict[str, float], tolerance: float) -> list[str]:
+    """One line per metric worse than its baseline by more than ``tolerance``."""
+    worse = []
+    for name, value in results.items():
+        before = baseline.get(name)
+        if not name.endswith(_COMPARED):
+            continue
+        if not isinstance(before, (int, float)) or before <= 0:
+            continue
+        change = (value - before) / before
+        if name.endswith("_per_s"):
+            change = -change
+        if change > tolerance:
+            worse.append(f"{name}: {value:,.4g} vs baseline {before:,.4g} ({change:+.0%} worse)")
+    return worse
+
+
+def check(args: argparse.Namespace, section: str, results: dict[str, float]) -> int:
+    """Save and/or compare as the command line asked; the process exit code."""
+    if args.save_baseline:
+        save(args.save_baseline, section, results)
+        print(f"saved [{section}] to {args.save_baseline}")
+    if not args.baseline:
+        return 0
+    worse = regressions(load(args.baseline).get(section, {}), results, args.tolerance)
+    for line in worse:
+        print(f"REGRESSION [{section}] {line}")
+    if not worse:
+        print(f"[{section}] within {args.tolerance:.0%} of {args.baseline}")
+    return 1 if worse else 0
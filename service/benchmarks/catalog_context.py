@@ -0,0 +1,121 @@
+"""Prompt size and end-to-end latency of catalog context strategies.
+
+    python -m benchmarks.catalog_context [--items 400] [--ms-per-kb 20] [--live]
+
+Replays a scripted conversation against a large synthetic cafe three ways:
+
+  full      — full catalog summary on every turn (original behaviour)
+  session   — full summary once per session, diffs after (CatalogContextTracker)
+  relevant  — category headers + relevant items only (CatalogRetriever)
+
+By default the agent is a stub whose latency grows with prompt size
+(``--ms-per-kb``, a stand-in for LLM prefill). ``--live`` calls the Lyzr agent
+configured by LYZR_API_KEY / COMVERSE_AGENT_ID instead.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from types import SimpleNamespace
+from mocks.catalogs import large_cafe
+from services.coalescer import BurstCoalescer
+from services.concurrency import InflightLimiter
+from services.context import CatalogContextTracker
+from services.fastpath import FastPath
+from services.mailbox import SessionScheduler
+from services.pipeline import ChatPipeline
+from services.retrieval import CatalogRetriever
+
+CONVERSATION = [
+    "hi",
+    "cold coffee type kya hai?",
+    "cold brew large kitne ka?",
+    "2 cold brew large",
+    "aur koi brownie ya cheesecake?",
+    "1 blueberry cheesecake add karo",
+    "pizza bhi chahiye, paneer wala",
+    "address: 12 MG Road, Bengaluru",
+]
+
+
+class PrefillAgent:
+    """Stub agent: fixed overhead plus time proportional to prompt size."""
+
+    def __init__(self, ms_per_kb: float, base_ms: float = 5.0):
+        self.ms_per_kb = ms_per_kb
+        self.base_ms = base_ms
+        self.prompt_bytes: list[int] = []
+
+    async def arun(self, message, session_id):
+        size = len(message.encode())
+        self.prompt_bytes.append(size)
+        await asyncio.sleep((self.base_ms + self.ms_per_kb * size / 1024) / 1000)
+        return SimpleNamespace(response="ok")
+
+
+def _pipeline(context: CatalogContextTracker) -> ChatPipeline:
+    return ChatPipeline(
+        limiter=InflightLimiter(max_inflight=64, max_per_tenant=64),
+        scheduler=SessionScheduler(),
+        coalescer=BurstCoalescer(max_wait=1.0),
+        fastpath=FastPath(),
+        context=context,
+    )
+
+
+STRATEGIES = {
+    "full": lambda: CatalogContextTracker(refresh_turns=1),
+    "session": lambda: CatalogContextTracker(),
+    "relevant": lambda: CatalogContextTracker(retriever=CatalogRetriever()),
+}
+
+
+async def run(strategy: str, items: int, sessions: int, agent) -> dict:
+    merchant = large_cafe(items)
+    pipeline = _pipeline(STRATEGIES[strategy]())
+    latencies = []
+
+    async def converse(n: int):
+        for message in CONVERSATION:
+            start = time.perf_counter()
+            await pipeline.process(merchant, f"+9198{n:08d}", message, agent)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(converse(n) for n in range(sessions)))
+    context = pipeline.context.stats()
+    turns = context["full_sends"] + context["diff_sends"] + context["skipped"]
+    latencies.sort()
+    return {
+        "strategy": strategy,
+        "context_bytes_per_turn": context["bytes_sent"] / turns,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=400)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--ms-per-kb", type=float, default=20.0)
+    parser.add_argument("--live", action="store_true", help="call the configured Lyzr agent")
+    args = parser.parse_args()
+
+    if args.live:
+        from config import settings
+        from services.lyzr import init_lyzr
+
+        agent = init_lyzr(settings.lyzr_api_key, settings.comverse_agent_id)
+        args.sessions = min(args.sessions, 2)
+    else:
+        agent = PrefillAgent(args.ms_per_kb)
+
+    print(f"{args.items} items, {args.sessions} sessions x {len(CONVERSATION)} turns")
+    print(f"{'strategy':<10} {'ctx bytes/turn':>15} {'p50 ms':>9} {'p95 ms':>9}")
+    for strategy in STRATEGIES:
+        r = asyncio.run(run(strategy, args.items, args.sessions, agent))
+        print(f"{r['strategy']:<10} {r['context_bytes_per_turn']:>15.0f} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
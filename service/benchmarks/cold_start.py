@@ -0,0 +1,92 @@
+"""Process cold start: import time, and how soon /health, the fast path and /ready answer.
+
+    python -m benchmarks.cold_start [--runs 5] [--init-ms 2000] [--baseline benchmarks/baseline.json]
+
+Each run starts a fresh interpreter that imports the app, runs its startup
+with a default agent configured — init_lyzr replaced by a --init-ms sleep,
+standing in for the Lyzr round trip — and sends requests in process
+(ASGI, no sockets) until /ready answers 200. Times are from process
+spawn. Also reports ``import lyzr`` on its own, the cost the lazy SDK
+import keeps off startup.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from benchmarks import baseline
+
+
+async def _child(spawned: float, init_ms: float) -> dict[str, float]:
+    started = time.time()
+    import httpx
+    import services.lyzr as lyzr_service
+    from main import app
+    imported = time.time()
+
+    def slow_init(api_key, agent_id):
+        time.sleep(init_ms / 1000)
+        return object()
+
+    lyzr_service.init_lyzr = slow_init
+    since_spawn = lambda: (time.time() - spawned) * 1000
+    result = {
+        "interpreter_ms": (started - spawned) * 1000,
+        "import_main_ms": (imported - started) * 1000,
+        "lyzr_imported": "lyzr" in sys.modules,
+    }
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            assert (await client.get("/health")).status_code == 200
+            result["first_health_ms"] = since_spawn()
+            body = {"merchant_id": "merchant_001", "sender": "+919876543210", "message": "menu dikhao"}
+            assert (await client.post("/chat", json=body)).status_code == 200
+            result["first_fastpath_chat_ms"] = since_spawn()
+            while (await client.get("/ready")).status_code != 200:
+                await asyncio.sleep(0.005)
+            result["ready_ms"] = since_spawn()
+    return result
+
+
+def _spawn(args: list[str], env: dict[str, str]) -> dict:
+    env = {**os.environ, **env, "PYTHONDONTWRITEBYTECODE": "1"}
+    spawned = time.time()
+    out = subprocess.run([sys.executable, "-m", "benchmarks.cold_start", "--child", str(spawned), *args],
+                         capture_output=True, text=True, env=env, check=True)
+    return json.loads(out.stdout.splitlines()[-1])
+
+
+def _import_lyzr_ms() -> float:
+    code = "import time; t = time.perf_counter(); import lyzr; print((time.perf_counter() - t) * 1000)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return float(out.stdout)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--init-ms", type=float, default=2000.0, help="simulated Lyzr agent fetch")
+    parser.add_argument("--child", type=float, default=None, help=argparse.SUPPRESS)
+    baseline.add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        print(json.dumps(asyncio.run(_child(args.child, args.init_ms))))
+        return
+
+    env = {"LYZR_API_KEY": "bench-key", "COMVERSE_AGENT_ID": "bench-agent", "MERCHANT_STORE_WATCH_S": "0"}
+    runs = [_spawn(["--init-ms", str(args.init_ms)], env) for _ in range(args.runs)]
+    print(f"lyzr SDK imported at startup: {any(r.pop('lyzr_imported') for r in runs)}")
+    results = {name: statistics.median(r[name] for r in runs) for name in runs[0]}
+    results["import_lyzr_alone_ms"] = statistics.median(_import_lyzr_ms() for _ in range(args.runs))
+    for name, value in results.items():
+        print(f"{name:<28} {value:>10,.1f}  (median of {args.runs})")
+    sys.exit(baseline.check(args, "cold_start", results))
+
+
+if __name__ == "__main__":
+    main()
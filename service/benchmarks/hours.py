@@ -0,0 +1,87 @@
+"""Operating-hours checks: compiled minute tables vs parsing the hours per check.
+
+    python -m benchmarks.hours [--merchants 50000] [--checks 200000]
+"""
+import argparse
+import random
+import time
+from datetime import datetime
+from models.merchant import Merchant, OperatingHours
+from services.hours import DAYS, HoursGate, HoursIndex
+from services.orders import IST
+
+
+def make_hours(count: int) -> list[tuple[str, OperatingHours]]:
+    rng = random.Random(11)
+    entries = []
+    for n in range(count):
+        opens = rng.choice(["06:00", "07:30", "09:00", "10:00", "11:00", "17:00", "18:00"])
+        closes = rng.choice(["14:00", "15:00", "21:00", "22:30", "23:00", "01:00", "02:00"])
+        cutoff = rng.choice([None, None, "13:00", "18:00", "20:00"])
+        skipped = rng.choice(DAYS) if rng.random() < 0.4 else None
+        days = [d for d in DAYS if d != skipped]
+        entries.append((f"merchant_{n:05d}", OperatingHours(open_time=opens, close_time=closes,
+                                                            order_cutoff=cutoff, days=days)))
+    return entries
+
+
+def naive_is_open(hours: OperatingHours, when: datetime) -> bool:
+    """What a check looks like without compilation: parse and compare every time."""
+    local = when.astimezone(IST)
+    now = local.hour * 60 + local.minute
+    opens = int(hours.open_time[:2]) * 60 + int(hours.open_time[3:])
+    closes = int(hours.close_time[:2]) * 60 + int(hours.close_time[3:])
+    today, yesterday = DAYS[local.weekday()], DAYS[(local.weekday() - 1) % 7]
+    if opens < closes:
+        return today in hours.days and opens <= now < closes
+    return (today in hours.days and now >= opens) or (yesterday in hours.days and now < closes)
+
+
+def timed(label: str, fn, repeat: int = 5, per: int = 1):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    if per > 1:
+        print(f"  {label:<46} {best / per * 1e9:9.0f} ns")
+    else:
+        print(f"  {label:<46} {best * 1000:9.2f} ms")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--merchants", type=int, default=50_000)
+    parser.add_argument("--checks", type=int, default=200_000)
+    args = parser.parse_args()
+
+    entries = make_hours(args.merchants)
+    now = datetime(2026, 2, 16, 19, 30, tzinfo=IST)
+    index = HoursIndex()
+    start = time.perf_counter()
+    index.update(entries)
+    print(f"index of {args.merchants:,} merchants ({index.stats()['schedules']} distinct schedules) "
+          f"built in {time.perf_counter() - start:.2f}s")
+
+    print("who's open now")
+    timed("naive: parse each merchant's hours", lambda: [m for m, h in entries if naive_is_open(h, now)], repeat=2)
+    ids = timed("index: open now", lambda: index.open_at(now))
+    timed("index: still accepting orders", lambda: index.open_at(now, accepting_orders=True))
+    print(f"  {len(ids):,} of {len(index):,} open")
+
+    hours = OperatingHours(open_time="09:00", close_time="21:00", order_cutoff="18:00", days=list(DAYS[:6]))
+    merchant = Merchant.model_construct(id="m", name="Shop", emoji="🍰", catalog=[], operating_hours=hours)
+    open_now = datetime(2026, 2, 16, 12, 0, tzinfo=IST)
+    closed_now = datetime(2026, 2, 22, 12, 0, tzinfo=IST)
+    print("one message")
+    timed("naive check", lambda: [naive_is_open(hours, open_now) for _ in range(args.checks)], per=args.checks)
+    gate = HoursGate(clock=lambda: open_now)
+    timed("gate check while open", lambda: [gate.check(merchant) for _ in range(args.checks)], per=args.checks)
+    gate.clock = lambda: closed_now
+    timed("gate check while closed, with the reply", lambda: [gate.check(merchant) for _ in range(args.checks)],
+          per=args.checks)
+
+
+if __name__ == "__main__":
+    main()
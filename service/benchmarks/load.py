@@ -0,0 +1,266 @@
+"""Drive /chat and the WhatsApp webhook at a target rate against a stub agent.
+
+    python -m benchmarks.load [--target chat|webhook|both] [--rps 100] [--duration 5]
+        [--latency lognormal:200,0.5] [--error-rate 0.01] [--merchants 50] [--agent-handles 4]
+        [--threaded-agent]
+        [--baseline benchmarks/baseline.json] [--save-baseline PATH]
+
+The real app runs in process over ASGI (no sockets) with its default agent
+pool backed by StubAgent handles (benchmarks.stub_agent), so everything
+but the network and Lyzr is real: the in-flight limiter, session turns,
+agent handle pool, threadpool and webhook queue. Requests arrive
+open-loop at --rps, so a server that can't keep up builds a backlog
+rather than slowing the load down; the saturation figures show where.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import anyio.to_thread
+import httpx
+from benchmarks import baseline
+from benchmarks.stub_agent import LatencyModel, StubAgent, ThreadedStubAgent
+from config import settings
+from main import app
+from routes.chat import pipeline_for
+from routes.webhook import webhook_queue_for
+from services.lyzr import AgentHandlePool
+from services.merchant_store import get_merchant, get_store
+
+MESSAGES = [
+    "kal subah 10 baje tak delivery ho jayegi?",
+    "birthday ke liye custom design banate ho?",
+    "2 choco cake aur ek vanilla, Baner mein deliver karna hai",
+    "eggless option hai kya?",
+    "order cancel karna hai, galat address daala",
+]
+
+
+def webhook_payload(texts: list[str], sender: str = "919876543210", business: str = "911234567890",
+                    first_id: int = 0) -> dict:
+    """A WhatsApp Cloud API webhook batch with one text message per entry of ``texts``."""
+    return {
+        "object": "whatsapp_business_account",
+        "entry": [{
+            "id": "waba_bench",
+            "changes": [{
+                "field": "messages",
+                "value": {
+                    "messaging_product": "whatsapp",
+                    "metadata": {"display_phone_number": business, "phone_number_id": "pn_bench"},
+                    "messages": [
+                        {"from": sender, "id": f"wamid.bench{first_id + n}", "timestamp": "1700000000",
+                         "type": "text", "text": {"body": text}}
+                        for n, text in enumerate(texts)
+                    ],
+                },
+            }],
+        }],
+    }
+
+
+def _merchants(count: int) -> list[str]:
+    """IDs of ``count`` merchants: copies of merchant_001 under their own IDs and numbers."""
+    template = get_merchant("merchant_001")
+    ids = []
+    for n in range(count):
+        merchant_id = f"merchant_load_{n:04d}"
+        if get_merchant(merchant_id) is None:
+            get_store().put(template.revise(
+                id=merchant_id, phone=f"+9170{n:08d}", catalog_id=f"catalog_load_{n:04d}",
+            ))
+        ids.append(merchant_id)
+    return ids
+
+
+def _percentiles(values: list[float], prefix: str) -> dict[str, float]:
+    if not values:
+        return {}
+    values = sorted(values)
+    pick = lambda q: values[min(len(values) - 1, int(len(values) * q))] * 1000
+    return {f"{prefix}_p50_ms": pick(0.50), f"{prefix}_p95_ms": pick(0.95), f"{prefix}_p99_ms": pick(0.99)}
+
+
+class Saturation:
+    """Samples queue and pool occupancy every ``interval`` seconds; keeps max and mean."""
+
+    def __init__(self, executor: ThreadPoolExecutor, pool: AgentHandlePool, interval: float = 0.005):
+        self.executor = executor
+        self.pool = pool
+        self.interval = interval
+        self._samples: dict[str, list[int]] = {}
+
+    def _sample(self) -> dict[str, int]:
+        limiter = pipeline_for(app).limiter
+        threads = anyio.to_thread.current_default_thread_limiter()
+        queue = webhook_queue_for(app).stats()
+        return {
+            "chat_inflight": limiter.inflight,
+            "chat_waiting_for_slot": limiter.waiting,
+            "agent_handles_leased": self.pool.leased,
+            "threadpool_busy": threads.borrowed_tokens,  # FastAPI's pool for sync endpoints/dependencies
+            "agent_executor_backlog": self.executor._work_queue.qsize(),  # threaded agents waiting for a thread
+            "webhook_queue_depth": queue["depth"],
+            "webhook_workers_busy": queue["busy_workers"],
+        }
+
+    async def run(self, stop: asyncio.Event) -> None:
+        while not stop.is_set():
+            for name, value in self._sample().items():
+                self._samples.setdefault(name, []).append(value)
+            await asyncio.sleep(self.interval)
+
+    def report(self) -> dict[str, float]:
+        result = {}
+        for name, values in self._samples.items():
+            result[f"{name}_max"] = max(values)
+            result[f"{name}_mean"] = sum(values) / len(values)
+        return result
+
+
+async def _open_loop(rps: float, duration: float, send) -> float:
+    """Start ``send(n)`` at a steady ``rps`` for ``duration`` seconds; wait for all. Returns elapsed."""
+    tasks = []
+    start = time.perf_counter()
+    for n in range(int(rps * duration)):
+        delay = start + n / rps - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send(n)))
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - start
+
+
+async def drive_chat(client: httpx.AsyncClient, args, merchants: list[str], rng: random.Random) -> dict[str, float]:
+    latencies, overheads, statuses = [], [], {}
+
+    async def send(n: int) -> None:
+        body = {
+            "merchant_id": rng.choice(merchants),
+            "sender": f"+9198{rng.randrange(args.customers):08d}",
+            "message": rng.choice(MESSAGES),
+        }
+        start = time.perf_counter()
+        response = await client.post("/chat", json=body)
+        elapsed = time.perf_counter() - start
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        if response.status_code == 200:
+            latencies.append(elapsed)
+            timing = dict(part.strip().split(";dur=") for part in response.headers["server-timing"].split(","))
+            overheads.append(elapsed - float(timing["upstream"]) / 1000)  # all but the agent call
+
+    elapsed = await _open_loop(args.rps, args.duration, send)
+    print(f"/chat: {sum(statuses.values())} sent, status codes {dict(sorted(statuses.items()))}")
+    return {
+        "chat_throughput_per_s": len(latencies) / elapsed,
+        "chat_error_rate": 1 - len(latencies) / max(1, sum(statuses.values())),
+        **_percentiles(latencies, "chat"),
+        **_percentiles(overheads, "chat_overhead"),
+    }
+
+
+async def drive_webhook(client: httpx.AsyncClient, args, merchants: list[str], rng: random.Random) -> dict[str, float]:
+    """POST one-message batches; end to end is ack to the reply being ready."""
+    queue = webhook_queue_for(app)
+    handler, done = queue.handler, []
+
+    async def timed(message) -> None:
+        await handler(message)
+        done.append(time.monotonic() - message.received_at)
+
+    queue.handler = timed
+    phones = [get_merchant(m).phone.removeprefix("+") for m in merchants]
+    acks, statuses = [], {}
+    before = queue.stats()
+
+    async def send(n: int) -> None:
+        payload = webhook_payload([rng.choice(MESSAGES)], sender=f"9198{rng.randrange(args.customers):08d}",
+                                  business=rng.choice(phones), first_id=n)
+        start = time.perf_counter()
+        response = await client.post("/webhook", content=json.dumps(payload))
+        acks.append(time.perf_counter() - start)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await _open_loop(args.rps, args.duration, send)
+    await queue.join()
+    elapsed = time.perf_counter() - start
+    queue.handler = handler
+    failed = queue.stats()["failed"] - before["failed"]
+    print(f"/webhook: {len(acks)} sent, status codes {dict(sorted(statuses.items()))}, {failed} failed in the worker")
+    return {
+        "webhook_throughput_per_s": len(done) / elapsed,
+        "webhook_error_rate": 1 - len(done) / max(1, len(acks)),
+        **_percentiles(acks, "webhook_ack"),
+        **_percentiles(done, "webhook_e2e"),
+    }
+
+
+async def run(args) -> dict[str, float]:
+    settings.hours_gate_enabled = False  # results mustn't depend on the time of day
+    settings.whatsapp_app_secret = ""
+    settings.whatsapp_access_token = ""  # replies are only logged, never sent
+    logging.getLogger("services.work_queue").setLevel(logging.CRITICAL)  # injected agent errors are expected
+    rng = random.Random(args.seed)
+    latency = LatencyModel(args.latency, random.Random(args.seed))
+    agent_class = ThreadedStubAgent if args.threaded_agent else StubAgent
+    agents: list[StubAgent] = []
+
+    async def create():
+        agents.append(agent_class(latency, error_rate=args.error_rate, seed=args.seed + len(agents)))
+        return agents[-1]
+
+    executor = ThreadPoolExecutor(max_workers=args.agent_threads, thread_name_prefix="agent")
+    asyncio.get_running_loop().set_default_executor(executor)
+    merchants = _merchants(args.merchants)
+    results = {}
+    async with app.router.lifespan_context(app):
+        pool = app.state.agent_pool = AgentHandlePool(create, size=args.agent_handles)
+        saturation = Saturation(executor, pool)
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(saturation.run(stop))
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            if args.target in ("chat", "both"):
+                results.update(await drive_chat(client, args, merchants, rng))
+            if args.target in ("webhook", "both"):
+                results.update(await drive_webhook(client, args, merchants, rng))
+        stop.set()
+        await sampler
+        results.update(saturation.report())
+        results["agent_handles_size"] = pool.size
+    executor.shutdown()
+    print(f"stub agent: {sum(a.calls for a in agents)} calls, {sum(a.errors for a in agents)} errors "
+          f"across {len(agents)} handles")
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", choices=("chat", "webhook", "both"), default="both")
+    parser.add_argument("--rps", type=float, default=100.0, help="requests started per second")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds of load per target")
+    parser.add_argument("--latency", default="lognormal:200,0.5", help="stub agent latency spec (ms), see stub_agent")
+    parser.add_argument("--error-rate", type=float, default=0.01, help="fraction of agent calls that fail")
+    parser.add_argument("--merchants", type=int, default=50)
+    parser.add_argument("--customers", type=int, default=5000)
+    parser.add_argument("--agent-handles", type=int, default=settings.agent_handles_per_key,
+                        help="default agent pool size (AGENT_HANDLES_PER_KEY); caps concurrent agent calls")
+    parser.add_argument("--threaded-agent", action="store_true", help="stub has no arun; calls hold a worker thread")
+    parser.add_argument("--agent-threads", type=int, default=32, help="worker threads for --threaded-agent")
+    parser.add_argument("--seed", type=int, default=7)
+    baseline.add_arguments(parser)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    for name, value in results.items():
+        print(f"{name:<36} {value:>12,.2f}")
+    sys.exit(baseline.check(args, "load", results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Cost of /chat instrumentation: recording one request's stages, and a /metrics scrape.
+
+    python -m benchmarks.metrics [--requests 200000] [--merchants 1000]
+"""
+import argparse
+import random
+import time
+from services.metrics import ChatMetrics
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--merchants", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    merchants = [f"merchant_{rng.randrange(args.merchants):04d}" for _ in range(args.requests)]
+    stages = [(rng.random() * 1e-4, rng.random() * 0.01, rng.random() * 1e-3, rng.random() * 0.05, rng.random() * 3)
+              for _ in range(1000)]
+    resolve = (2e-6, "cached")
+
+    for trace_every in (0, 100):
+        metrics = ChatMetrics(max_merchants=args.merchants, trace_every=trace_every)
+        start = time.perf_counter()
+        for n, merchant_id in enumerate(merchants):
+            metrics.record(merchant_id, "agent", 3.2, resolve, stages[n % 1000], merchant_id)
+        per = (time.perf_counter() - start) / args.requests
+        label = f"1 in {trace_every} traced" if trace_every else "no tracing"
+        print(f"record, {label}: {per * 1e9:,.0f} ns per request")
+
+    timer = time.perf_counter
+    start = timer()
+    for _ in range(args.requests):
+        timer()
+    print(f"perf_counter: {(timer() - start) / args.requests * 1e9:,.0f} ns per call (9 per /chat request)")
+
+    start = time.perf_counter()
+    text = metrics.render()
+    print(f"scrape: {metrics.stats()['series']:,} series, {len(text) / 2**20:.1f} MiB "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
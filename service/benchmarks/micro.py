@@ -0,0 +1,60 @@
+"""Micro-benchmarks of per-request hot spots: catalog_summary, get_merchant, model validation.
+
+    python -m benchmarks.micro [--baseline benchmarks/baseline.json] [--save-baseline PATH]
+
+Each figure is the best of five ``timeit`` runs, in ns per call.
+"""
+import argparse
+import json
+import sys
+import timeit
+from benchmarks import baseline
+from benchmarks.load import webhook_payload
+from mocks.catalogs import large_cafe
+from models.chat import ChatRequest
+from models.merchant import Merchant
+from models.whatsapp import WebhookPayload
+from services.merchant_store import get_merchant
+
+
+def _ns_per_call(fn) -> float:
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=5, number=number)) / number * 1e9
+
+
+def run() -> dict[str, float]:
+    cafe = large_cafe(400)
+    merchant = get_merchant("merchant_001")
+    chat_body = json.dumps({"merchant_id": "merchant_001", "sender": "+919876543210", "message": "2 choco cake kal tak"})
+    webhook_body = json.dumps(webhook_payload([f"message {n}" for n in range(10)]))
+    cafe_dict = cafe.model_dump()
+
+    def summary_rebuild():
+        cafe.bump_catalog_version()
+        return cafe.catalog_summary
+
+    return {
+        "catalog_summary_hit_ns": _ns_per_call(lambda: merchant.catalog_summary),
+        "catalog_summary_rebuild_400_items_ns": _ns_per_call(summary_rebuild),
+        "get_merchant_hit_ns": _ns_per_call(lambda: get_merchant("merchant_001")),
+        "get_merchant_miss_ns": _ns_per_call(lambda: get_merchant("merchant_404")),
+        "chat_request_validate_ns": _ns_per_call(lambda: ChatRequest.model_validate_json(chat_body)),
+        "webhook_payload_validate_10_msgs_ns": _ns_per_call(lambda: WebhookPayload.model_validate_json(webhook_body)),
+        "merchant_validate_400_items_ns": _ns_per_call(lambda: Merchant.model_validate(cafe_dict)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    baseline.add_arguments(parser)
+    args = parser.parse_args()
+
+    results = run()
+    for name, value in results.items():
+        print(f"{name:<40} {value:>14,.0f}")
+    sys.exit(baseline.check(args, "micro", results))
+
+
+if __name__ == "__main__":
+    main()
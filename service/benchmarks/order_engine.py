@@ -0,0 +1,64 @@
+"""Order engine mutation throughput and read latency under write load.
+
+    python -m benchmarks.order_engine [--orders 20000] [--merchants 50] [--readers 2]
+"""
+import argparse
+import statistics
+import threading
+import time
+from models.order import OrderItem, OrderStatus
+from services.orders import OrderEngine
+
+_FLOW = (OrderStatus.confirmed, OrderStatus.preparing, OrderStatus.out_for_delivery, OrderStatus.delivered)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=20_000)
+    parser.add_argument("--merchants", type=int, default=50)
+    parser.add_argument("--readers", type=int, default=2)
+    args = parser.parse_args()
+
+    engine = OrderEngine()
+    items = [OrderItem(catalog_item_id="cake_choc_001", name="Chocolate Cake",
+                       quantity=2, unit_price_inr=500, total_price_inr=1000)]
+    stop = threading.Event()
+    read_latencies: list[float] = []
+
+    def reader(n: int) -> None:
+        merchant_id = f"merchant_{n:03d}"
+        while not stop.is_set():
+            start = time.perf_counter()
+            engine.with_status(merchant_id, OrderStatus.pending)
+            engine.open_counts(merchant_id)
+            engine.for_merchant(merchant_id)[:50]
+            read_latencies.append(time.perf_counter() - start)
+
+    readers = [threading.Thread(target=reader, args=(n,)) for n in range(args.readers)]
+    for t in readers:
+        t.start()
+
+    start = time.perf_counter()
+    pending = []
+    for n in range(args.orders):
+        order, _ = engine.create(f"merchant_{n % args.merchants:03d}", f"+9198{n % 5000:08d}", items, f"m{n}")
+        pending.append(order.id)
+        if len(pending) > 200:  # keep a realistic live queue while older orders complete
+            order_id = pending.pop(0)
+            for status in _FLOW:
+                engine.transition(order_id, status)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for t in readers:
+        t.join()
+
+    read_latencies.sort()
+    print(f"{engine.mutations} mutations in {elapsed:.2f}s — {engine.mutations / elapsed:,.0f}/s "
+          f"with {args.readers} concurrent readers")
+    if read_latencies:
+        print(f"dashboard read p50 {statistics.median(read_latencies) * 1000:.3f} ms, "
+              f"p99 {read_latencies[int(len(read_latencies) * 0.99) - 1] * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Build time, memory and query latency of ItemSearchIndex.
+
+    python -m benchmarks.search_index [--items 10000] [--queries 2000]
+"""
+import argparse
+import random
+import statistics
+import time
+import tracemalloc
+from mocks.catalogs import large_cafe
+from services.search import ItemSearchIndex
+
+QUERIES = [
+    "choco shake", "cold brew large", "paneer tikka sandwhich", "vegan mocha", "jain pizza",
+    "extra cheese farmhouse", "masala chai", "oreo shek", "peri peri fries", "tiramisu",
+    "blueberry cheescake large", "garlic bred", "special latte regular", "penne arabiata",
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+    merchant = large_cafe(args.items)
+
+    start = time.perf_counter()
+    index = ItemSearchIndex()
+    index.sync(merchant)
+    build_s = time.perf_counter() - start
+
+    tracemalloc.start()  # separate run — tracing slows the build several-fold
+    traced = ItemSearchIndex()
+    traced.sync(merchant)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    cold = []
+    for query in QUERIES:  # first sight of each query term — trigram expansion not yet memoized
+        start = time.perf_counter()
+        index.search(query, limit=5)
+        cold.append(time.perf_counter() - start)
+
+    rng = random.Random(7)
+    latencies = []
+    for _ in range(args.queries):
+        query = rng.choice(QUERIES)
+        start = time.perf_counter()
+        index.search(query, limit=5)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    for item in rng.sample(merchant.catalog, 10):
+        item.is_available = not item.is_available
+    start = time.perf_counter()
+    changed = index.sync(merchant)
+    resync_s = time.perf_counter() - start
+
+    stats = index.stats()
+    print(f"{stats['items']} items, {stats['tokens']} distinct tokens")
+    print(f"build        {build_s * 1000:8.1f} ms")
+    print(f"memory       {memory / 1024 / 1024:8.1f} MiB")
+    print(f"cold query   {statistics.median(cold) * 1000:8.3f} ms (median)")
+    print(f"query p50    {statistics.median(latencies) * 1000:8.3f} ms")
+    print(f"query p99    {latencies[int(len(latencies) * 0.99) - 1] * 1000:8.3f} ms")
+    print(f"resync ({changed} changed) {resync_s * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Stand-in for the Lyzr agent with a configurable latency distribution and error rate.
+
+Latency specs, all in milliseconds:
+
+  fixed:800            — always 800
+  uniform:200-1500     — evenly spread between the two
+  lognormal:800,0.6    — median 800, sigma 0.6 (a long right tail, like real LLM calls)
+"""
+import asyncio
+import math
+import random
+import time
+from types import SimpleNamespace
+
+
+class StubAgentError(RuntimeError):
+    pass
+
+
+class LatencyModel:
+    """Draws agent call durations, in seconds, from one of the specs above."""
+
+    def __init__(self, spec: str, rng: random.Random | None = None):
+        self.spec = spec
+        self.rng = rng or random.Random()
+        kind, _, args = spec.partition(":")
+        try:
+            if kind == "fixed":
+                value = float(args) / 1000
+                self._draw = lambda: value
+            elif kind == "uniform":
+                low, high = (float(a) / 1000 for a in args.split("-"))
+                self._draw = lambda: self.rng.uniform(low, high)
+            elif kind == "lognormal":
+                median, sigma = args.split(",")
+                mu = math.log(float(median) / 1000)
+                self._draw = lambda: self.rng.lognormvariate(mu, float(sigma))
+            else:
+                raise ValueError(kind)
+        except ValueError:
+            raise ValueError(f"Bad latency spec {spec!r}; expected fixed:MS, uniform:LOW-HIGH or lognormal:MEDIAN,SIGMA")
+
+    def draw(self) -> float:
+        return self._draw()
+
+
+class StubAgent:
+    """Answers every message after a drawn delay; fails ``error_rate`` of calls.
+
+    Has a native ``arun``, like the Lyzr SDK, so calls hold no thread.
+    """
+
+    def __init__(self, latency: str | LatencyModel = "fixed:0", error_rate: float = 0.0, seed: int | None = None,
+                 reply: str = "Ji, ho jayega! Aapka order note kar liya hai."):
+        rng = random.Random(seed)
+        self.latency = latency if isinstance(latency, LatencyModel) else LatencyModel(latency, rng)
+        self.error_rate = error_rate
+        self.rng = rng
+        self.reply = reply
+        self.calls = 0
+        self.errors = 0
+
+    def _next(self) -> tuple[float, bool]:
+        self.calls += 1
+        failed = self.rng.random() < self.error_rate
+        self.errors += failed
+        return self.latency.draw(), failed
+
+    def _response(self, failed: bool) -> SimpleNamespace:
+        if failed:
+            raise StubAgentError("stub agent error")
+        return SimpleNamespace(response=self.reply)
+
+    async def arun(self, message, session_id, stream=False):
+        delay, failed = self._next()
+        await asyncio.sleep(delay)
+        return self._response(failed)
+
+    def run(self, message, session_id):
+        delay, failed = self._next()
+        time.sleep(delay)
+        return self._response(failed)
+
+
+class ThreadedStubAgent(StubAgent):
+    """A StubAgent without ``arun``: calls block a worker thread, like an SDK with only ``run``."""
+
+    arun = None
@@ -7,5 +7,69 @@ class Settings(BaseSettings):
     lyzr_api_key: str = ""  # optional — can be provided per-request via X-Lyzr-Api-Key header
     comverse_agent_id: str = ""  # empty = create agent on first use
 
+    # /chat concurrency — agent calls in flight across all merchants / per merchant
+    max_inflight_chats: int = 64
+    max_inflight_per_merchant: int = 16
+    chat_queue_timeout_s: float = 10.0  # max wait for a free slot before 503
+    stream_heartbeat_s: float = 2.0  # /chat/stream status event interval while nothing else is sent
+    coalesce_max_wait_ms: int = 5000  # cap on how long a burst keeps extending (per-merchant window)
+    context_refresh_turns: int = 20  # re-send the full catalog summary every N agent turns; 1 = every turn
+    context_max_sessions: int = 100_000  # sessions whose last-seen catalog is remembered (LRU)
+    context_large_catalog_items: int = 40  # above this many available items, send only relevant ones
+    context_top_k: int = 12  # relevant items considered per turn for large catalogs
+    context_budget_bytes: int = 1500  # cap on catalog context per turn for large catalogs (~4 bytes/token)
+    cart_ttl_s: float = 1800.0  # idle carts are dropped after this long
+    cart_max_sessions: int = 100_000  # carts kept at once; the longest idle go first
+    hours_gate_enabled: bool = True  # reply "closed, back at …" outside operating hours without calling the agent
+    agent_timeout_s: float = 30.0  # deadline per agent call; past it the customer gets a fallback reply
+    agent_hedge_after_s: float = 0.0  # send a second agent call when the first is this slow; 0 = off
+    breaker_window: int = 20  # recent agent calls per merchant the circuit breaker judges
+    breaker_min_calls: int = 10  # calls in the window before it may trip
+    breaker_error_rate: float = 0.5  # trip at this share of failed calls…
+    breaker_slow_call_s: float = 10.0  # …or of calls slower than this
+    breaker_slow_rate: float = 0.5
+    breaker_open_s: float = 30.0  # fallback replies only, then a few trial calls
+    breaker_probes: int = 2  # trial calls that must succeed to close the breaker again
+    metrics_enabled: bool = True  # per-stage /chat histograms, served at /metrics
+    metrics_max_merchants: int = 1000  # merchants with their own series; later ones share merchant="_other"
+    trace_sample_every: int = 0  # keep a stage trace of every Nth /chat request (GET /debug/traces); 0 = off
+
+    # Agents fetched via X-Lyzr-* headers — LRU bound and lifetime
+    agent_cache_size: int = 256
+    agent_cache_ttl_s: float = 3600.0  # from fetch, not last use: busy agents are re-fetched too, picking up edits
+    agent_handles_per_key: int = 4  # pooled agent handles per api_key:agent_id
+
+    # Outbound HTTP (Lyzr validation, WhatsApp replies) — one pooled client per process
+    http_max_connections: int = 100
+    http_max_keepalive: int = 20
+    validate_cache_ttl_s: float = 60.0  # /validate results reused for this long
+
+    # Merchant store — .db/.sqlite or .ndjson file; empty = bundled mock merchants
+    merchant_store_path: str = ""
+    merchant_store_max_resident: int = 10_000  # merchants kept parsed in memory (LRU)
+    merchant_store_watch_s: float = 0.0  # poll the store file for outside edits this often; 0 = off
+
+    # Orders — snapshot + write-ahead log directory; empty = in memory only
+    order_log_dir: str = ""
+    order_snapshot_every: int = 10_000  # logged events between background snapshots
+    order_commit_interval_ms: float = 2.0  # group-commit window: appends in it share one fsync
+    order_durable_timeout_s: float = 5.0  # order writes fail with 503 if not fsynced by then
+
+    # WhatsApp Cloud API webhook
+    whatsapp_verify_token: str = ""  # GET /webhook handshake token
+    whatsapp_app_secret: str = ""  # signs POST /webhook bodies; empty = skip signature check (dev only)
+    webhook_workers: int = 32
+    webhook_queue_size: int = 1000
+
+    # WhatsApp Cloud API replies — empty access token = log replies instead of sending
+    whatsapp_access_token: str = ""
+    whatsapp_api_base: str = "https://graph.facebook.com/v23.0"  # point at a local stub for tests
+    whatsapp_messages_per_second: float = 80.0  # Meta's default per-number throughput
+    whatsapp_mps_overrides: dict[str, float] = {}  # phone_number_id -> upgraded tier limit
+    whatsapp_send_workers: int = 16
+    whatsapp_outbox_size: int = 5000
+    whatsapp_max_retries: int = 4
+    whatsapp_retry_after_max_s: float = 60.0  # cap on a 429's Retry-After before retrying
+
 
 settings = Settings()
@@ -1,70 +1,201 @@
+import asyncio
+import hashlib
 from contextlib import asynccontextmanager
 from typing import Optional
 import httpx
-from fastapi import FastAPI, Header, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from config import settings
-from routes.chat import router
-from services.lyzr import init_lyzr
+from models.merchant import summary_stats
+from routes.analytics import analytics_for, router as analytics_router
+from routes.cart import router as cart_router
+from routes.catalog import router as catalog_router
+from routes.chat import chat_metrics_for, pipeline_for, router
+from routes.hours import router as hours_router
+from routes.orders import order_engine_for, router as orders_router
+from routes.webhook import router as webhook_router, webhook_queue_for
+from services.cache import SingleFlightCache
+from services.http import http_client_for
+from services.lyzr import agent_pool, prewarm
+from services.merchant_store import get_store
 
 LYZR_AGENT_API = "https://agent-prod.studio.lyzr.ai"
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Per-request agent cache keyed by api_key
-    app.state.agents_cache = {}
+    # Per-request agent cache keyed by api_key:agent_id — bounded LRU with TTL
+    app.state.agents_cache = SingleFlightCache(
+        max_size=settings.agent_cache_size,
+        ttl=settings.agent_cache_ttl_s,
+    )
 
-    # Pre-warm the default agent — both key and agent ID are required
+    # Pre-warm the default agent in the background — both key and agent ID are
+    # required. Traffic is served meanwhile; agent turns wait for the first handle.
     if settings.lyzr_api_key and settings.comverse_agent_id:
-        app.state.agent = init_lyzr(
+        app.state.agent_pool = agent_pool(
             api_key=settings.lyzr_api_key,
             agent_id=settings.comverse_agent_id,
+            size=settings.agent_handles_per_key,
         )
+        app.state.agent_warmup = asyncio.create_task(prewarm(app.state.agent_pool))
     elif settings.lyzr_api_key or settings.comverse_agent_id:
         raise RuntimeError(
             "Both LYZR_API_KEY and COMVERSE_AGENT_ID must be set together in .env"
         )
 
+    # Restore orders (and open the order log) and backfill analytics before the
+    # first request can race to them
+    order_engine_for(app)
+    analytics_for(app)
+
+    # Pick up catalog edits made directly in the merchant store file
+    if settings.merchant_store_watch_s > 0:
+        get_store().watch(settings.merchant_store_watch_s)
+
     yield
 
+    if hasattr(app.state, "agent_warmup"):
+        app.state.agent_warmup.cancel()
+    # Drain the webhook workers and outbound replies while merchants can still be read
+    if hasattr(app.state, "webhook_queue"):
+        await app.state.webhook_queue.stop()
+    if hasattr(app.state, "whatsapp_sender"):
+        await app.state.whatsapp_sender.stop()
+    get_store().close()
+    if hasattr(app.state, "order_store"):
+        app.state.order_store.close()
+    if hasattr(app.state, "http"):
+        await app.state.http.aclose()
+
 
 app = FastAPI(title="Comverse Service", lifespan=lifespan)
 app.include_router(router)
+app.include_router(webhook_router)
+app.include_router(orders_router)
+app.include_router(analytics_router)
+app.include_router(cart_router)
+app.include_router(hours_router)
+app.include_router(catalog_router)
 
 
 @app.get("/health")
-def health():
+async def health():
+    """Liveness: the process is up and serving."""
     return {"status": "ok"}
 
 
+@app.get("/ready")
+async def ready(req: Request):
+    """Readiness: 503 until the default agent, if configured, has been fetched."""
+    pool = getattr(req.app.state, "agent_pool", None)
+    if pool is not None and not pool.ready:
+        return JSONResponse(status_code=503, content={"status": "warming"})
+    return {"status": "ready"}
+
+
+@app.get("/stats")
+async def stats(req: Request):
+    """Cache and concurrency counters for dashboards and load tests.
+
+    Async, like /metrics: the pipeline's counters and mailboxes belong to the
+    event loop and must not be walked from a worker thread.
+    """
+    state = req.app.state
+    result = {
+        "agent_cache": state.agents_cache.stats(),
+        "chat_pipeline": pipeline_for(req.app).stats(),
+        "catalog_summary": dict(summary_stats),
+        "merchant_store": get_store().stats(),
+        "webhook_queue": webhook_queue_for(req.app).stats(),
+        "validation_cache": validation_cache_for(req.app).stats(),
+        "orders": order_engine_for(req.app).stats(),
+    }
+    if hasattr(state, "agent_pool"):
+        result["default_agent_pool"] = state.agent_pool.stats()
+    if hasattr(state, "whatsapp_sender"):
+        result["whatsapp_sender"] = state.whatsapp_sender.stats()
+    if hasattr(state, "order_analytics"):
+        result["order_analytics"] = state.order_analytics.stats()
+    if hasattr(state, "order_store"):
+        result["order_log"] = state.order_store.stats()
+    if chat_metrics_for(req.app) is not None:
+        result["chat_metrics"] = state.chat_metrics.stats()
+    return result
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics(req: Request):
+    """Per-stage /chat latency histograms in Prometheus text format.
+
+    Async so rendering runs on the event loop, the thread that records.
+    """
+    chat_metrics = chat_metrics_for(req.app)
+    return PlainTextResponse(
+        chat_metrics.render() if chat_metrics is not None else "",
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@app.get("/debug/traces")
+async def traces(req: Request):
+    """Sampled /chat stage traces, newest last (TRACE_SAMPLE_EVERY)."""
+    chat_metrics = chat_metrics_for(req.app)
+    return list(chat_metrics.traces) if chat_metrics is not None else []
+
+
+def validation_cache_for(app: FastAPI) -> SingleFlightCache:
+    """Recent /validate outcomes keyed by (key hash, agent id)."""
+    state = app.state
+    if not hasattr(state, "validation_cache"):
+        state.validation_cache = SingleFlightCache(max_size=1024, ttl=settings.validate_cache_ttl_s)
+    return state.validation_cache
+
+
+# Lyzr answers that won't change within the cache TTL; anything else is re-checked
+_CACHEABLE_VALIDATION_STATUSES = frozenset({200, 401, 404})
+
+
 @app.get("/validate")
-def validate_key(
+async def validate_key(
+    req: Request,
     x_lyzr_api_key: Optional[str] = Header(default=None),
     x_lyzr_agent_id: Optional[str] = Header(default=None),
 ):
-    """Validate credentials with a direct HTTP call — bypasses SDK retries for fast response."""
+    """Validate credentials with a direct HTTP call — bypasses SDK retries for fast response.
+
+    Results are cached briefly, and concurrent checks of the same credentials share one call.
+    """
     if not x_lyzr_api_key:
         raise HTTPException(status_code=400, detail="X-Lyzr-Api-Key header required")
     if not x_lyzr_agent_id:
         raise HTTPException(status_code=400, detail="X-Lyzr-Agent-Id header required")
-    try:
-        resp = httpx.get(
+
+    client = http_client_for(req.app)
+
+    async def check() -> int:
+        resp = await client.get(
             f"{LYZR_AGENT_API}/v3/agents/{x_lyzr_agent_id}",
             headers={"x-api-key": x_lyzr_api_key},
             timeout=5,
         )
-        if resp.status_code == 401:
-            raise HTTPException(status_code=401, detail="Invalid API key.")
-        if resp.status_code == 404:
-            raise HTTPException(status_code=404, detail="Agent not found. Check the Agent ID.")
-        if resp.status_code >= 400:
-            raise HTTPException(status_code=resp.status_code, detail="Lyzr API error.")
-        return {"valid": True}
+        return resp.status_code
+
+    cache = validation_cache_for(req.app)
+    cache_key = (hashlib.sha256(x_lyzr_api_key.encode()).hexdigest(), x_lyzr_agent_id)
+    try:
+        status_code = await cache.get_or_load(cache_key, check)
     except httpx.TimeoutException:
         raise HTTPException(status_code=504, detail="Lyzr API did not respond in time.")
-    except HTTPException:
-        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-
+    if status_code not in _CACHEABLE_VALIDATION_STATUSES:
+        cache.pop(cache_key)
+    if status_code == 401:
+        raise HTTPException(status_code=401, detail="Invalid API key.")
+    if status_code == 404:
+        raise HTTPException(status_code=404, detail="Agent not found. Check the Agent ID.")
+    if status_code >= 400:
+        raise HTTPException(status_code=status_code, detail="Lyzr API error.")
+    return {"valid": True}
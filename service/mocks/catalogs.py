@@ -0,0 +1,58 @@
+from itertools import product
+from models.merchant import CatalogItem, Merchant, OperatingHours
+
+# Building blocks for a synthetic cafe menu — deterministic, so benchmarks are repeatable
+_MENU = {
+    "coffee": (["Cappuccino", "Latte", "Americano", "Mocha", "Cold Brew"], 120),
+    "tea": (["Masala Chai", "Ginger Tea", "Green Tea", "Iced Tea", "Lemon Tea"], 60),
+    "shake": (["Chocolate Shake", "Oreo Shake", "Mango Shake", "Strawberry Shake"], 150),
+    "sandwich": (["Paneer Tikka Sandwich", "Veg Club Sandwich", "Chicken Sandwich", "Corn Cheese Sandwich"], 140),
+    "pizza": (["Margherita Pizza", "Farmhouse Pizza", "Paneer Pizza", "Chicken Tikka Pizza"], 250),
+    "pasta": (["Penne Arrabbiata", "Alfredo Pasta", "Pesto Pasta", "Mac and Cheese"], 220),
+    "dessert": (["Chocolate Brownie", "Blueberry Cheesecake", "Tiramisu", "Gulab Jamun"], 130),
+    "snack": (["French Fries", "Peri Peri Fries", "Garlic Bread", "Nachos", "Samosa"], 90),
+}
+_SIZES = ["Regular", "Large"]
+_STYLES = ["Classic", "Special", "Jain", "Vegan", "Extra Cheese", "Spicy", "Tandoori", "Butter"]
+_FLAVOURS = [
+    "", "Hazelnut", "Caramel", "Kesar", "Elaichi", "Mint", "Honey", "Smoked", "Peri Peri",
+    "Schezwan", "Makhani", "Achari", "Lemon", "Rose", "Coconut", "Almond", "Kulhad", "Desi",
+    "Italian", "Mexican",
+]
+
+
+def large_cafe(n_items: int = 400, merchant_id: str = "merchant_bench") -> Merchant:
+    """A cafe with up to ``n_items`` menu items (11,520 max) across eight categories."""
+    catalog = []
+    for flavour, style, size in product(_FLAVOURS, _STYLES, _SIZES):
+        for category, (names, base_price) in _MENU.items():
+            for pos, name in enumerate(names):
+                if len(catalog) == n_items:
+                    break
+                item_id = f"{category}_{len(catalog):05d}"
+                title = " ".join(w for w in (style, flavour, name) if w)
+                catalog.append(CatalogItem(
+                    id=item_id,
+                    retailer_id=item_id,
+                    name=f"{title} ({size})",
+                    description=f"{title.lower()}, {size.lower()} portion",
+                    price_inr=base_price + 10 * pos + (40 if size == "Large" else 0) + (20 if flavour else 0),
+                    image_url=None,
+                    category=category,
+                    is_available=True,
+                ))
+    return Merchant(
+        id=merchant_id,
+        catalog_id=f"cat_{merchant_id}",
+        name="Brew & Bite Cafe",
+        emoji="☕",
+        phone="+919800000400",
+        delivery_area="Bengaluru",
+        min_order_inr=200,
+        commission_pct=10.0,
+        operating_hours=OperatingHours(
+            open_time="08:00", close_time="23:00", order_cutoff=None,
+            days=["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"],
+        ),
+        catalog=catalog,
+    )
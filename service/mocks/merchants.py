@@ -10,6 +10,7 @@ _merchants_list: list[Merchant] = [
         delivery_area="Pune",
         min_order_inr=300,
         commission_pct=10.0,
+        fastpath_enabled=True,
         operating_hours=OperatingHours(
             open_time="09:00",
             close_time="21:00",
@@ -58,6 +59,7 @@ _merchants_list: list[Merchant] = [
         delivery_area="Local delivery",
         min_order_inr=240,
         commission_pct=10.0,
+        fastpath_enabled=True,
         operating_hours=OperatingHours(
             open_time="11:00",
             close_time="15:00",
@@ -1,15 +1,18 @@
 from .chat import ChatRequest, ChatResponse
 from .merchant import CatalogItem, Merchant, OperatingHours
 from .order import Order, OrderItem, OrderStatus, PaymentStatus
+from .whatsapp import InboundMessage, WebhookPayload
 
 __all__ = [
     "ChatRequest",
     "ChatResponse",
     "CatalogItem",
+    "InboundMessage",
     "Merchant",
     "OperatingHours",
     "Order",
     "OrderItem",
     "OrderStatus",
     "PaymentStatus",
+    "WebhookPayload",
 ]
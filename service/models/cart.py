@@ -0,0 +1,37 @@
+from pydantic import BaseModel
+
+
+class CartLine(BaseModel):
+    item_id: str            # FK → CatalogItem.id
+    name: str
+    quantity: int
+    unit_price_inr: int     # current catalog price
+    total_price_inr: int    # = quantity * unit_price_inr
+    available: bool = True  # False = went out of stock after it was added; blocks checkout
+
+
+class CartView(BaseModel):
+    session_id: str
+    merchant_id: str
+    lines: list[CartLine]
+    subtotal_inr: int               # available lines only
+    min_order_inr: int
+    shortfall_inr: int              # how much more is needed to reach min_order_inr
+    issues: list[str] = []          # "Walnut Brownie is no longer available", ...
+    can_checkout: bool
+
+
+class CartItemRequest(BaseModel):
+    item_id: str | None = None      # exact catalog item ID, or
+    item: str | None = None         # an item name as the customer wrote it ("choco cake")
+    quantity: int = 1
+
+
+class CartQuantityRequest(BaseModel):
+    quantity: int                   # 0 removes the line
+
+
+class CheckoutRequest(BaseModel):
+    message_key: str                # customer message that confirmed the order (idempotency)
+    delivery_address: str | None = None
+    notes: str | None = None
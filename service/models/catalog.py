@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field
+from models.merchant import CatalogItem
+
+
+class CatalogView(BaseModel):
+    merchant_id: str
+    catalog_version: int            # changes with every update; derived data is keyed on it
+    items: list[CatalogItem]
+
+
+class ItemUpdate(BaseModel):
+    """Fields to change on one catalog item; omitted fields are left as they are."""
+    name: str | None = None
+    description: str | None = None
+    price_inr: int | None = Field(default=None, gt=0)
+    is_available: bool | None = None
+
+
+class AvailabilityUpdate(BaseModel):
+    items: dict[str, bool]          # item ID -> is_available, e.g. {"cake_choc_001": false}
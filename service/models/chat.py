@@ -10,3 +10,4 @@ class ChatRequest(BaseModel):
 class ChatResponse(BaseModel):
     session_id: str
     reply: str
+    coalesced: bool = False  # True = merged into an earlier message's agent call; reply is shared
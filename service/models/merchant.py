@@ -1,5 +1,27 @@
 from __future__ import annotations
-from pydantic import BaseModel
+import itertools
+import weakref
+from typing import Any
+from pydantic import BaseModel, PrivateAttr
+
+# Catalog versions are drawn from one process-wide counter, so a version is
+# unique and strictly increasing across merchants and across replaced objects.
+_catalog_versions = itertools.count(1)
+
+# Fields that feed catalog_summary — assigning any of them bumps the version
+_ITEM_SUMMARY_FIELDS = frozenset({"name", "price_inr", "is_available"})
+_MERCHANT_SUMMARY_FIELDS = frozenset(
+    {"name", "min_order_inr", "delivery_area", "operating_hours", "catalog"}
+)
+
+summary_stats = {"builds": 0, "hits": 0}
+
+
+def _fields_equal(self, other: Any) -> bool:
+    """Equality on field values only; the private version bookkeeping doesn't count."""
+    if not isinstance(other, BaseModel):
+        return NotImplemented
+    return type(self) is type(other) and self.__dict__ == other.__dict__
 
 
 class OperatingHours(BaseModel):
@@ -19,6 +41,29 @@ class CatalogItem(BaseModel):
     category: str               # "cake" | "thali" | "drink" etc.
     is_available: bool          # False = out of stock / off-menu
 
+    # Weak, so an item shared with later revisions doesn't keep old ones alive
+    _owners: list[weakref.ref[Merchant]] = PrivateAttr(default_factory=list)
+
+    __eq__ = _fields_equal
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in _ITEM_SUMMARY_FIELDS:
+            for ref in self._owners:
+                owner = ref()
+                if owner is not None:
+                    owner.bump_catalog_version()
+
+    def __copy__(self) -> CatalogItem:
+        copied = super().__copy__()
+        copied._owners = []  # a fresh item; owners adopt it themselves
+        return copied
+
+    def __deepcopy__(self, memo: dict | None = None) -> CatalogItem:
+        memo = {} if memo is None else memo
+        memo[id(self._owners)] = []  # the copy is adopted by its new merchant, not ours
+        return super().__deepcopy__(memo)
+
 
 class Merchant(BaseModel):
     id: str                     # "merchant_001"
@@ -31,14 +76,114 @@ class Merchant(BaseModel):
     commission_pct: float       # 10.0
     operating_hours: OperatingHours
     catalog: list[CatalogItem]
+    coalesce_window_ms: int = 0  # merge a customer's messages sent within this window; 0 = off
+    fastpath_enabled: bool = False  # answer menu/hours/price lookups locally, skipping the agent
+
+    _catalog_version: int = PrivateAttr(default_factory=lambda: next(_catalog_versions))
+    _summary: tuple[int, str] | None = PrivateAttr(default=None)
+    _summary_builds: int = PrivateAttr(default=0)
+
+    __eq__ = _fields_equal
+
+    def model_post_init(self, __context: Any) -> None:
+        self._adopt(self.catalog)
+
+    def __copy__(self) -> Merchant:
+        copied = super().__copy__()
+        copied._reset_derived()
+        return copied
+
+    def __deepcopy__(self, memo: dict | None = None) -> Merchant:
+        copied = super().__deepcopy__(memo)
+        copied._reset_derived()
+        return copied
+
+    def _reset_derived(self) -> None:
+        self._catalog_version = next(_catalog_versions)
+        self._summary = None
+        self._summary_builds = 0
+        self._adopt(self.catalog)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name == "catalog":
+            # Items kept from the old list stay adopted; only the difference changes hands
+            old = self.catalog
+            kept, before = {id(i) for i in value}, {id(i) for i in old}
+            self._release([i for i in old if id(i) not in kept])
+        super().__setattr__(name, value)
+        if name == "catalog":
+            self._adopt([i for i in self.catalog if id(i) not in before])
+        if name in _MERCHANT_SUMMARY_FIELDS:
+            self.bump_catalog_version()
+
+    def revise(self, **changes: Any) -> Merchant:
+        """A new revision with ``changes`` applied; this merchant is left untouched.
+
+        Unchanged fields and catalog items are shared with the new revision,
+        not copied, so both must be treated as immutable from here on. The
+        revision gets its own catalog_version, so derived data is rebuilt for
+        this merchant only.
+        """
+        revised = self.__copy__()
+        for name, value in changes.items():
+            setattr(revised, name, value)
+        return revised
+
+    def retire(self) -> None:
+        """Stop tracking this merchant's items, once a newer revision replaces it.
+
+        Readers still holding it keep a consistent view; edits to the items
+        it shares with later revisions stop bumping its catalog_version.
+        """
+        self._release(self.catalog)
+
+    def _adopt(self, items: list[CatalogItem]) -> None:
+        ref = weakref.ref(self)
+        for item in items:
+            item._owners.append(ref)
+
+    def _release(self, items: list[CatalogItem]) -> None:
+        for item in items:
+            item._owners[:] = [r for r in item._owners if (o := r()) is not None and o is not self]
+
+    @property
+    def catalog_version(self) -> int:
+        """Changes whenever anything in catalog_summary changes."""
+        return self._catalog_version
+
+    def bump_catalog_version(self) -> None:
+        """Invalidate derived catalog data.
+
+        Called automatically on field assignment; call it directly after
+        in-place list edits such as ``merchant.catalog.append(item)``.
+        """
+        self._catalog_version = next(_catalog_versions)
+
+    @property
+    def summary_builds(self) -> int:
+        """How many times catalog_summary has been rebuilt for this merchant."""
+        return self._summary_builds
 
     @property
     def catalog_summary(self) -> str:
-        """Auto-generated AI context string — always in sync with catalog."""
+        """Auto-generated AI context string — always in sync with catalog.
+
+        Memoized per catalog_version, so repeated /chat turns reuse the string.
+        """
+        cached = self._summary
+        if cached is not None and cached[0] == self._catalog_version:
+            summary_stats["hits"] += 1
+            return cached[1]
+
+        version = self._catalog_version
         available = [i for i in self.catalog if i.is_available]
         items_str = ", ".join(f"{i.name} (₹{i.price_inr})" for i in available)
-        return (
+        summary = (
             f"{self.name}. Items: {items_str}. "
             f"Min order ₹{self.min_order_inr}. Delivery: {self.delivery_area}. "
             f"Hours: {self.operating_hours.open_time}–{self.operating_hours.close_time}."
         )
+        self._summary = (version, summary)
+        self._summary_builds += 1
+        summary_stats["builds"] += 1
+        return summary
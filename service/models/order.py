@@ -40,5 +40,6 @@ class Order(BaseModel):
     payment_link: str | None            = None   # Razorpay link
     delivery_address: str | None        = None
     notes: str | None                   = None
+    commission_pct: float | None        = None   # merchant's rate when placed; None on older orders
     created_at: datetime
     updated_at: datetime
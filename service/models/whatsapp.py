@@ -0,0 +1,84 @@
+from __future__ import annotations
+from pydantic import BaseModel, ConfigDict, Field
+from models.merchant import Merchant
+
+
+# Subset of the WhatsApp Cloud API webhook payload that Comverse consumes.
+# Unknown fields are ignored so new Meta fields don't break ingestion.
+
+class _Lenient(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+
+class WebhookText(_Lenient):
+    body: str
+
+
+class WebhookMessage(_Lenient):
+    id: str                     # "wamid.HBgM..."
+    from_: str = Field(alias="from")  # "919876543210" — customer, no leading +
+    timestamp: str              # unix seconds as string
+    type: str                   # "text" | "image" | "interactive" | ...
+    text: WebhookText | None = None
+
+
+class WebhookMetadata(_Lenient):
+    display_phone_number: str   # "911234567890" — merchant's business number
+    phone_number_id: str        # Cloud API sender ID for replies
+
+
+class WebhookValue(_Lenient):
+    metadata: WebhookMetadata | None = None
+    messages: list[WebhookMessage] = []
+
+
+class WebhookChange(_Lenient):
+    field: str                  # "messages"
+    value: WebhookValue
+
+
+class WebhookEntry(_Lenient):
+    id: str                     # WhatsApp Business Account ID
+    changes: list[WebhookChange] = []
+
+
+class WebhookPayload(_Lenient):
+    object: str                 # "whatsapp_business_account"
+    entry: list[WebhookEntry] = []
+
+
+class InboundMessage(BaseModel):
+    """One customer text message flattened out of a webhook batch."""
+    message_id: str
+    phone_number_id: str
+    business_phone: str         # "+911234567890" — matches Merchant.phone
+    sender: str                 # "+919876543210" — matches ChatRequest.sender
+    text: str
+    received_at: float          # time.monotonic() when the webhook was acked
+    merchant: Merchant | None = None  # looked up at ack time, so workers start in arrival order
+
+
+def _e164(number: str) -> str:
+    return number if number.startswith("+") else f"+{number}"
+
+
+def flatten_messages(payload: WebhookPayload, received_at: float) -> list[InboundMessage]:
+    """All text messages across every entry/change in the batch, in payload order."""
+    inbound = []
+    for entry in payload.entry:
+        for change in entry.changes:
+            value = change.value
+            if change.field != "messages" or value.metadata is None:
+                continue
+            for message in value.messages:
+                if message.type != "text" or message.text is None:
+                    continue
+                inbound.append(InboundMessage(
+                    message_id=message.id,
+                    phone_number_id=value.metadata.phone_number_id,
+                    business_phone=_e164(value.metadata.display_phone_number),
+                    sender=_e164(message.from_),
+                    text=message.text.body,
+                    received_at=received_at,
+                ))
+    return inbound
@@ -0,0 +1,60 @@
+import threading
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, FastAPI, HTTPException, Query, Request
+from models.order import OrderStatus
+from routes.orders import order_engine_for
+from services.analytics import GROUP_KEYS, OrderAnalytics
+from services.merchant_store import get_merchant
+
+router = APIRouter()
+_analytics_lock = threading.Lock()  # sync routes race here from threadpool workers
+
+
+def _commission_pct(merchant_id: str) -> float:
+    """Rate for orders placed before checkout stored it on the order."""
+    merchant = get_merchant(merchant_id)
+    return merchant.commission_pct if merchant is not None else 0.0
+
+
+def analytics_for(app: FastAPI) -> OrderAnalytics:
+    """App-scoped analytics, backfilled from the order engine at startup and kept current."""
+    state = app.state
+    if hasattr(state, "order_analytics"):
+        return state.order_analytics
+    with _analytics_lock:
+        if not hasattr(state, "order_analytics"):  # one subscription per engine
+            analytics = OrderAnalytics(commission_pct=_commission_pct)
+            order_engine_for(app).subscribe(analytics.add, analytics.extend)
+            state.order_analytics = analytics
+    return state.order_analytics
+
+
+@router.get("/analytics")
+def analytics(
+    req: Request,
+    merchant_id: Optional[str] = None,
+    by: str = "day",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    status: Optional[list[OrderStatus]] = Query(default=None),
+    top: int = Query(default=5, ge=0, le=100),
+):
+    """GMV, orders, average basket and commission per group, plus top items.
+
+    ``by`` is a comma-separated list of merchant, day, hour, status, item.
+    Days are IST and inclusive; cancelled orders count only if ``status``
+    asks for them.
+    """
+    keys = [k.strip() for k in by.split(",") if k.strip()]
+    unknown = [k for k in keys if k not in GROUP_KEYS]
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown group key(s): {', '.join(unknown)}")
+    engine = analytics_for(req.app)
+    filters = {"start": start, "end": end, "statuses": status}
+    return {
+        "merchant_id": merchant_id,
+        "by": keys,
+        "rows": engine.rollup(keys, merchant_id, **filters),
+        "top_items": engine.top_items(merchant_id, top, **filters) if top else [],
+    }
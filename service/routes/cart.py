@@ -0,0 +1,105 @@
+import asyncio
+from fastapi import APIRouter, HTTPException, Request
+from models.cart import CartItemRequest, CartQuantityRequest, CartView, CheckoutRequest
+from models.merchant import Merchant
+from models.order import Order
+from routes.chat import pipeline_for
+from routes.orders import order_engine_for
+from services.cart import CartError, CartStore, ItemNotFound
+from services.merchant_store import aget_merchant
+from services.orders import NotDurable
+from services.pipeline import session_id_for
+
+router = APIRouter(prefix="/merchants/{merchant_id}/carts/{customer_phone}")
+
+
+async def _merchant(merchant_id: str) -> Merchant:
+    merchant = await aget_merchant(merchant_id)
+    if merchant is None:
+        raise HTTPException(status_code=404, detail=f"Merchant '{merchant_id}' not found")
+    return merchant
+
+
+async def _change(req: Request, merchant_id: str, customer_phone: str, apply) -> CartView:
+    """Run one cart operation and return the updated cart.
+
+    Handlers are async so carts and search indexes are only touched on the
+    event loop, alongside the chat pipeline that reads them.
+    """
+    merchant = await _merchant(merchant_id)
+    carts: CartStore = pipeline_for(req.app).carts
+    session_id = session_id_for(merchant, customer_phone)
+    try:
+        apply(carts, merchant, session_id)
+    except ItemNotFound as exc:
+        raise HTTPException(status_code=404, detail=f"Item '{exc}' not found")
+    except CartError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return carts.view(merchant, session_id)
+
+
+@router.get("", response_model=CartView)
+async def get_cart(req: Request, merchant_id: str, customer_phone: str):
+    return await _change(req, merchant_id, customer_phone, lambda carts, merchant, session_id: None)
+
+
+@router.post("/items", response_model=CartView)
+async def add_item(req: Request, merchant_id: str, customer_phone: str, body: CartItemRequest):
+    """Add by catalog ID, or by name as the customer wrote it ("2 choco cake")."""
+    item_id = body.item_id
+    if item_id is None:
+        if not body.item:
+            raise HTTPException(status_code=422, detail="Give item_id or item")
+        hits = pipeline_for(req.app).fastpath.search.search(await _merchant(merchant_id), body.item, limit=1)
+        if not hits:
+            raise HTTPException(status_code=404, detail=f"No item matching '{body.item}'")
+        item_id = hits[0].item.id
+    return await _change(
+        req, merchant_id, customer_phone,
+        lambda carts, merchant, session_id: carts.add(merchant, session_id, item_id, body.quantity),
+    )
+
+
+@router.put("/items/{item_id}", response_model=CartView)
+async def set_quantity(req: Request, merchant_id: str, customer_phone: str, item_id: str, body: CartQuantityRequest):
+    return await _change(
+        req, merchant_id, customer_phone,
+        lambda carts, merchant, session_id: carts.set_quantity(merchant, session_id, item_id, body.quantity),
+    )
+
+
+@router.delete("/items/{item_id}", response_model=CartView)
+async def remove_item(req: Request, merchant_id: str, customer_phone: str, item_id: str):
+    return await _change(
+        req, merchant_id, customer_phone,
+        lambda carts, merchant, session_id: carts.remove(merchant, session_id, item_id),
+    )
+
+
+@router.delete("", response_model=CartView)
+async def clear_cart(req: Request, merchant_id: str, customer_phone: str):
+    return await _change(req, merchant_id, customer_phone, lambda carts, merchant, session_id: carts.clear(session_id))
+
+
+@router.post("/checkout", response_model=Order)
+async def checkout(req: Request, merchant_id: str, customer_phone: str, body: CheckoutRequest):
+    """Place the cart as an order, once it's on disk. Retrying with the same message_key returns the same order."""
+    merchant = await _merchant(merchant_id)
+    engine = order_engine_for(req.app)
+    try:
+        order, _ = pipeline_for(req.app).carts.checkout(
+            merchant,
+            session_id_for(merchant, customer_phone),
+            engine,
+            customer_phone,
+            body.message_key,
+            delivery_address=body.delivery_address,
+            notes=body.notes,
+        )
+        # The cart is emptied and a retry finds the order; only the fsync waits off the loop
+        await asyncio.to_thread(engine.wait_durable)
+    except CartError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    except NotDurable:
+        raise HTTPException(status_code=503, detail="Order not saved yet. Retry with the same message_key.")
+    return order
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, HTTPException
+from models.catalog import AvailabilityUpdate, CatalogView, ItemUpdate
+from models.merchant import CatalogItem, Merchant
+from services.merchant_store import get_store
+
+router = APIRouter(prefix="/merchants/{merchant_id}/catalog")
+
+
+def _view(merchant: Merchant) -> CatalogView:
+    return CatalogView(merchant_id=merchant.id, catalog_version=merchant.catalog_version, items=merchant.catalog)
+
+
+def _update_items(merchant_id: str, changes: dict[str, dict]) -> CatalogView:
+    try:
+        return _view(get_store().update_items(merchant_id, changes))
+    except KeyError as exc:
+        missing = exc.args[0]
+        what = "Merchant" if missing == merchant_id else "Item"
+        raise HTTPException(status_code=404, detail=f"{what} '{missing}' not found")
+
+
+@router.get("", response_model=CatalogView)
+def get_catalog(merchant_id: str):
+    merchant = get_store().get(merchant_id)
+    if merchant is None:
+        raise HTTPException(status_code=404, detail=f"Merchant '{merchant_id}' not found")
+    return _view(merchant)
+
+
+@router.put("", response_model=CatalogView)
+def replace_catalog(merchant_id: str, items: list[CatalogItem]):
+    """Replace the whole catalog."""
+    ids = [item.id for item in items]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=422, detail="Item IDs must be unique")
+    try:
+        return _view(get_store().update(merchant_id, catalog=items))
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Merchant '{merchant_id}' not found")
+
+
+@router.patch("/items/{item_id}", response_model=CatalogView)
+def update_item(merchant_id: str, item_id: str, update: ItemUpdate):
+    return _update_items(merchant_id, {item_id: update.model_dump(exclude_none=True)})
+
+
+@router.post("/availability", response_model=CatalogView)
+def set_availability(merchant_id: str, update: AvailabilityUpdate):
+    """Mark items sold out or back in stock, all in one revision."""
+    return _update_items(merchant_id, {item_id: {"is_available": available} for item_id, available in update.items.items()})
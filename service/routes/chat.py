@@ -1,41 +1,70 @@
+import json
+import time
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Header, Request
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Header, Request, Response
+from fastapi.responses import StreamingResponse
+from config import settings
 from models.chat import ChatRequest, ChatResponse
-from mocks.merchants import get_merchant
-from services.lyzr import init_lyzr, run_agent
+from services.breaker import AgentGuard, CircuitBreaker
+from services.cache import SingleFlightCache
+from services.cart import CartStore
+from services.coalescer import BurstCoalescer
+from services.concurrency import InflightLimiter, QueueTimeout
+from services.context import CatalogContextTracker
+from services.fastpath import FastPath
+from services.hours import HoursGate
+from services.lyzr import load_agent_pool
+from services.mailbox import SessionScheduler
+from services.merchant_store import aget_merchant
+from services.metrics import ChatMetrics
+from services.pipeline import ChatPipeline
+from services.retrieval import CatalogRetriever
+from services.search import CatalogSearch
 
 router = APIRouter()
 
 
-def get_agent(
+async def get_agent(
     req: Request,
     x_lyzr_api_key: Optional[str] = Header(default=None),
     x_lyzr_agent_id: Optional[str] = Header(default=None),
 ):
-    """Resolve the Lyzr agent for this request.
+    """Resolve the Lyzr agent pool for this request — the pipeline leases a handle from it.
 
     Priority:
-    1. X-Lyzr-Api-Key + X-Lyzr-Agent-Id headers — fetches and caches that agent
-    2. app.state.agent                            — pre-warmed at startup via env config
+    1. X-Lyzr-Api-Key + X-Lyzr-Agent-Id headers — fetches and caches that agent (single-flight)
+    2. app.state.agent_pool                       — env config, pre-warmed in the background
     3. 4xx                                        — missing credentials
     """
+    started = time.perf_counter()
     if x_lyzr_api_key:
         if not x_lyzr_agent_id:
             raise HTTPException(
                 status_code=400,
                 detail="X-Lyzr-Agent-Id header is required.",
             )
-        cache = req.app.state.agents_cache
-        cache_key = f"{x_lyzr_api_key}:{x_lyzr_agent_id}"
-        if cache_key not in cache:
-            cache[cache_key] = init_lyzr(
+        cache: SingleFlightCache = req.app.state.agents_cache
+        key = f"{x_lyzr_api_key}:{x_lyzr_agent_id}"
+        outcome = "cached" if cache.get(key) is not None else "waited"
+
+        def load():
+            nonlocal outcome
+            outcome = "loaded"  # this request pays for init_lyzr
+            return load_agent_pool(
                 api_key=x_lyzr_api_key,
                 agent_id=x_lyzr_agent_id,
+                size=settings.agent_handles_per_key,
             )
-        return cache[cache_key]
 
-    if hasattr(req.app.state, "agent"):
-        return req.app.state.agent
+        pool = await cache.get_or_load(key, load)
+        req.state.agent_resolve = (started, time.perf_counter() - started, outcome)
+        return pool
+
+    pool = getattr(req.app.state, "agent_pool", None)
+    if pool is not None:
+        outcome = "default" if getattr(pool, "ready", True) else "warming"  # a warming pool makes the agent turn wait
+        req.state.agent_resolve = (started, time.perf_counter() - started, outcome)
+        return pool
 
     raise HTTPException(
         status_code=503,
@@ -43,21 +72,137 @@ def get_agent(
     )
 
 
+def pipeline_for(app: FastAPI) -> ChatPipeline:
+    """App-scoped chat pipeline, created on first use."""
+    state = app.state
+    if not hasattr(state, "chat_pipeline"):
+        search = CatalogSearch()  # one index per merchant for both the fast path and retrieval
+        state.chat_pipeline = ChatPipeline(
+            limiter=InflightLimiter(
+                max_inflight=settings.max_inflight_chats,
+                max_per_tenant=settings.max_inflight_per_merchant,
+                queue_timeout=settings.chat_queue_timeout_s,
+            ),
+            scheduler=SessionScheduler(),
+            coalescer=BurstCoalescer(max_wait=settings.coalesce_max_wait_ms / 1000),
+            fastpath=FastPath(search),
+            context=CatalogContextTracker(
+                refresh_turns=settings.context_refresh_turns,
+                max_sessions=settings.context_max_sessions,
+                retriever=CatalogRetriever(
+                    top_k=settings.context_top_k,
+                    budget_bytes=settings.context_budget_bytes,
+                    min_items=settings.context_large_catalog_items,
+                    search=search,
+                ),
+            ),
+            carts=CartStore(ttl_s=settings.cart_ttl_s, max_carts=settings.cart_max_sessions),
+            hours=HoursGate() if settings.hours_gate_enabled else None,
+            guard=AgentGuard(
+                timeout_s=settings.agent_timeout_s,
+                hedge_after_s=settings.agent_hedge_after_s,
+                breaker=lambda: CircuitBreaker(
+                    window=settings.breaker_window,
+                    min_calls=settings.breaker_min_calls,
+                    error_rate=settings.breaker_error_rate,
+                    slow_call_s=settings.breaker_slow_call_s,
+                    slow_rate=settings.breaker_slow_rate,
+                    open_s=settings.breaker_open_s,
+                    probes=settings.breaker_probes,
+                ),
+            ),
+        )
+    return state.chat_pipeline
+
+
+def chat_metrics_for(app: FastAPI) -> ChatMetrics | None:
+    """App-scoped /chat stage histograms; None when METRICS_ENABLED is off."""
+    state = app.state
+    if not hasattr(state, "chat_metrics"):
+        state.chat_metrics = ChatMetrics(
+            max_merchants=settings.metrics_max_merchants,
+            trace_every=settings.trace_sample_every,
+        ) if settings.metrics_enabled else None
+    return state.chat_metrics
+
+
+def get_pipeline(req: Request) -> ChatPipeline:
+    return pipeline_for(req.app)
+
+
 @router.post("/chat", response_model=ChatResponse)
-def chat(request: ChatRequest, agent=Depends(get_agent)):
-    merchant = get_merchant(request.merchant_id)
+async def chat(
+    request: ChatRequest,
+    req: Request,
+    response: Response,
+    agent=Depends(get_agent),
+    pipeline: ChatPipeline = Depends(get_pipeline),
+):
+    lookup_start = time.perf_counter()
+    merchant = await aget_merchant(request.merchant_id)
+    lookup = time.perf_counter() - lookup_start
+    if merchant is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Merchant '{request.merchant_id}' not found",
+        )
+
+    try:
+        result = await pipeline.process(
+            merchant=merchant,
+            sender=request.sender,
+            message=request.message,
+            agent=agent,
+        )
+    except QueueTimeout:
+        raise HTTPException(status_code=503, detail="Too many conversations in progress. Please retry.")
+
+    response.headers["Server-Timing"] = (
+        f"session;dur={result.session_wait * 1000:.1f}, "
+        f"context;dur={result.context * 1000:.1f}, "
+        f"queue;dur={result.queue_wait * 1000:.1f}, "
+        f"upstream;dur={result.upstream * 1000:.1f}"
+    )
+    metrics = chat_metrics_for(req.app)
+    if metrics is not None:
+        resolve = getattr(req.state, "agent_resolve", None)
+        metrics.record(
+            merchant.id,
+            result.source,
+            time.perf_counter() - (resolve[0] if resolve else lookup_start),
+            resolve[1:] if resolve else None,
+            (lookup, result.session_wait, result.context, result.queue_wait, result.upstream),
+            result.session_id,
+        )
+    return ChatResponse(session_id=result.session_id, reply=result.reply, coalesced=result.coalesced)
+
+
+@router.post("/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    agent=Depends(get_agent),
+    pipeline: ChatPipeline = Depends(get_pipeline),
+):
+    """Server-Sent Events variant of /chat — status, delta and done events as the reply is produced."""
+    merchant = await aget_merchant(request.merchant_id)
     if merchant is None:
         raise HTTPException(
             status_code=404,
             detail=f"Merchant '{request.merchant_id}' not found",
         )
 
-    session_id = f"{merchant.id}:{request.sender}"
+    async def events():
+        async for event, data in pipeline.stream(
+            merchant=merchant,
+            sender=request.sender,
+            message=request.message,
+            agent=agent,
+            heartbeat=settings.stream_heartbeat_s,
+        ):
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
 
-    # Inject merchant catalog so the agent always has product context
-    message_with_context = (
-        f"[Merchant: {merchant.name} | Catalog: {merchant.catalog_summary}]\n"
-        f"{request.message}"
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    reply = run_agent(agent=agent, message=message_with_context, session_id=session_id)
-    return ChatResponse(session_id=session_id, reply=reply)
@@ -0,0 +1,62 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, FastAPI, HTTPException, Query, Request
+from services.hours import CLOSED, OPEN, HoursIndex, schedule_for
+from services.merchant_store import get_merchant, get_store
+from services.orders import IST
+
+router = APIRouter()
+
+
+def hours_index_for(app: FastAPI) -> HoursIndex:
+    """App-scoped hours index over the whole merchant store, built on first use.
+
+    Kept current by the store: an update or reload re-indexes that merchant.
+    """
+    state = app.state
+    if not hasattr(state, "hours_index"):
+        index = HoursIndex()
+        store = get_store()
+        store.subscribe(
+            lambda merchant_id, merchant: index.remove(merchant_id) if merchant is None
+            else index.update([(merchant_id, merchant.operating_hours)])
+        )
+        index.update(store.operating_hours())
+        state.hours_index = index
+    return state.hours_index
+
+
+@router.get("/merchants/open")
+def open_merchants(
+    req: Request,
+    at: Optional[datetime] = None,
+    accepting_orders: bool = False,
+    limit: int = Query(default=1000, ge=0, le=100_000),
+):
+    """Merchants open at ``at`` (default now) — or still taking same-day orders."""
+    when = at or datetime.now(IST)
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=IST)
+    index = hours_index_for(req.app)
+    ids = index.open_at(when, accepting_orders)
+    return {"at": when.isoformat(), "open": len(ids), "total": len(index), "merchant_ids": ids[:limit]}
+
+
+@router.get("/merchants/{merchant_id}/hours")
+def merchant_hours(merchant_id: str, at: Optional[datetime] = None):
+    merchant = get_merchant(merchant_id)
+    if merchant is None:
+        raise HTTPException(status_code=404, detail=f"Merchant '{merchant_id}' not found")
+    when = at or datetime.now(IST)
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=IST)
+    schedule = schedule_for(merchant.operating_hours)
+    state = schedule.state_at(when)
+    opening = schedule.next_opening(when) if state == CLOSED else None
+    return {
+        "merchant_id": merchant_id,
+        "at": when.isoformat(),
+        "open": state != CLOSED,
+        "accepting_orders": state == OPEN,
+        "next_opening": opening.isoformat() if opening is not None else None,
+    }
@@ -0,0 +1,59 @@
+import threading
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, FastAPI, HTTPException, Query, Request
+from config import settings
+from models.order import Order, OrderStatus
+from services.order_log import OrderStore
+from services.orders import OrderEngine
+
+router = APIRouter()
+_engine_lock = threading.Lock()  # sync routes race here from threadpool workers
+
+
+def order_engine_for(app: FastAPI) -> OrderEngine:
+    """App-scoped order engine, created at startup (or on first use without a lifespan).
+
+    With ORDER_LOG_DIR set it's restored from disk and journals every write.
+    """
+    state = app.state
+    if hasattr(state, "order_engine"):
+        return state.order_engine
+    with _engine_lock:
+        if not hasattr(state, "order_engine"):  # another worker may have built it meanwhile
+            if settings.order_log_dir:
+                state.order_store = OrderStore(
+                    settings.order_log_dir,
+                    snapshot_every=settings.order_snapshot_every,
+                    commit_interval_ms=settings.order_commit_interval_ms,
+                    durable_timeout_s=settings.order_durable_timeout_s,
+                )
+                state.order_engine = state.order_store.engine
+            else:
+                state.order_engine = OrderEngine()
+    return state.order_engine
+
+
+@router.get("/merchants/{merchant_id}/orders", response_model=list[Order])
+def list_orders(
+    req: Request,
+    merchant_id: str,
+    status: Optional[OrderStatus] = None,
+    day: Optional[date] = Query(default=None, alias="date"),
+    limit: int = Query(default=100, ge=1, le=1000),
+):
+    """Merchant dashboard: newest orders first, optionally one status and/or IST day."""
+    engine = order_engine_for(req.app)
+    if status is not None:
+        orders = engine.with_status(merchant_id, status, day)[::-1]
+    else:
+        orders = engine.for_merchant(merchant_id, day, limit)
+    return orders[:limit]
+
+
+@router.get("/orders/{order_id}", response_model=Order)
+def get_order(req: Request, order_id: str):
+    order = order_engine_for(req.app).get(order_id)
+    if order is None:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return order
@@ -0,0 +1,159 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import time
+from functools import partial
+from typing import Optional
+from fastapi import APIRouter, FastAPI, HTTPException, Header, Query, Request
+from fastapi.responses import PlainTextResponse
+from pydantic import ValidationError
+from config import settings
+from models.merchant import Merchant
+from models.whatsapp import InboundMessage, WebhookPayload, flatten_messages
+from routes.chat import pipeline_for
+from services.concurrency import QueueTimeout
+from services.http import http_client_for
+from services.merchant_store import get_store
+from services.whatsapp import WhatsAppSender
+from services.work_queue import WorkQueue
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+def verify_signature(body: bytes, signature: Optional[str], app_secret: str) -> bool:
+    """Check Meta's X-Hub-Signature-256 header ("sha256=<hex hmac of raw body>")."""
+    if not signature or not signature.startswith("sha256="):
+        return False
+    expected = hmac.new(app_secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(signature.removeprefix("sha256="), expected)
+
+
+async def handle_inbound(app: FastAPI, message: InboundMessage) -> None:
+    """Worker-side processing of one webhook message → agent.
+
+    Nothing is awaited before the pipeline takes the customer's session
+    turn: workers pick messages up in queue order, so they claim turns in
+    that order too. That's why the merchant is resolved before enqueueing.
+    """
+    merchant = message.merchant
+    if merchant is None:
+        logger.warning("No merchant for business number %s", message.business_phone)
+        return
+    pool = getattr(app.state, "agent_pool", None)
+    if pool is None:
+        logger.warning("Dropping %s — no default agent configured", message.message_id)
+        return
+
+    try:
+        result = await pipeline_for(app).process(
+            merchant=merchant,
+            sender=message.sender,
+            message=message.text,
+            agent=pool,
+        )
+    except QueueTimeout:
+        logger.warning("Dropping %s — agent slots saturated", message.message_id)
+        return
+    if result.coalesced:
+        return  # the burst leader delivers the single merged reply
+    logger.info(
+        "Replied to %s in session %s (queue %.3fs, upstream %.3fs)",
+        message.message_id, result.session_id, result.queue_wait, result.upstream,
+    )
+
+    sender = whatsapp_sender_for(app)
+    if sender is None:
+        return  # no access token configured (dev) — the log line above is the reply
+    try:
+        sender.enqueue(message.phone_number_id, message.sender, result.reply)
+    except asyncio.QueueFull:
+        logger.error("Outbox full — reply to %s dropped", message.message_id)
+
+
+def whatsapp_sender_for(app: FastAPI) -> WhatsAppSender | None:
+    """App-scoped reply sender, created on first use; None without an access token."""
+    if not settings.whatsapp_access_token:
+        return None
+    state = app.state
+    if not hasattr(state, "whatsapp_sender"):
+        state.whatsapp_sender = WhatsAppSender(
+            client=http_client_for(app),
+            access_token=settings.whatsapp_access_token,
+            base_url=settings.whatsapp_api_base,
+            messages_per_second=settings.whatsapp_messages_per_second,
+            rate_overrides=settings.whatsapp_mps_overrides,
+            workers=settings.whatsapp_send_workers,
+            max_outbox=settings.whatsapp_outbox_size,
+            max_retries=settings.whatsapp_max_retries,
+            retry_after_max=settings.whatsapp_retry_after_max_s,
+        )
+    return state.whatsapp_sender
+
+
+def webhook_queue_for(app: FastAPI) -> WorkQueue:
+    """App-scoped webhook work queue, created on first use."""
+    state = app.state
+    if not hasattr(state, "webhook_queue"):
+        state.webhook_queue = WorkQueue(
+            handler=partial(handle_inbound, app),
+            workers=settings.webhook_workers,
+            max_size=settings.webhook_queue_size,
+        )
+    return state.webhook_queue
+
+
+async def _resolve_merchants(messages: list[InboundMessage]) -> None:
+    """Attach each message's merchant, one lookup per business number in the batch."""
+    store = get_store()
+    merchants: dict[str, Merchant | None] = {}
+    for message in messages:
+        phone = message.business_phone
+        if phone not in merchants:
+            merchants[phone] = await store.aget_by_phone(phone)
+        message.merchant = merchants[phone]
+
+
+@router.get("/webhook", response_class=PlainTextResponse)
+def verify_webhook(
+    hub_mode: str = Query(default="", alias="hub.mode"),
+    hub_verify_token: str = Query(default="", alias="hub.verify_token"),
+    hub_challenge: str = Query(default="", alias="hub.challenge"),
+):
+    """Meta's subscription handshake — echo the challenge when the token matches."""
+    token = settings.whatsapp_verify_token
+    if hub_mode == "subscribe" and token and hmac.compare_digest(hub_verify_token, token):
+        return hub_challenge
+    raise HTTPException(status_code=403, detail="Webhook verification failed.")
+
+
+@router.post("/webhook")
+async def receive_webhook(
+    req: Request,
+    x_hub_signature_256: Optional[str] = Header(default=None),
+):
+    """Parse the whole batch, enqueue every message and ack right away.
+
+    Agent work happens on the webhook queue so Meta never waits on the LLM.
+    A full queue answers 503, which Meta retries later.
+    """
+    body = await req.body()
+    if settings.whatsapp_app_secret and not verify_signature(
+        body, x_hub_signature_256, settings.whatsapp_app_secret
+    ):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature.")
+    try:
+        payload = WebhookPayload.model_validate_json(body)
+    except ValidationError:
+        raise HTTPException(status_code=400, detail="Malformed webhook payload.")
+
+    messages = flatten_messages(payload, received_at=time.monotonic())
+    if messages:
+        await _resolve_merchants(messages)
+        try:
+            webhook_queue_for(req.app).submit_many(messages)
+        except asyncio.QueueFull:
+            raise HTTPException(status_code=503, detail="Webhook queue full. Retry later.")
+    return {"received": len(messages)}
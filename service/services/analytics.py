@@ -0,0 +1,289 @@
+import threading
+from datetime import date
+from typing import Callable, Iterable
+import numpy as np
+from models.order import Order, OrderStatus
+from services.orders import IST
+
+GROUP_KEYS = ("merchant", "day", "hour", "status", "item")
+_STATUSES = list(OrderStatus)
+_STATUS_CODES = {s: i for i, s in enumerate(_STATUSES)}
+_DENSE_GROUPS = 1 << 22  # largest packed key range grouped by counting rather than sorting
+_COUNTED = tuple(s for s in OrderStatus if s != OrderStatus.cancelled)  # default status filter
+
+
+class _Table:
+    """NumPy columns that grow by doubling, so appends are amortized O(1).
+
+    Readers take ``view()``: the row count is read before the columns, and a
+    resize copies rows into a new array, so a view never sees a half-written row.
+    """
+
+    def __init__(self, dtypes: dict[str, str], capacity: int = 1024):
+        self._columns = {name: np.zeros(capacity, dtype) for name, dtype in dtypes.items()}
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _reserve(self, n: int) -> None:
+        capacity = len(next(iter(self._columns.values())))
+        if self.size + n > capacity:
+            capacity = max(capacity * 2, self.size + n)
+            for name, column in self._columns.items():
+                grown = np.zeros(capacity, column.dtype)
+                grown[: self.size] = column[: self.size]
+                self._columns[name] = grown
+
+    def extend(self, **values: np.ndarray) -> None:
+        n = len(next(iter(values.values())))
+        self._reserve(n)
+        for name, value in values.items():
+            self._columns[name][self.size:self.size + n] = value
+        self.size += n
+
+    def set(self, name: str, row: int, value) -> None:
+        self._columns[name][row] = value
+
+    def view(self) -> dict[str, np.ndarray]:
+        n = self.size
+        return {name: column[:n] for name, column in self._columns.items()}
+
+
+class OrderAnalytics:
+    """Columnar copy of the order book for merchant rollups.
+
+    One row per order (merchant, IST day and hour, status, subtotal,
+    commission) and one per order line (order row, item, quantity,
+    revenue), in NumPy arrays. Orders are appended as they're created and
+    status changes update their row in place, so a rollup is a handful of
+    vectorized passes instead of a loop over Order objects.
+
+    Commission uses the rate stored on the order. Orders placed before
+    rates were stored fall back to ``commission_pct(merchant_id)``, looked
+    up once per merchant so the write-path listener doesn't repeat it.
+    """
+
+    def __init__(self, commission_pct: Callable[[str], float] = lambda merchant_id: 10.0):
+        self.commission_pct = commission_pct
+        self._lock = threading.Lock()  # writers only
+        self._merchant_codes: dict[str, int] = {}
+        self._merchant_ids: list[str] = []
+        self._item_codes: dict[tuple[int, str], int] = {}
+        self._item_ids: list[str] = []
+        self._item_names: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._rates: dict[str, float] = {}  # fallback commission_pct per merchant
+        self._orders = _Table({
+            "merchant": "i4", "day": "i4", "hour": "i1", "status": "i1", "subtotal": "i8", "commission": "f8",
+        })
+        self._lines = _Table({"order": "i8", "item": "i4", "quantity": "i4", "revenue": "i8"})
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def _merchant(self, merchant_id: str) -> int:
+        code = self._merchant_codes.get(merchant_id)
+        if code is None:
+            code = self._merchant_codes[merchant_id] = len(self._merchant_ids)
+            self._merchant_ids.append(merchant_id)
+        return code
+
+    def _item(self, merchant: int, item_id: str, name: str) -> int:
+        code = self._item_codes.get((merchant, item_id))
+        if code is None:
+            code = self._item_codes[(merchant, item_id)] = len(self._item_ids)
+            self._item_ids.append(item_id)
+            self._item_names.append(name)
+        return code
+
+    # ── writes ──────────────────────────────────────────────────────────────
+
+    def add(self, order: Order, previous: Order | None = None) -> None:
+        """Record a new order, or a change to one (an OrderEngine listener)."""
+        with self._lock:
+            row = self._rows.get(order.id)
+            if row is not None:
+                self._orders.set("status", row, _STATUS_CODES[order.status])
+                return
+            self._extend([order])
+
+    def extend(self, orders: Iterable[Order]) -> None:
+        """Record many orders at once — a backfill."""
+        with self._lock:
+            batch: list[Order] = []
+            for order in orders:
+                if order.id in self._rows:
+                    continue
+                batch.append(order)
+                if len(batch) >= 65_536:
+                    self._extend(batch)
+                    batch = []
+            self._extend(batch)
+
+    def _extend(self, orders: list[Order]) -> None:
+        if not orders:
+            return
+        merchant, day, hour, status, subtotal, commission = [], [], [], [], [], []
+        line_order, line_item, line_quantity, line_revenue = [], [], [], []
+        row = len(self._orders)
+        for order in orders:
+            code = self._merchant(order.merchant_id)
+            rate = order.commission_pct
+            if rate is None:
+                rate = self._rates.get(order.merchant_id)
+            if rate is None:
+                rate = self._rates[order.merchant_id] = self.commission_pct(order.merchant_id)
+            created = order.created_at.astimezone(IST)
+            merchant.append(code)
+            day.append(created.toordinal())
+            hour.append(created.hour)
+            status.append(_STATUS_CODES[order.status])
+            subtotal.append(order.subtotal_inr)
+            commission.append(order.subtotal_inr * rate / 100)
+            for item in order.items:
+                line_order.append(row)
+                line_item.append(self._item(code, item.catalog_item_id, item.name))
+                line_quantity.append(item.quantity)
+                line_revenue.append(item.total_price_inr)
+            self._rows[order.id] = row
+            row += 1
+        # Lines first: a reader that sees an order row must be able to resolve its lines' order index
+        if line_order:
+            self._lines.extend(
+                order=np.array(line_order), item=np.array(line_item),
+                quantity=np.array(line_quantity), revenue=np.array(line_revenue),
+            )
+        self._orders.extend(
+            merchant=np.array(merchant), day=np.array(day), hour=np.array(hour), status=np.array(status),
+            subtotal=np.array(subtotal), commission=np.array(commission),
+        )
+
+    # ── reads ───────────────────────────────────────────────────────────────
+
+    def rollup(
+        self,
+        by: Iterable[str] = ("day",),
+        merchant_id: str | None = None,
+        start: date | None = None,
+        end: date | None = None,
+        statuses: Iterable[OrderStatus] | None = None,
+    ) -> list[dict]:
+        """Totals per group, ordered by the group keys.
+
+        ``by`` is any of GROUP_KEYS. Grouping by ``item`` reports quantity
+        and revenue per item; otherwise each group has orders, GMV, average
+        basket and commission. ``start``/``end`` are inclusive IST days;
+        cancelled orders are left out unless ``statuses`` says otherwise.
+        """
+        by = list(by)
+        unknown = set(by) - set(GROUP_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown group key(s): {', '.join(sorted(unknown))}")
+        orders = self._orders.view()
+        mask = np.ones(len(orders["day"]), bool)
+        if merchant_id is not None:
+            code = self._merchant_codes.get(merchant_id)
+            if code is None:
+                return []
+            mask &= orders["merchant"] == code
+        if start is not None:
+            mask &= orders["day"] >= start.toordinal()
+        if end is not None:
+            mask &= orders["day"] <= end.toordinal()
+        codes = [_STATUS_CODES[s] for s in (_COUNTED if statuses is None else statuses)]
+        mask &= np.isin(orders["status"], codes)
+
+        if "item" in by:
+            lines = self._lines.view()
+            rows = lines["order"]
+            keep = rows < len(mask)  # lines of orders this view doesn't include yet
+            keep[keep] = mask[rows[keep]]
+            rows = rows[keep]
+            columns = {key: orders[key][rows] for key in by if key != "item"}
+            columns["item"] = lines["item"][keep]
+            metrics = {"quantity": lines["quantity"][keep], "revenue": lines["revenue"][keep]}
+        else:
+            columns = {key: orders[key][mask] for key in by}
+            metrics = {"gmv": orders["subtotal"][mask], "commission": orders["commission"][mask]}
+        if len(next(iter(metrics.values()))) == 0:
+            return []
+        if by:
+            groups, keys = _group(columns)
+            count = len(next(iter(keys.values())))
+        else:
+            groups, keys, count = np.zeros(len(next(iter(metrics.values()))), np.int64), {}, 1
+
+        sizes = np.bincount(groups, minlength=count).tolist()
+        totals = {name: np.bincount(groups, weights=values, minlength=count).tolist() for name, values in metrics.items()}
+        labels = {}
+        for key in by:
+            values = keys[key].tolist()
+            names = {v: self._label(key, v) for v in set(values)}
+            labels[key] = [names[v] for v in values]
+        if "item" in by:
+            labels["item_id"] = [self._item_ids[v] for v in keys["item"].tolist()]
+        result = []
+        for g in range(count):
+            row = {key: values[g] for key, values in labels.items()}
+            if "item" in by:
+                row["quantity"] = int(totals["quantity"][g])
+                row["revenue_inr"] = int(totals["revenue"][g])
+            else:
+                gmv = int(totals["gmv"][g])
+                row["orders"] = sizes[g]
+                row["gmv_inr"] = gmv
+                row["avg_basket_inr"] = round(gmv / sizes[g], 2)
+                row["commission_inr"] = round(totals["commission"][g], 2)
+            result.append(row)
+        return result
+
+    def top_items(self, merchant_id: str | None = None, limit: int = 10, **filters) -> list[dict]:
+        """Best-selling items by revenue; takes rollup's filters."""
+        rows = self.rollup(("item",), merchant_id, **filters)
+        return sorted(rows, key=lambda r: (-r["revenue_inr"], -r["quantity"]))[:limit]
+
+    def _label(self, key: str, value: int):
+        if key == "merchant":
+            return self._merchant_ids[value]
+        if key == "day":
+            return date.fromordinal(value).isoformat()
+        if key == "status":
+            return _STATUSES[value].value
+        if key == "item":
+            return self._item_names[value]
+        return value
+
+    def stats(self) -> dict:
+        return {"orders": len(self._orders), "lines": len(self._lines), "items": len(self._item_ids)}
+
+
+def _group(columns: dict[str, np.ndarray]) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+    """Group index per row, and each key column's value per group.
+
+    Key columns are packed into one int64 (mixed radix). When the packed
+    range is small — days × hours of one merchant, say — groups are found
+    with a counting pass, otherwise with np.unique. Either way groups come
+    out in key order and all are non-empty.
+    """
+    n = len(next(iter(columns.values())))
+    packed = np.zeros(n, np.int64)
+    radixes = []
+    for values in columns.values():
+        low, high = int(values.min()), int(values.max())
+        radix = high - low + 1
+        radixes.append((low, radix))
+        packed = packed * radix + (values.astype(np.int64) - low)
+    span = int(packed.max()) + 1
+    if span <= min(4 * n + 1024, _DENSE_GROUPS):
+        unique = np.flatnonzero(np.bincount(packed, minlength=span))
+        remap = np.empty(span, np.int64)
+        remap[unique] = np.arange(len(unique))
+        groups = remap[packed]
+    else:
+        unique, groups = np.unique(packed, return_inverse=True)
+    keys = {}
+    for name, (low, radix) in zip(reversed(list(columns)), reversed(radixes)):
+        keys[name] = unique % radix + low
+        unique = unique // radix
+    return groups.ravel(), keys
@@ -0,0 +1,267 @@
+import asyncio
+import time
+from collections import deque
+from typing import AsyncIterator, Callable
+from models.merchant import Merchant
+from services.lyzr import arun_agent, astream_agent, lease_agent
+
+# Breaker states
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class AgentUnavailable(Exception):
+    """The agent call was skipped (breaker open) or abandoned (deadline passed)."""
+
+
+class CircuitBreaker:
+    """Stops calling an agent that keeps failing or crawling, then tries it again.
+
+    Closed, it keeps the outcomes of the last ``window`` calls and opens
+    once at least ``min_calls`` of them show an error rate of
+    ``error_rate`` or more, or that share of calls slower than
+    ``slow_call_s`` (``slow_rate``). Open, it refuses every call for
+    ``open_s`` seconds, then turns half-open: up to ``probes`` calls go
+    through, and it closes when they all succeed in time or opens again on
+    the first failure.
+    """
+
+    def __init__(
+        self,
+        window: int = 20,
+        min_calls: int = 10,
+        error_rate: float = 0.5,
+        slow_call_s: float = 10.0,
+        slow_rate: float = 0.5,
+        open_s: float = 30.0,
+        probes: int = 2,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_s = slow_call_s
+        self.slow_rate = slow_rate
+        self.open_s = open_s
+        self.probes = probes
+        self.clock = clock
+        self._calls: deque[tuple[bool, bool]] = deque(maxlen=window)  # (failed, slow)
+        self._failed = 0
+        self._slow = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = 0    # half-open calls let through and not yet recorded
+        self._probed = 0     # half-open calls that succeeded
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self.clock() - self._opened_at >= self.open_s:
+            self._state, self._probing, self._probed = HALF_OPEN, 0, 0
+        return self._state
+
+    @property
+    def blocked(self) -> bool:
+        """Whether ``allow`` would refuse right now (without using up a probe)."""
+        state = self.state
+        return state == OPEN or (state == HALF_OPEN and self._probing >= self.probes)
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now; an allowed call must be recorded or cancelled."""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and self._probing < self.probes:
+            self._probing += 1
+            return True
+        return False
+
+    def cancel(self) -> None:
+        """An allowed call was abandoned before it had an outcome."""
+        if self._state == HALF_OPEN:
+            self._probing = max(0, self._probing - 1)
+
+    def record(self, ok: bool, seconds: float) -> None:
+        slow = seconds >= self.slow_call_s
+        if self._state == HALF_OPEN:
+            self._probing = max(0, self._probing - 1)
+            if not ok or slow:
+                self._trip()
+            else:
+                self._probed += 1
+                if self._probed >= self.probes:
+                    self._close()
+            return
+        if self._state == OPEN:
+            return  # a call started before the trip; the verdict is already in
+        if len(self._calls) == self._calls.maxlen:
+            failed, was_slow = self._calls[0]
+            self._failed -= failed
+            self._slow -= was_slow
+        self._calls.append((not ok, slow))
+        self._failed += not ok
+        self._slow += slow
+        calls = len(self._calls)
+        if calls >= self.min_calls and (
+            self._failed >= self.error_rate * calls or self._slow >= self.slow_rate * calls
+        ):
+            self._trip()
+
+    def _trip(self) -> None:
+        self._state = OPEN
+        self._opened_at = self.clock()
+        self.trips += 1
+
+    def _close(self) -> None:
+        self._state = CLOSED
+        self._calls.clear()
+        self._failed = self._slow = 0
+
+
+class AgentGuard:
+    """Deadlines, a circuit breaker per tenant, and optional hedging for agent calls.
+
+    Every call gets ``timeout_s``; past it the caller gets AgentUnavailable
+    and the customer a fallback reply instead of an open-ended wait. A
+    tenant whose breaker is open is refused before it takes an in-flight
+    slot or an agent handle, so a brownout on one tenant's agent doesn't
+    hold capacity healthy tenants need.
+
+    With ``hedge_after_s``, a call still running after that long gets a
+    second one on another handle, and the first reply wins. Off by default:
+    the agent's session memory may then see the message twice. Agents
+    without a native ``arun`` keep a worker thread busy until they return,
+    even after their deadline.
+    """
+
+    def __init__(
+        self,
+        timeout_s: float = 30.0,
+        hedge_after_s: float = 0.0,
+        breaker: Callable[[], CircuitBreaker] = CircuitBreaker,
+    ):
+        self.timeout_s = timeout_s
+        self.hedge_after_s = hedge_after_s
+        self._new_breaker = breaker
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self.timeouts = 0
+        self.refused = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def breaker(self, tenant: str) -> CircuitBreaker:
+        breaker = self._breakers.get(tenant)
+        if breaker is None:
+            breaker = self._breakers[tenant] = self._new_breaker()
+        return breaker
+
+    def available(self, tenant: str) -> bool:
+        """False while ``tenant``'s breaker refuses calls — check before queueing for one."""
+        if self.breaker(tenant).blocked:
+            self.refused += 1
+            return False
+        return True
+
+    async def call(self, tenant: str, agent, handle, message: str, session_id: str) -> str:
+        """Run one agent turn on ``handle`` under the deadline; ``agent`` supplies a hedge's handle.
+
+        Raises AgentUnavailable when the breaker refuses or the deadline
+        passes; agent errors propagate. The breaker hears every outcome.
+        """
+        breaker = self.breaker(tenant)
+        if not breaker.allow():
+            self.refused += 1
+            raise AgentUnavailable(f"Circuit open for '{tenant}'")
+        start = time.perf_counter()
+        try:
+            reply = await asyncio.wait_for(self._hedged(agent, handle, message, session_id), self.timeout_s)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            breaker.record(False, time.perf_counter() - start)
+            raise AgentUnavailable(f"Agent took longer than {self.timeout_s}s") from None
+        except Exception:
+            breaker.record(False, time.perf_counter() - start)
+            raise
+        except BaseException:  # cancelled: the customer left, not the agent's fault
+            breaker.cancel()
+            raise
+        breaker.record(True, time.perf_counter() - start)
+        return reply
+
+    async def stream(self, tenant: str, handle, message: str, session_id: str) -> AsyncIterator[str]:
+        """``astream_agent`` under the same deadline and breaker as ``call``.
+
+        Never hedged: text already shown to the customer can't be swapped
+        for another call's.
+        """
+        breaker = self.breaker(tenant)
+        if not breaker.allow():
+            self.refused += 1
+            raise AgentUnavailable(f"Circuit open for '{tenant}'")
+        start = time.perf_counter()
+        pieces = astream_agent(handle, message, session_id)
+        try:
+            while True:
+                try:
+                    piece = await asyncio.wait_for(anext(pieces), start + self.timeout_s - time.perf_counter())
+                except StopAsyncIteration:
+                    break
+                yield piece
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            breaker.record(False, time.perf_counter() - start)
+            raise AgentUnavailable(f"Agent took longer than {self.timeout_s}s") from None
+        except Exception:
+            breaker.record(False, time.perf_counter() - start)
+            raise
+        except BaseException:
+            breaker.cancel()
+            raise
+        finally:
+            await pieces.aclose()
+        breaker.record(True, time.perf_counter() - start)
+
+    async def _hedged(self, agent, handle, message: str, session_id: str) -> str:
+        primary = asyncio.ensure_future(arun_agent(handle, message, session_id))
+        backup = None
+        try:
+            if not self.hedge_after_s:
+                return await primary
+            done, _ = await asyncio.wait({primary}, timeout=self.hedge_after_s)
+            if done:
+                return primary.result()
+            self.hedged += 1
+            backup = asyncio.ensure_future(self._backup(agent, message, session_id))
+            pending = {primary, backup}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self.hedge_wins += task is backup
+                        return task.result()
+            return primary.result()  # both failed: raise the first call's error
+        finally:
+            primary.cancel()
+            if backup is not None:
+                backup.cancel()
+
+    @staticmethod
+    async def _backup(agent, message: str, session_id: str) -> str:
+        async with lease_agent(agent) as handle:
+            return await arun_agent(handle, message, session_id)
+
+    def stats(self) -> dict:
+        return {
+            "timeouts": self.timeouts,
+            "refused": self.refused,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "open": sorted(t for t, b in self._breakers.items() if b.state != CLOSED),
+            "trips": sum(b.trips for b in self._breakers.values()),
+        }
+
+
+def fallback_reply(merchant: Merchant) -> str:
+    """What the customer gets when the agent can't answer in time."""
+    return (
+        f"{merchant.emoji} {merchant.name}: maaf kijiye, abhi reply mein der ho rahi hai. "
+        "1-2 minute baad dobara message karein — aapka order zaroor lenge!"
+    )
@@ -0,0 +1,272 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable
+from models.cart import CartLine, CartView
+from models.merchant import CatalogItem, Merchant
+from models.order import Order, OrderItem
+from services.orders import OrderEngine
+
+MAX_QUANTITY = 99  # per line; larger counts are almost always a typo
+
+
+class CartError(ValueError):
+    pass
+
+
+class ItemNotFound(LookupError):
+    pass
+
+
+@dataclass
+class Cart:
+    session_id: str
+    merchant_id: str
+    quantities: dict[str, int] = field(default_factory=dict)  # item id -> quantity, in order added
+    prices: dict[str, int] = field(default_factory=dict)      # unit price counted; absent = unavailable
+    subtotal_inr: int = 0
+    version: int = 0            # catalog_version the prices were read at
+    issues: list[str] = field(default_factory=list)  # what the last repricing changed
+    touched: float = 0.0
+
+
+class CartStore:
+    """Server-side carts, one per conversation, priced from the catalog.
+
+    Totals and checks never depend on the agent's arithmetic: every change
+    adjusts a running subtotal in O(1), and a cart is re-priced only when
+    its merchant's catalog_version has moved since it was last seen. Carts
+    idle for ``ttl_s`` are dropped, oldest first, on the next access.
+    """
+
+    def __init__(
+        self,
+        ttl_s: float = 1800.0,
+        max_carts: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_s = ttl_s
+        self.max_carts = max_carts
+        self.clock = clock
+        self._carts: OrderedDict[str, Cart] = OrderedDict()
+        self._catalogs: OrderedDict[str, tuple[int, dict[str, CatalogItem]]] = OrderedDict()
+        self.operations = 0
+        self.expired = 0
+        self.checkouts = 0
+
+    def __len__(self) -> int:
+        return len(self._carts)
+
+    def _items(self, merchant: Merchant) -> dict[str, CatalogItem]:
+        cached = self._catalogs.get(merchant.id)
+        if cached is None or cached[0] != merchant.catalog_version:
+            cached = self._catalogs[merchant.id] = (merchant.catalog_version, {i.id: i for i in merchant.catalog})
+            while len(self._catalogs) > 1024:
+                self._catalogs.popitem(last=False)
+        self._catalogs.move_to_end(merchant.id)
+        return cached[1]
+
+    def _item(self, merchant: Merchant, item_id: str) -> CatalogItem:
+        item = self._items(merchant).get(item_id)
+        if item is None:
+            raise ItemNotFound(item_id)
+        return item
+
+    def _expire(self, now: float) -> None:
+        while self._carts:
+            cart = next(iter(self._carts.values()))
+            if now - cart.touched < self.ttl_s and len(self._carts) <= self.max_carts:
+                break
+            self._carts.popitem(last=False)
+            self.expired += 1
+
+    def _cart(self, merchant: Merchant, session_id: str, create: bool = False) -> Cart | None:
+        now = self.clock()
+        self._expire(now)
+        cart = self._carts.get(session_id)
+        if cart is None:
+            if not create:
+                return None
+            cart = self._carts[session_id] = Cart(session_id, merchant.id, version=merchant.catalog_version)
+        cart.touched = now
+        self._carts.move_to_end(session_id)
+        if cart.version != merchant.catalog_version:
+            self._reprice(merchant, cart)
+        return cart
+
+    def _reprice(self, merchant: Merchant, cart: Cart) -> None:
+        items = self._items(merchant)
+        issues = []
+        for item_id, quantity in list(cart.quantities.items()):
+            item = items.get(item_id)
+            before = cart.prices.get(item_id)
+            if item is None:
+                issues.append(f"{item_id} was removed from the menu")
+                self._set(cart, item_id, None, 0)
+            elif not item.is_available:
+                if before is not None:
+                    issues.append(f"{item.name} is no longer available")
+                self._set(cart, item_id, None, quantity)
+            else:
+                if before is not None and before != item.price_inr:
+                    issues.append(f"{item.name} is now ₹{item.price_inr} (was ₹{before})")
+                self._set(cart, item_id, item, quantity)
+        cart.issues = issues
+        cart.version = merchant.catalog_version
+
+    @staticmethod
+    def _set(cart: Cart, item_id: str, item: CatalogItem | None, quantity: int) -> None:
+        """Set one line; ``item`` None counts it as unavailable."""
+        before = cart.prices.pop(item_id, None)
+        if before is not None:
+            cart.subtotal_inr -= before * cart.quantities[item_id]
+        if quantity <= 0:
+            cart.quantities.pop(item_id, None)
+            return
+        cart.quantities[item_id] = quantity
+        if item is not None:
+            cart.prices[item_id] = item.price_inr
+            cart.subtotal_inr += item.price_inr * quantity
+
+    # ── operations ──────────────────────────────────────────────────────────
+
+    def add(self, merchant: Merchant, session_id: str, item_id: str, quantity: int = 1) -> Cart:
+        """Add ``quantity`` of an item; raises ItemNotFound or CartError."""
+        if quantity <= 0:
+            raise CartError("Quantity must be positive")
+        item = self._item(merchant, item_id)
+        if not item.is_available:
+            raise CartError(f"{item.name} is not available right now")
+        cart = self._cart(merchant, session_id, create=True)
+        total = cart.quantities.get(item_id, 0) + quantity
+        if total > MAX_QUANTITY:
+            raise CartError(f"At most {MAX_QUANTITY} of one item per order")
+        self._set(cart, item_id, item, total)
+        cart.issues = []
+        self.operations += 1
+        return cart
+
+    def set_quantity(self, merchant: Merchant, session_id: str, item_id: str, quantity: int) -> Cart:
+        """Set an item's quantity; 0 removes it."""
+        if quantity < 0 or quantity > MAX_QUANTITY:
+            raise CartError(f"Quantity must be between 0 and {MAX_QUANTITY}")
+        if quantity == 0:
+            return self.remove(merchant, session_id, item_id)
+        item = self._item(merchant, item_id)
+        if not item.is_available:
+            raise CartError(f"{item.name} is not available right now")
+        cart = self._cart(merchant, session_id, create=True)
+        self._set(cart, item_id, item, quantity)
+        cart.issues = []
+        self.operations += 1
+        return cart
+
+    def remove(self, merchant: Merchant, session_id: str, item_id: str) -> Cart:
+        cart = self._cart(merchant, session_id, create=True)
+        self._set(cart, item_id, None, 0)
+        cart.issues = []
+        self.operations += 1
+        return cart
+
+    def clear(self, session_id: str) -> None:
+        self._carts.pop(session_id, None)
+
+    def get(self, merchant: Merchant, session_id: str) -> Cart | None:
+        return self._cart(merchant, session_id)
+
+    # ── views ───────────────────────────────────────────────────────────────
+
+    def view(self, merchant: Merchant, session_id: str) -> CartView:
+        cart = self._cart(merchant, session_id) or Cart(session_id, merchant.id)
+        items = self._items(merchant)
+        lines = []
+        for item_id, quantity in cart.quantities.items():
+            item = items[item_id]
+            price = cart.prices.get(item_id, item.price_inr)
+            lines.append(CartLine(
+                item_id=item_id, name=item.name, quantity=quantity, unit_price_inr=price,
+                total_price_inr=price * quantity, available=item_id in cart.prices,
+            ))
+        shortfall = max(0, merchant.min_order_inr - cart.subtotal_inr)
+        issues = list(cart.issues)
+        if lines and shortfall:
+            issues.append(f"₹{shortfall} more needed for the ₹{merchant.min_order_inr} minimum order")
+        return CartView(
+            session_id=session_id,
+            merchant_id=merchant.id,
+            lines=lines,
+            subtotal_inr=cart.subtotal_inr,
+            min_order_inr=merchant.min_order_inr,
+            shortfall_inr=shortfall,
+            issues=issues,
+            can_checkout=bool(lines) and not shortfall and all(line.available for line in lines),
+        )
+
+    def summary(self, merchant: Merchant, session_id: str) -> str | None:
+        """One-line cart state for the agent's prompt, or None for an empty cart.
+
+        ``[Cart: 2× Chocolate Cake ₹1000 | Subtotal ₹1000 | Min order ₹500 met]``
+        """
+        cart = self._cart(merchant, session_id)
+        if cart is None or not cart.quantities:
+            return None
+        items = self._items(merchant)
+        parts = []
+        for item_id, quantity in cart.quantities.items():
+            price = cart.prices.get(item_id)
+            name = items[item_id].name
+            parts.append(f"{quantity}× {name} unavailable" if price is None else f"{quantity}× {name} ₹{price * quantity}")
+        shortfall = merchant.min_order_inr - cart.subtotal_inr
+        minimum = (
+            f"₹{shortfall} short of ₹{merchant.min_order_inr} min order" if shortfall > 0
+            else f"Min order ₹{merchant.min_order_inr} met"
+        )
+        text = f"[Cart: {', '.join(parts)} | Subtotal ₹{cart.subtotal_inr} | {minimum}"
+        if cart.issues:
+            text += f" | {'; '.join(cart.issues)}"
+        return text + "]"
+
+    def checkout(
+        self,
+        merchant: Merchant,
+        session_id: str,
+        engine: OrderEngine,
+        customer_phone: str,
+        message_key: str,
+        delivery_address: str | None = None,
+        notes: str | None = None,
+    ) -> tuple[Order, bool]:
+        """Place the cart as an order and empty it; returns OrderEngine.create's result.
+
+        Raises CartError when the cart can't be ordered as it stands. A
+        retry with the same ``message_key`` returns the order already placed.
+        Never blocks on the order log: call ``engine.wait_durable()`` (off
+        the event loop) before confirming the order.
+        """
+        existing = engine.find(merchant.id, customer_phone, message_key)
+        if existing is not None:
+            return existing, False
+        view = self.view(merchant, session_id)
+        if not view.can_checkout:
+            raise CartError("; ".join(view.issues) or "Cart is empty")
+        items = [
+            OrderItem(catalog_item_id=line.item_id, name=line.name, quantity=line.quantity,
+                      unit_price_inr=line.unit_price_inr, total_price_inr=line.total_price_inr)
+            for line in view.lines
+        ]
+        order, created = engine.create(
+            merchant.id, customer_phone, items, message_key, delivery_address=delivery_address, notes=notes,
+            commission_pct=merchant.commission_pct, wait=False,
+        )
+        if created:
+            self.clear(session_id)
+            self.checkouts += 1
+        return order, created
+
+    def stats(self) -> dict:
+        return {
+            "carts": len(self._carts),
+            "operations": self.operations,
+            "checkouts": self.checkouts,
+            "expired": self.expired,
+        }
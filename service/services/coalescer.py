@@ -0,0 +1,122 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+_HANDOFF = object()  # a burst's future resolves to this when its leader is cancelled
+
+
+class _Burst:
+    __slots__ = ("messages", "arrived", "future", "members", "leaderless")
+
+    def __init__(self, message: str):
+        self.messages = [message]
+        self.arrived = asyncio.Event()   # set whenever another message joins
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.members = 0                 # non-leaders waiting on ``future``
+        self.leaderless = False          # handed off, and no member has taken over yet
+
+
+class BurstCoalescer:
+    """Merges rapid-fire messages of one session into a single agent call.
+
+    The first message of a burst becomes its leader and waits ``window``
+    seconds; every message arriving in that time joins the burst and restarts
+    the wait, up to ``max_wait`` seconds in total. The leader then runs the
+    merged prompt once and every member gets the same result. A leader
+    cancelled before it has one (its client left) hands the burst to a
+    waiting member, which runs it straight away.
+    """
+
+    def __init__(self, max_wait: float):
+        self.max_wait = max_wait
+        self._open: dict[str, _Burst] = {}
+        self.bursts = 0
+        self.messages = 0
+        self.calls_saved = 0
+        self.handoffs = 0
+
+    async def submit(
+        self,
+        session_id: str,
+        message: str,
+        window: float,
+        run: Callable[[str], Awaitable[T]],
+    ) -> tuple[T, bool]:
+        """Returns ``(result, merged)`` — ``merged`` is True for non-leader members."""
+        self.messages += 1
+        burst = self._open.get(session_id)
+        if burst is not None:
+            burst.messages.append(message)
+            burst.arrived.set()
+            self.calls_saved += 1
+            return await self._follow(burst, run)
+
+        burst = self._open[session_id] = _Burst(message)
+        self.bursts += 1
+        try:
+            deadline = time.monotonic() + self.max_wait
+            while True:
+                burst.arrived.clear()
+                timeout = min(window, deadline - time.monotonic())
+                if timeout <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(burst.arrived.wait(), timeout)
+                except asyncio.TimeoutError:
+                    break
+        except asyncio.CancelledError:
+            self._hand_off(burst)
+            raise
+        finally:
+            # Later messages start a new burst rather than joining a closed one
+            del self._open[session_id]
+        return await self._lead(burst, run), False
+
+    async def _follow(self, burst: _Burst, run: Callable[[str], Awaitable[T]]) -> tuple[T, bool]:
+        while True:
+            burst.members += 1
+            try:
+                result = await asyncio.shield(burst.future)
+            finally:
+                burst.members -= 1
+            if result is not _HANDOFF:
+                return result, True
+            if burst.leaderless:  # the first member to wake takes over; the rest wait on it
+                burst.leaderless = False
+                return await self._lead(burst, run), True
+
+    async def _lead(self, burst: _Burst, run: Callable[[str], Awaitable[T]]) -> T:
+        """Run the merged prompt and give every member the outcome."""
+        try:
+            result = await run("\n".join(burst.messages))
+        except asyncio.CancelledError:
+            self._hand_off(burst)
+            raise
+        except BaseException as exc:
+            burst.future.set_exception(exc)
+            burst.future.exception()  # members re-raise it; don't log as unretrieved
+            raise
+        burst.future.set_result(result)
+        return result
+
+    def _hand_off(self, burst: _Burst) -> None:
+        """The leader was cancelled: wake the members so one of them leads instead."""
+        if not burst.members:
+            burst.future.cancel()
+            return
+        future, burst.future = burst.future, asyncio.get_running_loop().create_future()
+        burst.leaderless = True
+        self.handoffs += 1
+        future.set_result(_HANDOFF)
+
+    def stats(self) -> dict:
+        return {
+            "open_bursts": len(self._open),
+            "bursts": self.bursts,
+            "messages": self.messages,
+            "agent_calls_saved": self.calls_saved,
+            "handoffs": self.handoffs,
+        }
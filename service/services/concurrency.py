@@ -0,0 +1,80 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+
+class QueueTimeout(Exception):
+    """Raised when a request waited longer than the queue timeout for a free slot."""
+
+
+class _TenantSlot:
+    __slots__ = ("semaphore", "users")
+
+    def __init__(self, limit: int):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.users = 0  # holders + waiters; entry is dropped when this reaches 0
+
+
+class InflightLimiter:
+    """Bounds in-flight agent calls globally and per tenant (merchant).
+
+    The tenant slot is taken before the global one, so a merchant that is
+    already at its own cap queues without occupying capacity other merchants
+    could use.
+    """
+
+    def __init__(self, max_inflight: int, max_per_tenant: int, queue_timeout: float | None = None):
+        self.max_inflight = max_inflight
+        self.max_per_tenant = max_per_tenant
+        self.queue_timeout = queue_timeout
+        self._global = asyncio.Semaphore(max_inflight)
+        self._tenants: dict[str, _TenantSlot] = {}
+        self.inflight = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def slot(self, tenant: str):
+        """Hold one in-flight slot for ``tenant``; yields the seconds spent queueing."""
+        entry = self._tenants.get(tenant)
+        if entry is None:
+            entry = self._tenants[tenant] = _TenantSlot(self.max_per_tenant)
+        entry.users += 1
+        start = time.perf_counter()
+        self.waiting += 1
+        try:
+            try:
+                await asyncio.wait_for(self._acquire(entry), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise QueueTimeout(f"No free agent slot for '{tenant}' within {self.queue_timeout}s") from None
+            finally:
+                self.waiting -= 1
+            self.inflight += 1
+            try:
+                yield time.perf_counter() - start
+            finally:
+                self.inflight -= 1
+                self._global.release()
+                entry.semaphore.release()
+        finally:
+            entry.users -= 1
+            if entry.users == 0:
+                self._tenants.pop(tenant, None)
+
+    async def _acquire(self, entry: _TenantSlot) -> None:
+        await entry.semaphore.acquire()
+        try:
+            await self._global.acquire()
+        except BaseException:
+            entry.semaphore.release()
+            raise
+
+    def stats(self) -> dict:
+        return {
+            "inflight": self.inflight,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+            "max_inflight": self.max_inflight,
+            "max_per_tenant": self.max_per_tenant,
+        }
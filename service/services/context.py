@@ -0,0 +1,175 @@
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from models.merchant import CatalogItem, Merchant
+from services.retrieval import CatalogRetriever
+
+
+def build_agent_message(merchant: Merchant, message: str) -> str:
+    """Inject merchant catalog so the agent always has product context."""
+    return (
+        f"[Merchant: {merchant.name} | Catalog: {merchant.catalog_summary}]\n"
+        f"{message}"
+    )
+
+
+def catalog_facts(merchant: Merchant, items: list[CatalogItem] | None = None) -> dict[str, str]:
+    """The facts catalog_summary conveys, keyed so two versions can be diffed.
+
+    ``items`` narrows the item facts to a subset (what a session was shown).
+    """
+    hours = merchant.operating_hours
+    facts = {
+        "Merchant": merchant.name,
+        "Min order": f"₹{merchant.min_order_inr}",
+        "Delivery": merchant.delivery_area,
+        "Hours": f"{hours.open_time}–{hours.close_time}",
+    }
+    for item in merchant.catalog if items is None else items:
+        if item.is_available:
+            facts[f"item:{item.name}"] = f"₹{item.price_inr}"
+    return facts
+
+
+def diff_facts(old: dict[str, str], new: dict[str, str]) -> list[str]:
+    """Compact, human-readable changes from ``old`` to ``new``."""
+    changes = []
+    for key, value in new.items():
+        before = old.get(key)
+        if before == value:
+            continue
+        if key.startswith("item:"):
+            name = key[len("item:"):]
+            changes.append(f"{name} ({value}) added" if before is None else f"{name} now {value}")
+        else:
+            changes.append(f"{key} now {value}")
+    for key in old.keys() - new.keys():
+        if key.startswith("item:"):
+            changes.append(f"{key[len('item:'):]} unavailable")
+    return changes
+
+
+@dataclass
+class ContextTurn:
+    """One agent turn's prompt plus what the session will have seen once it's sent."""
+    session_id: str
+    message: str
+    prompt: str
+    kind: str                   # "full" | "diff" | "none"
+    version: int
+    facts: dict[str, str] = field(repr=False)
+    context_bytes: int = 0      # bytes of catalog context in the prompt
+    full_bytes: int = 0         # bytes the full context would have cost
+
+
+_HISTORY = 3  # earlier messages that steer relevance retrieval
+
+
+@dataclass
+class _Seen:
+    version: int
+    facts: dict[str, str]
+    turns_since_full: int = 0
+    recent: deque = field(default_factory=lambda: deque(maxlen=_HISTORY))
+
+
+class CatalogContextTracker:
+    """Sends each session the merchant catalog only when its agent hasn't seen it.
+
+    The Lyzr session keeps earlier turns, so the full summary goes out on the
+    first turn, every ``refresh_turns`` agent turns after that, and whenever
+    the session's last view is no longer available. A catalog change between
+    turns is sent as a compact diff. Turns are recorded only after the agent
+    call succeeds, so a failed call never leaves a session believing it saw
+    context it didn't.
+
+    Catalogs the ``retriever`` considers large are never sent whole: the
+    session gets category headers plus the items relevant to the
+    conversation, and later turns add relevant items it hasn't seen yet.
+    """
+
+    def __init__(
+        self,
+        refresh_turns: int = 20,
+        max_sessions: int = 100_000,
+        retriever: CatalogRetriever | None = None,
+    ):
+        self.refresh_turns = refresh_turns
+        self.max_sessions = max_sessions
+        self.retriever = retriever
+        self._sessions: OrderedDict[str, _Seen] = OrderedDict()
+        self.counts = {"full": 0, "diff": 0, "none": 0}
+        self.bytes_sent = 0
+        self.bytes_saved = 0
+
+    def prepare(self, merchant: Merchant, session_id: str, message: str) -> ContextTurn:
+        version = merchant.catalog_version
+        full_prompt = build_agent_message(merchant, message)
+        full_bytes = len(full_prompt.encode()) - len(message.encode())
+        seen = self._sessions.get(session_id)
+        retriever = self.retriever if self.retriever is not None and self.retriever.applies(merchant) else None
+        relevant = retriever.rank(merchant, message, tuple(seen.recent) if seen else ()) if retriever else []
+
+        def turn(prompt: str, kind: str, facts: dict[str, str]) -> ContextTurn:
+            context_bytes = len(prompt.encode()) - len(message.encode())
+            return ContextTurn(session_id, message, prompt, kind, version, facts, context_bytes, full_bytes)
+
+        if seen is None or seen.turns_since_full + 1 >= self.refresh_turns:
+            if retriever is None:
+                return turn(full_prompt, "full", catalog_facts(merchant))
+            summary, shown = retriever.summary(merchant, relevant)
+            prompt = f"[Merchant: {merchant.name} | Catalog: {summary}]\n{message}"
+            return turn(prompt, "full", catalog_facts(merchant, shown))
+
+        if retriever is None:
+            if seen.version == version:
+                return turn(message, "none", seen.facts)
+            facts = catalog_facts(merchant)
+            changes = diff_facts(seen.facts, facts)
+        else:
+            # Only re-check what the session was shown; unseen items arrive when relevant
+            known = [i for i in merchant.catalog if f"item:{i.name}" in seen.facts]
+            facts = catalog_facts(merchant, known) if seen.version != version else dict(seen.facts)
+            changes = diff_facts(seen.facts, facts)
+            unseen = [i for i in relevant if f"item:{i.name}" not in facts]
+            budget = retriever.budget_bytes - sum(len(c.encode()) + 2 for c in changes)
+            extra = retriever.fit(unseen, budget)
+            if extra:
+                changes.append(f"Relevant items: {retriever.render(extra)}")
+                facts.update(catalog_facts(merchant, extra))
+        if not changes:
+            return turn(message, "none", facts)
+        header = f"[Catalog update: {'; '.join(changes)}]\n"
+        if retriever is None and len(header.encode()) >= full_bytes:
+            return turn(full_prompt, "full", facts)
+        return turn(header + message, "diff", facts)
+
+    def record(self, turn: ContextTurn) -> None:
+        """Mark ``turn``'s context as delivered to its session."""
+        seen = self._sessions.get(turn.session_id)
+        turns_since_full = 0 if turn.kind == "full" or seen is None else seen.turns_since_full + 1
+        recent = seen.recent if seen is not None else deque(maxlen=_HISTORY)
+        recent.append(turn.message)
+        self._sessions[turn.session_id] = _Seen(turn.version, turn.facts, turns_since_full, recent)
+        self._sessions.move_to_end(turn.session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        self.counts[turn.kind] += 1
+        self.bytes_sent += turn.context_bytes
+        self.bytes_saved += turn.full_bytes - turn.context_bytes
+
+    def forget(self, session_id: str) -> None:
+        """Send the full catalog on this session's next turn."""
+        self._sessions.pop(session_id, None)
+
+    def stats(self) -> dict:
+        stats = {
+            "sessions": len(self._sessions),
+            "full_sends": self.counts["full"],
+            "diff_sends": self.counts["diff"],
+            "skipped": self.counts["none"],
+            "bytes_sent": self.bytes_sent,
+            "bytes_saved": self.bytes_saved,
+        }
+        if self.retriever is not None:
+            stats["retrieval"] = self.retriever.stats()
+        return stats
@@ -0,0 +1,133 @@
+import re
+from models.merchant import Merchant
+from services.search import CatalogSearch
+
+# Anything that reads like an order or a multi-part request goes to the agent
+_ACTION = re.compile(
+    r"\b(order|chahiye|chahie|add|book|bhej\w*|deliver\w*|cancel|change|address|pay\w*|"
+    r"want|need|send|kal|aaj|tomorrow|today)\b"
+)
+_MIN_ORDER = re.compile(r"\b(min(imum)?\s*order|kam\s*se\s*kam)\b")
+_INTENTS = [
+    ("hours", re.compile(
+        r"\b(timing|timings|hours|open|close|closed|khul\w*|band|kab\s*tak|kitne\s*baje|time\s*kya)\b"
+    )),
+    ("price", re.compile(r"\b(price|rate|cost|kitne|kitna|kitni|how\s*much|kya\s*daam|daam)\b")),
+    ("menu", re.compile(
+        r"\b(menu|catalog\w*|items?\s*(list)?|kya\s*kya|kya\s*milta|what\s*do\s*you\s*(have|sell))\b"
+    )),
+]
+_MAX_WORDS = 8
+# "2 vanilla cakes", "teen brownie" — a count of items; "1 kg cake" is a weight, not a count
+_QUANTITY = re.compile(r"\b(\d{1,3}|two|three|four|five|teen|char|paanch)\b")
+_WEIGHT = re.compile(r"\d\s*(kg|kilo\w*|g|gm|grams?|lbs?|pounds?|ml|l|ltr|litres?|inch\w*)\b")
+_NUMBER_WORDS = {"two": 2, "three": 3, "four": 4, "five": 5, "teen": 3, "char": 4, "paanch": 5}
+
+
+def classify(message: str) -> str | None:
+    """Intent of a short lookup question, or None when the agent should answer."""
+    text = message.lower()
+    if len(text.split()) > _MAX_WORDS:
+        return None
+    if _MIN_ORDER.search(text):
+        return "min_order"  # checked first — "order" here isn't an order action
+    if _ACTION.search(text):
+        return None
+    for intent, pattern in _INTENTS:
+        if pattern.search(text):
+            return intent
+    return None
+
+
+def _menu(merchant: Merchant) -> str:
+    lines = [f"• {i.name} — ₹{i.price_inr}" for i in merchant.catalog if i.is_available]
+    if not lines:
+        return f"{merchant.emoji} {merchant.name} mein abhi koi item available nahi hai. Thodi der baad try karein!"
+    return (
+        f"{merchant.emoji} {merchant.name} ka menu:\n" + "\n".join(lines) +
+        f"\nMin order ₹{merchant.min_order_inr}. Kya order karna chahenge?"
+    )
+
+
+def _hours(merchant: Merchant) -> str:
+    hours = merchant.operating_hours
+    days = "roz" if len(hours.days) == 7 else ", ".join(hours.days) + " ko"
+    reply = f"Hum {days} {hours.open_time} se {hours.close_time} tak khule hain."
+    if hours.order_cutoff:
+        reply += f" Same-day order {hours.order_cutoff} tak le sakte hain."
+    return reply
+
+
+def _quantity(text: str) -> int | None:
+    """How many items ``text`` asks about: 1 when it names no count, None when unclear."""
+    if _WEIGHT.search(text):
+        return None  # "1 kg cake" — priced by weight, not per item
+    counts = [m.group(1) for m in _QUANTITY.finditer(text)]
+    if len(counts) > 1:
+        return None  # "2 choco aur 1 vanilla" — a cart question for the agent
+    if not counts:
+        return 1
+    count = counts[0]
+    return int(count) if count.isdigit() else _NUMBER_WORDS[count]
+
+
+def _price(merchant: Merchant, message: str, search: CatalogSearch) -> str | None:
+    quantity = _quantity(message.lower())
+    if not quantity:
+        return None
+    hits = search.search(merchant, message, limit=1, available_only=False)
+    if not hits:
+        return None  # "kitne ka hai?" without an item — let the agent use context
+    item = hits[0].item
+    if not item.is_available:
+        return f"Sorry, {item.name} abhi available nahi hai. Menu dekhna chahenge?"
+    if quantity > 1:
+        return (
+            f"{item.name} ₹{item.price_inr} ka hai, to {quantity} ka total ₹{item.price_inr * quantity}. "
+            "Order karna hai?"
+        )
+    return f"{item.name} ₹{item.price_inr} ka hai. Order karna hai?"
+
+
+def _min_order(merchant: Merchant) -> str:
+    return f"Minimum order ₹{merchant.min_order_inr} ka hai. Delivery: {merchant.delivery_area}."
+
+
+class FastPath:
+    """Answers catalog/hours/price lookups locally, without calling the agent.
+
+    Only merchants with ``fastpath_enabled`` are eligible; unclassified or
+    ambiguous messages return None and fall through to the agent.
+    """
+
+    def __init__(self, search: CatalogSearch | None = None):
+        self.search = search or CatalogSearch()
+        self.checked = 0
+        self.hits: dict[str, int] = {}
+
+    def answer(self, merchant: Merchant, message: str) -> str | None:
+        if not merchant.fastpath_enabled:
+            return None
+        self.checked += 1
+        intent = classify(message)
+        if intent == "menu":
+            reply = _menu(merchant)
+        elif intent == "hours":
+            reply = _hours(merchant)
+        elif intent == "price":
+            reply = _price(merchant, message, self.search)
+        elif intent == "min_order":
+            reply = _min_order(merchant)
+        else:
+            reply = None
+        if reply is not None:
+            self.hits[intent] = self.hits.get(intent, 0) + 1
+        return reply
+
+    def stats(self) -> dict:
+        total_hits = sum(self.hits.values())
+        return {
+            "checked": self.checked,
+            "hits": dict(self.hits),
+            "hit_rate": round(total_hits / self.checked, 4) if self.checked else 0.0,
+        }
@@ -0,0 +1,201 @@
+from array import array
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Callable, Iterable
+import numpy as np
+from models.merchant import Merchant, OperatingHours
+from services.orders import IST
+
+DAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_DAY_NAMES = {"Mon": "Monday", "Tue": "Tuesday", "Wed": "Wednesday", "Thu": "Thursday",
+              "Fri": "Friday", "Sat": "Saturday", "Sun": "Sunday"}
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+_NEVER = 0xFFFF
+
+# Minute states
+CLOSED, OPEN, AFTER_CUTOFF = 0, 1, 2  # AFTER_CUTOFF: open, but past the same-day order cutoff
+
+
+def _minutes(hhmm: str) -> int:
+    hours, minutes = hhmm.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def minute_of_week(when: datetime) -> int:
+    """Minutes since Monday 00:00 IST."""
+    local = when.astimezone(IST)
+    return local.weekday() * MINUTES_PER_DAY + local.hour * 60 + local.minute
+
+
+@dataclass(frozen=True, eq=False)
+class WeeklySchedule:
+    """One schedule compiled to a state per minute of the IST week.
+
+    ``next_open[m]`` is the minute of week the merchant next opens at (m
+    itself when open), so both "open now?" and "when do you open?" are one
+    index each.
+    """
+    states: bytes
+    next_open: array
+
+    def state_at(self, when: datetime) -> int:
+        return self.states[minute_of_week(when)]
+
+    def next_opening(self, when: datetime, minute: int | None = None) -> datetime | None:
+        """Start of the next open minute at or after ``when``; None if never open."""
+        if minute is None:
+            minute = minute_of_week(when)
+        target = self.next_open[minute]
+        if target == _NEVER:
+            return None
+        start = when.astimezone(IST).replace(second=0, microsecond=0)
+        return start + timedelta(minutes=(target - minute) % MINUTES_PER_WEEK)
+
+
+@lru_cache(maxsize=4096)
+def compile_hours(open_time: str, close_time: str, order_cutoff: str | None, days: tuple[str, ...]) -> WeeklySchedule:
+    """Compile one schedule; identical schedules share one object.
+
+    A close time at or before the open time runs past midnight ("18:00" to
+    "02:00"); the cutoff is read on the same clock, so "01:00" for that
+    schedule means 1am after opening.
+    """
+    states = np.zeros(MINUTES_PER_WEEK, np.uint8)
+    opens, closes = _minutes(open_time), _minutes(close_time)
+    length = (closes - opens) % MINUTES_PER_DAY or MINUTES_PER_DAY
+    cutoff = length if order_cutoff is None else (_minutes(order_cutoff) - opens) % MINUTES_PER_DAY
+    shift = np.where(np.arange(length) < cutoff, OPEN, AFTER_CUTOFF).astype(np.uint8)
+    for day in days:
+        start = DAYS.index(day) * MINUTES_PER_DAY + opens
+        states[(start + np.arange(length)) % MINUTES_PER_WEEK] = shift
+
+    open_minutes = np.flatnonzero(states)
+    if len(open_minutes):
+        upcoming = np.searchsorted(open_minutes, np.arange(MINUTES_PER_WEEK))
+        targets = np.append(open_minutes, open_minutes[0])[upcoming]  # past the last opening, wrap the week
+    else:
+        targets = np.full(MINUTES_PER_WEEK, _NEVER)
+    next_open = array("H", targets.astype(np.uint16).tobytes())
+    return WeeklySchedule(states.tobytes(), next_open)
+
+
+def schedule_for(hours: OperatingHours) -> WeeklySchedule:
+    return compile_hours(hours.open_time, hours.close_time, hours.order_cutoff, tuple(hours.days))
+
+
+_NO_HOURS = OperatingHours(open_time="00:00", close_time="00:00", order_cutoff=None, days=[])
+
+
+def _when(opening: datetime, now: datetime) -> str:
+    days = (opening.date() - now.astimezone(IST).date()).days
+    day = "aaj" if days == 0 else "kal" if days == 1 else _DAY_NAMES[DAYS[opening.weekday()]] + " ko"
+    return f"{day} {opening.hour:02d}:{opening.minute:02d} baje"
+
+
+class HoursGate:
+    """Answers messages to closed merchants locally, without the agent.
+
+    Schedules are compiled once per distinct set of hours and remembered
+    per merchant until its operating_hours object is replaced, so a check
+    is a dict hit plus one table index.
+    """
+
+    def __init__(self, clock: Callable[[], datetime] = lambda: datetime.now(IST)):
+        self.clock = clock
+        self._schedules: dict[str, tuple[OperatingHours, WeeklySchedule]] = {}
+        self.checked = 0
+        self.closed = 0
+
+    def _schedule(self, merchant: Merchant) -> WeeklySchedule:
+        hours = merchant.operating_hours
+        cached = self._schedules.get(merchant.id)
+        if cached is None or cached[0] is not hours:
+            cached = self._schedules[merchant.id] = (hours, schedule_for(hours))
+        return cached[1]
+
+    def check(self, merchant: Merchant) -> str | None:
+        """A "we're closed, back at …" reply, or None while the merchant is open."""
+        self.checked += 1
+        now = self.clock()
+        schedule = self._schedule(merchant)
+        minute = minute_of_week(now)
+        if schedule.states[minute] != CLOSED:
+            return None
+        self.closed += 1
+        opening = schedule.next_opening(now, minute)
+        if opening is None:
+            return f"{merchant.emoji} {merchant.name} abhi orders nahi le raha hai. Thodi der baad try karein!"
+        return (
+            f"{merchant.emoji} {merchant.name} abhi band hai. Hum {_when(opening, now)} khulenge — "
+            "tab aapka order le lenge!"
+        )
+
+    def stats(self) -> dict:
+        return {"checked": self.checked, "closed_replies": self.closed}
+
+
+class HoursIndex:
+    """Open/closed state of many merchants at one instant, vectorized.
+
+    Merchants sharing hours share a compiled schedule; the schedules form
+    one (schedules × minutes) matrix, so "who's open now" is one column
+    lookup and a gather over merchant rows.
+    """
+
+    def __init__(self):
+        self._ids: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._codes = np.zeros(0, np.int32)
+        self._schedules: list[WeeklySchedule] = []
+        self._schedule_codes: dict[int, int] = {}
+        self._matrix: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _code(self, schedule: WeeklySchedule) -> int:
+        code = self._schedule_codes.get(id(schedule))
+        if code is None:
+            code = self._schedule_codes[id(schedule)] = len(self._schedules)
+            self._schedules.append(schedule)
+            self._matrix = None
+        return code
+
+    def update(self, entries: Iterable[tuple[str, OperatingHours]]) -> None:
+        """Add merchants or replace their hours."""
+        codes = self._codes.tolist()
+        for merchant_id, hours in entries:
+            code = self._code(schedule_for(hours))
+            row = self._rows.get(merchant_id)
+            if row is None:
+                self._rows[merchant_id] = len(self._ids)
+                self._ids.append(merchant_id)
+                codes.append(code)
+            else:
+                codes[row] = code
+        self._codes = np.array(codes, np.int32)
+
+    def remove(self, merchant_id: str) -> None:
+        """Stop listing a merchant (its row stays, never open)."""
+        if merchant_id in self._rows:
+            self.update([(merchant_id, _NO_HOURS)])
+
+    def open_at(self, when: datetime, accepting_orders: bool = False) -> list[str]:
+        """IDs of merchants open at ``when`` — or, with ``accepting_orders``, still before their cutoff."""
+        codes = self._codes  # before the matrix: an update adds schedules before codes that use them
+        if not len(codes):
+            return []
+        matrix = self._matrix
+        if matrix is None:
+            matrix = self._matrix = np.frombuffer(b"".join(s.states for s in self._schedules), np.uint8).reshape(
+                len(self._schedules), MINUTES_PER_WEEK,
+            )
+        column = matrix[:, minute_of_week(when)]
+        wanted = column == OPEN if accepting_orders else column != CLOSED
+        ids = self._ids
+        return [ids[i] for i in np.flatnonzero(wanted[codes]).tolist()]
+
+    def stats(self) -> dict:
+        return {"merchants": len(self._ids), "schedules": len(self._schedules)}
@@ -0,0 +1,26 @@
+import httpx
+from fastapi import FastAPI
+from config import settings
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Pooled client for outbound calls — keeps TLS connections alive between requests."""
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(10.0, connect=5.0),
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive,
+        ),
+    )
+
+
+def http_client_for(app: FastAPI) -> httpx.AsyncClient:
+    """App-scoped HTTP client, created on first use.
+
+    Not built at startup: its transport imports httpcore, which would delay
+    the first response by a few hundred ms.
+    """
+    state = app.state
+    if not hasattr(state, "http"):
+        state.http = create_http_client()
+    return state.http
@@ -1,14 +1,175 @@
-import os
-from lyzr import Studio
+import asyncio
+import inspect
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+def _studio():
+    """The SDK's Studio class. Imported on first use: the SDK is slow to import."""
+    from lyzr import Studio
+    return Studio
 
 
 def init_lyzr(api_key: str, agent_id: str):
-    """Initialize Lyzr agent by fetching an existing agent. Agent ID is mandatory."""
-    os.environ["LYZR_API_KEY"] = api_key
-    return Studio().get_agent(agent_id)
+    """Initialize Lyzr agent by fetching an existing agent. Agent ID is mandatory.
+
+    The key is passed to Studio explicitly (never via os.environ), so agents for
+    different tenants can be initialized in parallel on separate threads.
+    """
+    return _studio()(api_key=api_key).get_agent(agent_id)
 
 
 def run_agent(agent, message: str, session_id: str) -> str:
     """Send a message to the agent and return the text response."""
     response = agent.run(message, session_id=session_id)
     return response.response
+
+
+async def arun_agent(agent, message: str, session_id: str) -> str:
+    """Async run_agent — awaits the SDK's native ``arun`` so no OS thread is held.
+
+    Agents without a coroutine ``arun`` fall back to ``run`` on a worker thread.
+    """
+    arun = getattr(agent, "arun", None)
+    if inspect.iscoroutinefunction(arun):
+        response = await arun(message, session_id=session_id)
+    else:
+        response = await asyncio.to_thread(agent.run, message, session_id=session_id)
+    return response.response
+
+
+async def astream_agent(agent, message: str, session_id: str) -> AsyncIterator[str]:
+    """Yield reply text pieces as the agent produces them.
+
+    Agents that can't stream yield their whole reply as a single piece.
+    """
+    arun = getattr(agent, "arun", None)
+    if not inspect.iscoroutinefunction(arun):
+        yield await arun_agent(agent, message, session_id)
+        return
+
+    stream = await arun(message, session_id=session_id, stream=True)
+    if not hasattr(stream, "__aiter__"):
+        yield stream.response  # SDK returned a complete response instead of a stream
+        return
+    streamed = False
+    async for chunk in stream:
+        if chunk.done:
+            # The final chunk repeats the full text; only needed if nothing streamed
+            if not streamed and chunk.content:
+                yield chunk.content
+            break
+        piece = chunk.delta or chunk.content
+        if piece:
+            streamed = True
+            yield piece
+
+
+class AgentHandlePool:
+    """Up to ``size`` reusable agent handles for one (api_key, agent_id).
+
+    Each handle comes from its own Studio client, so concurrent sessions of a
+    merchant don't share one SDK object or HTTP connection pool. Handles are
+    created lazily, only when every existing one is leased.
+    """
+
+    def __init__(self, create: Callable[[], Awaitable[Any]], size: int, first: Any = None):
+        self.size = size
+        self._create = create
+        self._slots = asyncio.Semaphore(size)  # one per lease, so at most ``size`` handles
+        self._idle: list = []
+        self._total = 0
+        self.created = 0  # handles fetched so far, including ``first``
+        self.leased = 0
+        if first is not None:
+            self.created = 1
+            self._idle.append(first)
+            self._total = 1
+
+    async def acquire(self) -> Any:
+        """Lease an idle handle, or fetch a new one when none is idle.
+
+        A failed fetch gives its slot back, so the next waiter tries the
+        fetch itself instead of waiting for a handle that will never come.
+        """
+        await self._slots.acquire()
+        if self._idle:
+            handle = self._idle.pop()
+        else:
+            self._total += 1
+            try:
+                handle = await self._create()
+            except BaseException:
+                self._total -= 1
+                self._slots.release()
+                raise
+            self.created += 1
+        self.leased += 1
+        return handle
+
+    @property
+    def ready(self) -> bool:
+        """True once a handle exists, so a lease won't wait on a fetch."""
+        return self.created > 0
+
+    async def warm(self) -> None:
+        """Fetch the first handle now rather than on the first lease."""
+        if not self.ready:
+            self.release(await self.acquire())
+
+    def release(self, handle: Any) -> None:
+        self.leased -= 1
+        self._idle.append(handle)
+        self._slots.release()
+
+    @asynccontextmanager
+    async def lease(self):
+        handle = await self.acquire()
+        try:
+            yield handle
+        finally:
+            self.release(handle)
+
+    def stats(self) -> dict:
+        return {"handles": self._total, "leased": self.leased, "size": self.size, "ready": self.ready}
+
+
+@asynccontextmanager
+async def lease_agent(agent_or_pool):
+    """Lease a handle from an AgentHandlePool; a bare agent is used as-is."""
+    if isinstance(agent_or_pool, AgentHandlePool):
+        async with agent_or_pool.lease() as handle:
+            yield handle
+    else:
+        yield agent_or_pool
+
+
+def agent_pool(api_key: str, agent_id: str, size: int) -> AgentHandlePool:
+    """A pool for one agent; handles are fetched off the event loop when first needed."""
+
+    def create():
+        return asyncio.to_thread(init_lyzr, api_key=api_key, agent_id=agent_id)
+
+    return AgentHandlePool(create, size=size)
+
+
+async def load_agent_pool(api_key: str, agent_id: str, size: int) -> AgentHandlePool:
+    """A pool with its first handle already fetched."""
+    pool = agent_pool(api_key, agent_id, size)
+    await pool.warm()
+    return pool
+
+
+async def prewarm(pool: AgentHandlePool, retry_s: float = 1.0, max_retry_s: float = 30.0) -> None:
+    """Warm ``pool`` in the background, retrying with backoff until a handle is fetched."""
+    delay = retry_s
+    while not pool.ready:
+        try:
+            await pool.warm()
+        except Exception:
+            logger.exception("Agent pre-warm failed; retrying in %.0fs", delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, max_retry_s)
@@ -0,0 +1,49 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+
+class _Mailbox:
+    __slots__ = ("lock", "pending")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()  # FIFO: waiters are woken in arrival order
+        self.pending = 0            # running + waiting; mailbox is dropped at 0
+
+
+class SessionScheduler:
+    """One mailbox per session: strictly ordered within a session, parallel across sessions.
+
+    Idle mailboxes are reclaimed as soon as their last message finishes, so
+    memory tracks active conversations only.
+    """
+
+    def __init__(self):
+        self._mailboxes: dict[str, _Mailbox] = {}
+        self.max_depth = 0
+
+    @asynccontextmanager
+    async def turn(self, session_id: str):
+        """Wait for every earlier message of ``session_id`` to finish, then hold the session."""
+        box = self._mailboxes.get(session_id)
+        if box is None:
+            box = self._mailboxes[session_id] = _Mailbox()
+        box.pending += 1
+        self.max_depth = max(self.max_depth, box.pending)
+        try:
+            async with box.lock:
+                yield
+        finally:
+            box.pending -= 1
+            if box.pending == 0:
+                del self._mailboxes[session_id]
+
+    def depth(self, session_id: str) -> int:
+        box = self._mailboxes.get(session_id)
+        return box.pending if box is not None else 0
+
+    def stats(self) -> dict:
+        return {
+            "active_sessions": len(self._mailboxes),
+            "queued_messages": sum(b.pending for b in self._mailboxes.values()),
+            "max_depth": self.max_depth,
+        }
@@ -0,0 +1,718 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Protocol
+from config import settings
+from models.merchant import Merchant, OperatingHours
+
+logger = logging.getLogger(__name__)
+
+_INDEXED_FIELDS = {"id", "phone", "catalog_id", "catalog", "operating_hours"}
+
+
+class MerchantSource(Protocol):
+    def __len__(self) -> int: ...
+    def load(self, merchant_id: str) -> Merchant | None: ...
+    def id_by_phone(self, phone: str) -> str | None: ...
+    def id_by_catalog_id(self, catalog_id: str) -> str | None: ...
+    def ids_by_retailer_id(self, retailer_id: str) -> list[str]: ...
+    def ids_by_category(self, category: str, available_only: bool = True) -> list[str]: ...
+    def operating_hours(self) -> Iterator[tuple[str, OperatingHours]]: ...
+    def save(self, merchant: Merchant) -> None: ...
+    def refresh(self) -> list[str]: ...
+
+
+def _replace(index: dict[str, list[str]], merchant_id: str, before: Iterable[str], after: Iterable[str]) -> None:
+    """Move ``merchant_id`` from the ``before`` keys to the ``after`` keys.
+
+    Only keys it joins or leaves are touched. Each such list is rebuilt and
+    swapped in whole, so a reader sees it either before or after the change.
+    """
+    before, after = set(before), set(after)
+    for key in before ^ after:
+        ids = [m for m in index.get(key, ()) if m != merchant_id]
+        if key in after:
+            ids.append(merchant_id)
+        if ids:
+            index[key] = ids
+        else:
+            index.pop(key, None)
+
+
+class _Indexes:
+    """In-memory secondary indexes built from raw merchant dicts."""
+
+    def __init__(self):
+        self.by_phone: dict[str, str] = {}
+        self.by_catalog_id: dict[str, str] = {}
+        self.by_retailer_id: dict[str, list[str]] = {}
+        self.by_category: dict[str, list[str]] = {}
+        self.by_category_available: dict[str, list[str]] = {}
+        self.hours: dict[str, dict] = {}
+        self._keys: dict[str, tuple] = {}  # merchant id -> what it's indexed under, for updates
+
+    def copy(self) -> "_Indexes":
+        """A copy that can be changed without readers of this one seeing it."""
+        other = _Indexes()
+        other.by_phone = dict(self.by_phone)
+        other.by_catalog_id = dict(self.by_catalog_id)
+        other.by_retailer_id = {key: list(ids) for key, ids in self.by_retailer_id.items()}
+        other.by_category = {key: list(ids) for key, ids in self.by_category.items()}
+        other.by_category_available = {key: list(ids) for key, ids in self.by_category_available.items()}
+        other.hours = dict(self.hours)
+        other._keys = dict(self._keys)
+        return other
+
+    def add(self, data: dict) -> None:
+        """Index a merchant, replacing its previous entries if it was indexed before."""
+        merchant_id = data["id"]
+        retailer_ids: dict[str, None] = {}
+        categories: dict[str, bool] = {}
+        for item in data["catalog"]:
+            retailer_ids[item["retailer_id"]] = None
+            category = item["category"]
+            categories[category] = categories.get(category, False) or item["is_available"]
+        available = [c for c, has_available in categories.items() if has_available]
+        keys = (data["phone"], data["catalog_id"], list(retailer_ids), list(categories), available)
+        previous = self._keys.get(merchant_id)
+        self._keys[merchant_id] = keys
+        self.hours[merchant_id] = data["operating_hours"]
+        self.by_phone[data["phone"]] = merchant_id
+        self.by_catalog_id[data["catalog_id"]] = merchant_id
+        if previous is None:
+            # First sight — append in place; a bulk scan would go quadratic copying lists
+            for key in keys[2]:
+                self.by_retailer_id.setdefault(key, []).append(merchant_id)
+            for key in keys[3]:
+                self.by_category.setdefault(key, []).append(merchant_id)
+            for key in keys[4]:
+                self.by_category_available.setdefault(key, []).append(merchant_id)
+            return
+        self._drop_unique(merchant_id, previous, keys)
+        _replace(self.by_retailer_id, merchant_id, previous[2], keys[2])
+        _replace(self.by_category, merchant_id, previous[3], keys[3])
+        _replace(self.by_category_available, merchant_id, previous[4], keys[4])
+
+    def remove(self, merchant_id: str) -> None:
+        previous = self._keys.pop(merchant_id, None)
+        if previous is None:
+            return
+        self.hours.pop(merchant_id, None)
+        self._drop_unique(merchant_id, previous, (None, None))
+        _replace(self.by_retailer_id, merchant_id, previous[2], ())
+        _replace(self.by_category, merchant_id, previous[3], ())
+        _replace(self.by_category_available, merchant_id, previous[4], ())
+
+    def _drop_unique(self, merchant_id: str, previous: tuple, keys: tuple) -> None:
+        """Forget a phone / catalog ID the merchant no longer has."""
+        for index, old, new in ((self.by_phone, previous[0], keys[0]), (self.by_catalog_id, previous[1], keys[1])):
+            if old != new and index.get(old) == merchant_id:
+                del index[old]
+
+    def ids_by_category(self, category: str, available_only: bool) -> list[str]:
+        index = self.by_category_available if available_only else self.by_category
+        return list(index.get(category, ()))
+
+
+class MemorySource:
+    """Merchants already in memory — the bundled mocks, tests, small deployments."""
+
+    def __init__(self, merchants: Iterable[Merchant]):
+        self._merchants = {m.id: m for m in merchants}
+        self._indexes = _Indexes()
+        for merchant in self._merchants.values():
+            self._indexes.add(merchant.model_dump(include=_INDEXED_FIELDS))
+
+    def __len__(self) -> int:
+        return len(self._merchants)
+
+    def load(self, merchant_id: str) -> Merchant | None:
+        return self._merchants.get(merchant_id)
+
+    def id_by_phone(self, phone: str) -> str | None:
+        return self._indexes.by_phone.get(phone)
+
+    def id_by_catalog_id(self, catalog_id: str) -> str | None:
+        return self._indexes.by_catalog_id.get(catalog_id)
+
+    def ids_by_retailer_id(self, retailer_id: str) -> list[str]:
+        return list(self._indexes.by_retailer_id.get(retailer_id, ()))
+
+    def ids_by_category(self, category: str, available_only: bool = True) -> list[str]:
+        return self._indexes.ids_by_category(category, available_only)
+
+    def operating_hours(self) -> Iterator[tuple[str, OperatingHours]]:
+        for merchant in self._merchants.values():
+            yield merchant.id, merchant.operating_hours
+
+    def save(self, merchant: Merchant) -> None:
+        self._indexes.add(merchant.model_dump(include=_INDEXED_FIELDS))
+        self._merchants[merchant.id] = merchant
+
+    def refresh(self) -> list[str]:
+        return []  # nothing behind it to change
+
+
+class NdjsonSource:
+    """One merchant JSON object per line.
+
+    The file is scanned once, on first access, to record each merchant's byte
+    offset and index keys; merchants are parsed only when loaded. Saves
+    append a line (the last line for an id wins) and the file is rewritten
+    once superseded lines outweigh live ones. ``refresh`` rescans after an
+    outside edit, re-indexing only the lines that changed. A rescan parses
+    every changed line before swapping in new indexes, so a file caught
+    mid-write (a torn last line) changes nothing and is retried next time.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._offsets: dict[str, int] | None = None
+        self._lines: dict[str, tuple[int, int]] = {}  # merchant id -> (hash, length) of its current line
+        self._stamp: tuple[int, int] | None = None    # (mtime_ns, size) when last read or written by us
+        self._dead = 0                                # bytes of superseded lines
+        self._pending: list[str] = []                 # changed ids found by a rescan inside save
+        self._indexes = _Indexes()
+        self._lock = threading.Lock()
+
+    def _stat(self) -> tuple[int, int]:
+        st = self.path.stat()
+        return st.st_mtime_ns, st.st_size
+
+    def _ensure_scanned(self) -> dict[str, int]:
+        if self._offsets is None:
+            with self._lock:
+                if self._offsets is None:
+                    self.path.touch()  # a new store starts as an empty file
+                    self._scan()
+        return self._offsets
+
+    def _scan(self) -> list[str]:
+        """Re-read offsets; re-index lines that differ from last time. Returns changed ids.
+
+        Raises ValueError, leaving everything as it was, when a line doesn't parse.
+        """
+        stamp = self._stat()
+        found: dict[str, tuple[int, int, int]] = {}
+        updated: list[dict] = []
+        with self.path.open("rb") as f:
+            offset = 0
+            for line in f:
+                body = line.rstrip(b"\r\n")
+                if body.strip():
+                    found[_line_id(body)] = (offset, hash(body), len(line))
+                offset += len(line)
+            total = offset
+            for merchant_id, (offset, digest, length) in found.items():
+                if self._lines.get(merchant_id, (None,))[0] != digest:
+                    f.seek(offset)
+                    updated.append(json.loads(f.readline()))
+        removed = self._lines.keys() - found.keys()
+        if updated or removed:
+            indexes = self._indexes.copy()
+            for data in updated:
+                indexes.add(data)
+            for merchant_id in removed:
+                indexes.remove(merchant_id)
+            self._indexes = indexes
+        changed = [data["id"] for data in updated] + list(removed)
+        self._lines = {merchant_id: (digest, length) for merchant_id, (_, digest, length) in found.items()}
+        self._offsets = {merchant_id: offset for merchant_id, (offset, _, _) in found.items()}
+        self._dead = total - sum(length for _, length in self._lines.values())
+        self._stamp = stamp
+        return changed
+
+    def __len__(self) -> int:
+        return len(self._ensure_scanned())
+
+    def load(self, merchant_id: str) -> Merchant | None:
+        self._ensure_scanned()
+        with self._lock:  # a save may be rewriting the file under the offsets
+            offset = self._offsets.get(merchant_id)
+            if offset is None:
+                return None
+            with self.path.open("rb") as f:
+                f.seek(offset)
+                line = f.readline()
+        return Merchant.model_validate_json(line)
+
+    def id_by_phone(self, phone: str) -> str | None:
+        self._ensure_scanned()
+        return self._indexes.by_phone.get(phone)
+
+    def id_by_catalog_id(self, catalog_id: str) -> str | None:
+        self._ensure_scanned()
+        return self._indexes.by_catalog_id.get(catalog_id)
+
+    def ids_by_retailer_id(self, retailer_id: str) -> list[str]:
+        self._ensure_scanned()
+        return list(self._indexes.by_retailer_id.get(retailer_id, ()))
+
+    def ids_by_category(self, category: str, available_only: bool = True) -> list[str]:
+        self._ensure_scanned()
+        return self._indexes.ids_by_category(category, available_only)
+
+    def operating_hours(self) -> Iterator[tuple[str, OperatingHours]]:
+        self._ensure_scanned()
+        for merchant_id, hours in list(self._indexes.hours.items()):
+            yield merchant_id, OperatingHours.model_validate(hours)
+
+    def save(self, merchant: Merchant) -> None:
+        self._ensure_scanned()
+        body = merchant.model_dump_json().encode()
+        with self._lock:
+            if self._stat() != self._stamp:
+                # Edited outside since we last looked: re-read first so offsets stay right
+                self._pending.extend(self._scan())
+            with self.path.open("ab") as f:
+                offset = f.tell()
+                if offset and not _ends_with_newline(self.path, offset):
+                    f.write(b"\n")
+                    offset += 1
+                f.write(body + b"\n")
+            previous = self._lines.get(merchant.id)
+            if previous is not None:
+                self._dead += previous[1]
+            self._lines[merchant.id] = (hash(body), len(body) + 1)
+            self._offsets[merchant.id] = offset
+            self._indexes.add(merchant.model_dump(include=_INDEXED_FIELDS))
+            size = offset + len(body) + 1
+            if self._dead > size - self._dead:
+                self._rewrite()
+            self._stamp = self._stat()
+
+    def _rewrite(self) -> None:
+        """Copy only live lines to a new file and swap it in."""
+        temp = self.path.with_name(self.path.name + ".tmp")
+        offsets: dict[str, int] = {}
+        with self.path.open("rb") as src, temp.open("wb") as dst:
+            for merchant_id, offset in self._offsets.items():
+                src.seek(offset)
+                offsets[merchant_id] = dst.tell()
+                dst.write(src.readline().rstrip(b"\r\n") + b"\n")
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.replace(temp, self.path)
+        self._offsets = offsets
+        self._dead = 0
+
+    def refresh(self) -> list[str]:
+        if self._offsets is None:
+            return []  # not read yet; the first access sees the file as it is then
+        with self._lock:
+            changed, self._pending = self._pending, []
+            if self._stat() != self._stamp:
+                try:
+                    changed += self._scan()
+                except ValueError:
+                    logger.info("merchant store %s is mid-write; reloading it next time", self.path)
+            return changed
+
+
+def _line_id(body: bytes) -> str:
+    """A merchant line's id, without parsing the whole line when it leads (as model_dump_json writes it)."""
+    if body.startswith(b'{"id":"'):
+        end = body.find(b'"', 7)
+        if end > 0 and b"\\" not in body[7:end]:
+            return body[7:end].decode()
+    return json.loads(body)["id"]
+
+
+def _ends_with_newline(path: Path, size: int) -> bool:
+    with path.open("rb") as f:
+        f.seek(size - 1)
+        return f.read(1) == b"\n"
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS merchants (
+    id          TEXT PRIMARY KEY,
+    phone       TEXT NOT NULL,
+    catalog_id  TEXT NOT NULL,
+    data        TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS merchant_items (
+    merchant_id   TEXT NOT NULL,
+    retailer_id   TEXT NOT NULL,
+    category      TEXT NOT NULL,
+    is_available  INTEGER NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_merchants_phone ON merchants (phone);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_merchants_catalog_id ON merchants (catalog_id);
+CREATE INDEX IF NOT EXISTS ix_items_retailer_id ON merchant_items (retailer_id);
+CREATE INDEX IF NOT EXISTS ix_items_category ON merchant_items (category, is_available);
+"""
+
+
+class SqliteSource:
+    """Merchants in a SQLite file; index lookups are served by SQLite indexes.
+
+    ``refresh`` notices writes by other connections through SQLite's
+    data_version and reports the rows whose JSON changed.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._data_version: int | None = None
+        self._digests: dict[str, int] = {}
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.executescript(_SQLITE_SCHEMA)  # a new file becomes an empty store
+            self._conn = conn
+        return self._conn
+
+    def _query(self, sql: str, params: tuple = ()) -> list[tuple]:
+        with self._lock:
+            return self._connection().execute(sql, params).fetchall()
+
+    def __len__(self) -> int:
+        return self._query("SELECT COUNT(*) FROM merchants")[0][0]
+
+    def load(self, merchant_id: str) -> Merchant | None:
+        rows = self._query("SELECT data FROM merchants WHERE id = ?", (merchant_id,))
+        return Merchant.model_validate_json(rows[0][0]) if rows else None
+
+    def id_by_phone(self, phone: str) -> str | None:
+        rows = self._query("SELECT id FROM merchants WHERE phone = ?", (phone,))
+        return rows[0][0] if rows else None
+
+    def id_by_catalog_id(self, catalog_id: str) -> str | None:
+        rows = self._query("SELECT id FROM merchants WHERE catalog_id = ?", (catalog_id,))
+        return rows[0][0] if rows else None
+
+    def ids_by_retailer_id(self, retailer_id: str) -> list[str]:
+        rows = self._query(
+            "SELECT DISTINCT merchant_id FROM merchant_items WHERE retailer_id = ?", (retailer_id,)
+        )
+        return [r[0] for r in rows]
+
+    def ids_by_category(self, category: str, available_only: bool = True) -> list[str]:
+        sql = "SELECT DISTINCT merchant_id FROM merchant_items WHERE category = ?"
+        if available_only:
+            sql += " AND is_available = 1"
+        return [r[0] for r in self._query(sql, (category,))]
+
+    def operating_hours(self) -> Iterator[tuple[str, OperatingHours]]:
+        rows = self._query("SELECT id, json_extract(data, '$.operating_hours') FROM merchants")
+        for merchant_id, hours in rows:
+            yield merchant_id, OperatingHours.model_validate_json(hours)
+
+    def save(self, merchant: Merchant) -> None:
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                data = _write_row(conn, merchant)
+            if self._data_version is not None:
+                self._digests[merchant.id] = hash(data)
+
+    def refresh(self) -> list[str]:
+        with self._lock:
+            conn = self._connection()
+            version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if version == self._data_version:
+                return []
+            first = self._data_version is None
+            self._data_version = version
+            digests = {merchant_id: hash(data) for merchant_id, data in conn.execute("SELECT id, data FROM merchants")}
+        # The first call only takes the baseline to compare later ones against
+        changed = [] if first else [m for m, d in digests.items() if self._digests.get(m) != d]
+        if not first:
+            changed += self._digests.keys() - digests.keys()
+        self._digests = digests
+        return changed
+
+
+def write_ndjson(path: str | Path, merchants: Iterable[Merchant]) -> int:
+    """Bulk-export merchants to an NDJSON file readable by NdjsonSource.
+
+    Written to a temp file and swapped in, so a store watching ``path``
+    never sees it half-written.
+    """
+    path = Path(path)
+    temp = path.with_name(f"{path.name}.{os.getpid()}.tmp")  # not the store's own rewrite temp
+    count = 0
+    with temp.open("w", encoding="utf-8") as f:
+        for merchant in merchants:
+            f.write(merchant.model_dump_json())
+            f.write("\n")
+            count += 1
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp, path)
+    return count
+
+
+def write_sqlite(path: str | Path, merchants: Iterable[Merchant]) -> int:
+    """Bulk-load merchants into a SQLite file readable by SqliteSource (one transaction)."""
+    conn = sqlite3.connect(path)
+    try:
+        conn.executescript(_SQLITE_SCHEMA)
+        count = 0
+        with conn:
+            for merchant in merchants:
+                _write_row(conn, merchant)
+                count += 1
+        return count
+    finally:
+        conn.close()
+
+
+def _write_row(conn: sqlite3.Connection, merchant: Merchant) -> str:
+    """Insert or replace one merchant and its item rows; returns the stored JSON."""
+    data = merchant.model_dump_json()
+    conn.execute("DELETE FROM merchant_items WHERE merchant_id = ?", (merchant.id,))
+    conn.execute(
+        "INSERT OR REPLACE INTO merchants (id, phone, catalog_id, data) VALUES (?, ?, ?, ?)",
+        (merchant.id, merchant.phone, merchant.catalog_id, data),
+    )
+    conn.executemany(
+        "INSERT INTO merchant_items (merchant_id, retailer_id, category, is_available) "
+        "VALUES (?, ?, ?, ?)",
+        [(merchant.id, i.retailer_id, i.category, int(i.is_available)) for i in merchant.catalog],
+    )
+    return data
+
+
+class MerchantStore:
+    """Index lookups plus a bounded LRU of materialized merchants.
+
+    The source holds the full merchant base; only merchants actually accessed
+    are parsed into Merchant objects, so RSS tracks the active set. Loading
+    one reads the file; async callers use ``aget``/``aget_by_phone``, which
+    do that on a worker thread and keep only resident hits on the loop.
+
+    Resident merchants are immutable snapshots. An update builds a new
+    revision (sharing whatever didn't change), saves it to the source and
+    swaps it in with one dict assignment, so readers never lock and see
+    either the old revision or the new one. Writers are serialized.
+    """
+
+    def __init__(self, source: MerchantSource, max_resident: int = 10_000):
+        self.source = source
+        self.max_resident = max_resident
+        self._resident: OrderedDict[str, Merchant] = OrderedDict()
+        self._lock = threading.Lock()    # LRU bookkeeping
+        self._writer = threading.Lock()  # one update at a time
+        self._listeners: list[Callable[[str, Merchant | None], None]] = []
+        self._stop = threading.Event()
+        self._watcher: threading.Thread | None = None
+        self.loads = 0
+        self.evictions = 0
+        self.updates = 0
+        self.reloads = 0
+
+    def __len__(self) -> int:
+        return len(self.source)
+
+    def get(self, merchant_id: str) -> Merchant | None:
+        merchant = self._resident_hit(merchant_id)
+        return merchant if merchant is not None else self._load(merchant_id)
+
+    async def aget(self, merchant_id: str) -> Merchant | None:
+        """``get`` for the event loop: a resident hit returns at once, a load runs on a worker thread."""
+        merchant = self._resident_hit(merchant_id)
+        return merchant if merchant is not None else await asyncio.to_thread(self._load, merchant_id)
+
+    def _resident_hit(self, merchant_id: str) -> Merchant | None:
+        merchant = self._resident.get(merchant_id)
+        if merchant is not None:
+            try:
+                self._resident.move_to_end(merchant_id)
+            except KeyError:  # evicted or replaced meanwhile; the snapshot we hold is still whole
+                pass
+        return merchant
+
+    def _load(self, merchant_id: str) -> Merchant | None:
+        merchant = self.source.load(merchant_id)
+        if merchant is None:
+            return None
+        with self._lock:
+            # Another thread may have paged it in meanwhile — keep one object per id
+            merchant = self._resident.setdefault(merchant_id, merchant)
+            self._resident.move_to_end(merchant_id)
+            self.loads += 1
+            self._evict()
+        return merchant
+
+    def _evict(self) -> None:
+        while len(self._resident) > self.max_resident:
+            self._resident.popitem(last=False)
+            self.evictions += 1
+
+    def get_by_phone(self, phone: str) -> Merchant | None:
+        merchant_id = self.source.id_by_phone(phone)
+        return self.get(merchant_id) if merchant_id else None
+
+    async def aget_by_phone(self, phone: str) -> Merchant | None:
+        """``get_by_phone`` on a worker thread; the phone index may live in the source file."""
+        if isinstance(self.source, MemorySource):
+            return self.get_by_phone(phone)
+        return await asyncio.to_thread(self.get_by_phone, phone)
+
+    def get_by_catalog_id(self, catalog_id: str) -> Merchant | None:
+        merchant_id = self.source.id_by_catalog_id(catalog_id)
+        return self.get(merchant_id) if merchant_id else None
+
+    def find_by_retailer_id(self, retailer_id: str) -> list[str]:
+        """IDs of merchants whose catalog lists ``retailer_id``."""
+        return self.source.ids_by_retailer_id(retailer_id)
+
+    def find_by_category(self, category: str, available_only: bool = True) -> list[str]:
+        """IDs of merchants selling ``category`` (with at least one available item by default)."""
+        return self.source.ids_by_category(category, available_only)
+
+    def operating_hours(self) -> Iterator[tuple[str, OperatingHours]]:
+        """Every merchant's hours, without materializing the merchants."""
+        return self.source.operating_hours()
+
+    # ── updates ─────────────────────────────────────────────────────────────
+
+    def subscribe(self, listener: Callable[[str, Merchant | None], None]) -> None:
+        """Call ``listener(merchant_id, merchant)`` after each change; None means removed."""
+        self._listeners.append(listener)
+
+    def put(self, merchant: Merchant) -> None:
+        """Save ``merchant`` as the current revision of its id."""
+        with self._writer:
+            self._put(merchant)
+
+    def update(self, merchant_id: str, **changes: Any) -> Merchant:
+        """Save a revision with some fields changed; raises KeyError for an unknown merchant."""
+        with self._writer:
+            revised = self._current(merchant_id).revise(**changes)
+            self._put(revised)
+            return revised
+
+    def update_items(self, merchant_id: str, changes: dict[str, dict[str, Any]]) -> Merchant:
+        """Save a revision with some catalog items' fields changed.
+
+        ``{"cake_choc_001": {"is_available": False}}`` marks one item sold
+        out. Only the changed items are new objects; the rest are shared
+        with the previous revision. Raises KeyError for an unknown merchant
+        or item, before anything is saved.
+        """
+        with self._writer:
+            current = self._current(merchant_id)
+            catalog = list(current.catalog)
+            positions = {item.id: n for n, item in enumerate(catalog)}
+            for item_id, fields in changes.items():
+                n = positions.get(item_id)
+                if n is None:
+                    raise KeyError(item_id)
+                catalog[n] = catalog[n].model_copy(update=fields)
+            revised = current.revise(catalog=catalog)
+            self._put(revised)
+            return revised
+
+    def _current(self, merchant_id: str) -> Merchant:
+        merchant = self.get(merchant_id)
+        if merchant is None:
+            raise KeyError(merchant_id)
+        return merchant
+
+    def _put(self, merchant: Merchant) -> None:
+        self.source.save(merchant)
+        self._swap(merchant.id, merchant)
+        self.updates += 1
+
+    def _swap(self, merchant_id: str, merchant: Merchant | None) -> None:
+        with self._lock:
+            if merchant is None:
+                previous = self._resident.pop(merchant_id, None)
+            else:
+                previous = self._resident.get(merchant_id)
+                self._resident[merchant_id] = merchant  # the swap readers see
+                self._resident.move_to_end(merchant_id)
+                self._evict()
+        if previous is not None and previous is not merchant:
+            previous.retire()
+        for listener in self._listeners:
+            listener(merchant_id, merchant)
+
+    def reload(self) -> int:
+        """Swap in merchants changed in the source by someone else; returns how many."""
+        with self._writer:
+            changed = self.source.refresh()
+            for merchant_id in changed:
+                self._swap(merchant_id, self.source.load(merchant_id))
+            self.reloads += len(changed)
+            return len(changed)
+
+    def watch(self, interval_s: float) -> None:
+        """Reload from the source every ``interval_s`` seconds on a background thread."""
+        if self._watcher is not None:
+            return
+        self._stop.clear()
+        self.source.refresh()  # baseline: changes from here on are reloaded
+
+        def poll() -> None:
+            while not self._stop.wait(interval_s):
+                try:
+                    self.reload()
+                except Exception:
+                    logger.exception("merchant store reload failed")
+
+        self._watcher = threading.Thread(target=poll, name="merchant-watch", daemon=True)
+        self._watcher.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def stats(self) -> dict:
+        return {
+            "resident": len(self._resident),
+            "max_resident": self.max_resident,
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "updates": self.updates,
+            "reloads": self.reloads,
+        }
+
+
+def open_store(path: str = "", max_resident: int = 10_000) -> MerchantStore:
+    """Open the merchant store at ``path`` — .db/.sqlite/.sqlite3 or .ndjson/.jsonl.
+
+    An empty path serves the bundled mock merchants.
+    """
+    if not path:
+        from mocks.merchants import MERCHANTS
+
+        return MerchantStore(MemorySource(MERCHANTS.values()), max_resident)
+    suffix = Path(path).suffix.lower()
+    if suffix in {".db", ".sqlite", ".sqlite3"}:
+        return MerchantStore(SqliteSource(path), max_resident)
+    if suffix in {".ndjson", ".jsonl"}:
+        return MerchantStore(NdjsonSource(path), max_resident)
+    raise ValueError(f"Unsupported merchant store file: {path}")
+
+
+_default_store: MerchantStore | None = None
+
+
+def get_store() -> MerchantStore:
+    """Process-wide store configured by MERCHANT_STORE_PATH, opened on first use."""
+    global _default_store
+    if _default_store is None:
+        _default_store = open_store(settings.merchant_store_path, settings.merchant_store_max_resident)
+    return _default_store
+
+
+def get_merchant(merchant_id: str) -> Merchant | None:
+    return get_store().get(merchant_id)
+
+
+async def aget_merchant(merchant_id: str) -> Merchant | None:
+    """``get_merchant`` for async routes; see MerchantStore.aget."""
+    return await get_store().aget(merchant_id)
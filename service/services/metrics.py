@@ -0,0 +1,198 @@
+from array import array
+from collections import deque
+from datetime import datetime, timezone
+import numpy as np
+
+# Seconds; upper bounds of the latency buckets (+Inf is implied)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+OTHER = "_other"  # merchant label for merchants past ChatMetrics' max_merchants
+
+
+class Histogram:
+    """A Prometheus histogram family with fixed buckets, one series per label tuple.
+
+    Observations are appended to a typed buffer and bucketed in bulk — one
+    searchsorted/bincount pass per ``flush_at`` values, or on ``render`` —
+    so recording costs an array append rather than a bisect and two updates.
+    No locks: call it from the event loop thread only.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...],
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+        flush_at: int = 16_384,
+    ):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = np.array(buckets, float)
+        self.flush_at = flush_at
+        self._index: dict[tuple[str, ...], int] = {}
+        self._series: list[tuple[str, ...]] = []
+        self._counts = np.zeros((0, len(buckets) + 1), np.int64)  # per series: count per bucket, then +Inf
+        self._sums = np.zeros(0)
+        self._pending_series = array("q")
+        self._pending_values = array("d")
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def series(self, labels: tuple[str, ...]) -> int:
+        """The index of the series for ``labels``, for ``extend``."""
+        index = self._index.get(labels)
+        if index is None:
+            index = self._index[labels] = len(self._series)
+            self._series.append(labels)
+        return index
+
+    def observe(self, labels: tuple[str, ...], value: float) -> None:
+        index = self._index.get(labels)
+        self._pending_series.append(self.series(labels) if index is None else index)
+        self._pending_values.append(value)
+        if len(self._pending_values) >= self.flush_at:
+            self._flush()
+
+    def extend(self, series: tuple[int, ...], values: tuple[float, ...]) -> None:
+        """Observe ``values[i]`` in series ``series[i]``."""
+        self._pending_series.extend(series)
+        self._pending_values.extend(values)
+        if len(self._pending_values) >= self.flush_at:
+            self._flush()
+
+    def _flush(self) -> None:
+        series, values = self._pending_series, self._pending_values
+        self._pending_series, self._pending_values = array("q"), array("d")
+        if len(self._counts) < len(self._series):
+            grown = max(len(self._series), 2 * len(self._counts))
+            self._counts = np.vstack([self._counts, np.zeros((grown - len(self._counts), self._counts.shape[1]), np.int64)])
+            self._sums = np.concatenate([self._sums, np.zeros(grown - len(self._sums))])
+        if not values:
+            return
+        rows = np.frombuffer(series, np.int64)
+        values = np.frombuffer(values, float)
+        width = self._counts.shape[1]
+        flat = rows * width + np.searchsorted(self.buckets, values, side="left")  # le: value <= bound
+        self._counts += np.bincount(flat, minlength=self._counts.size).reshape(self._counts.shape)
+        self._sums += np.bincount(rows, weights=values, minlength=len(self._sums))
+
+    def render(self) -> list[str]:
+        """Prometheus text exposition lines for this family."""
+        self._flush()
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        bounds = [_number(b) for b in self.buckets] + ["+Inf"]
+        cumulative = np.cumsum(self._counts, axis=1).tolist()
+        sums = self._sums.tolist()
+        for n, labels in enumerate(self._series):
+            pairs = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, labels))
+            prefix = pairs + "," if pairs else ""
+            counts = cumulative[n]
+            for bound, total in zip(bounds, counts):
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {total}')
+            lines.append(f"{self.name}_sum{{{pairs}}} {_number(sums[n])}")
+            lines.append(f"{self.name}_count{{{pairs}}} {counts[-1]}")
+        return lines
+
+
+def _number(value: float) -> str:
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class ChatMetrics:
+    """Per-stage latency of /chat requests, by merchant, plus sampled traces.
+
+    Stages, in the order a request goes through them:
+
+    - ``agent_resolve``: get_agent; its outcome (``cached``, ``loaded`` via
+      init_lyzr, or the ``default`` pool, ``warming`` until it has a handle)
+      is its own label
+    - ``merchant_lookup``: the merchant store
+    - ``session_wait``: behind earlier messages of the same conversation
+    - ``context``: catalog context and prompt build
+    - ``queue_wait``: waiting for an in-flight slot
+    - ``agent``: the agent call (run_agent)
+
+    With ``trace_every`` = N, every Nth request also keeps a trace — its
+    stages laid end to end with offsets — in a ring of the last
+    ``traces_kept``. Merchants beyond the first ``max_merchants`` seen
+    share the ``_other`` label, which bounds the number of series.
+    """
+
+    STAGES = ("merchant_lookup", "session_wait", "context", "queue_wait", "agent")
+
+    def __init__(self, max_merchants: int = 1000, trace_every: int = 0, traces_kept: int = 100):
+        self.max_merchants = max_merchants
+        self._merchants: dict[str, tuple[str, tuple[int, ...]]] = {}  # merchant id -> (label, stage series)
+        self.stages = Histogram(
+            "comverse_chat_stage_seconds", "Time spent in each stage of a /chat request.", ("merchant", "stage"),
+        )
+        self.agent_resolve = Histogram(
+            "comverse_agent_resolve_seconds", "Time to resolve the Lyzr agent for a /chat request.",
+            ("merchant", "outcome"),
+        )
+        self.requests = Histogram(
+            "comverse_chat_request_seconds", "End-to-end /chat handling time, by who produced the reply.",
+            ("merchant", "source"),
+        )
+        self.trace_every = trace_every
+        self.traces: deque[dict] = deque(maxlen=traces_kept)
+        self._requests = 0
+
+    def record(
+        self,
+        merchant_id: str,
+        source: str,
+        total: float,
+        resolve: tuple[float, str] | None,
+        stages: tuple[float, ...],
+        session_id: str | None = None,
+    ) -> None:
+        """Record one request; ``stages`` holds a duration per STAGES entry."""
+        known = self._merchants.get(merchant_id)
+        if known is None:
+            known = self._merchants[merchant_id] = self._register(merchant_id)
+        label, stage_series = known
+        self.stages.extend(stage_series, stages)
+        self.requests.observe((label, source), total)
+        if resolve is not None:
+            self.agent_resolve.observe((label, resolve[1]), resolve[0])
+        self._requests += 1
+        if self.trace_every and self._requests % self.trace_every == 0:
+            self._trace(merchant_id, session_id, source, total, resolve, stages)
+
+    def _register(self, merchant_id: str) -> tuple[str, tuple[int, ...]]:
+        label = merchant_id if len(self._merchants) < self.max_merchants else OTHER
+        return label, tuple(self.stages.series((label, stage)) for stage in self.STAGES)
+
+    def _trace(self, merchant_id, session_id, source, total, resolve, stages) -> None:
+        spans, offset = [], 0.0
+        named = [(f"agent_resolve:{resolve[1]}", resolve[0])] if resolve is not None else []
+        for stage, seconds in named + list(zip(self.STAGES, stages)):
+            spans.append({"stage": stage, "start_ms": round(offset * 1000, 3), "duration_ms": round(seconds * 1000, 3)})
+            offset += seconds
+        self.traces.append({
+            "at": datetime.now(timezone.utc).isoformat(),
+            "merchant_id": merchant_id,
+            "session_id": session_id,
+            "source": source,
+            "total_ms": round(total * 1000, 3),
+            "unaccounted_ms": round(max(0.0, total - offset) * 1000, 3),  # agent lease, response encoding
+            "spans": spans,
+        })
+
+    def render(self) -> str:
+        lines = self.agent_resolve.render() + self.stages.render() + self.requests.render()
+        return "\n".join(lines) + "\n"
+
+    def stats(self) -> dict:
+        return {
+            "requests": self._requests,
+            "series": len(self.stages) + len(self.agent_resolve) + len(self.requests),
+            "traces": len(self.traces),
+        }
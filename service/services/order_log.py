@@ -0,0 +1,499 @@
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Iterator
+from pydantic_core import from_json
+from models.order import Order
+from services.orders import ACTIVE_STATUSES, IST, NotDurable, OrderEngine
+
+_SEGMENT = "wal.{:012d}.ndjson"
+_SNAPSHOT = "orders.snapshot"
+_MAGIC = b"ORDSNAP1"
+_TRAILER = struct.Struct("<QQ8s")  # header offset, header length, magic
+_OPEN = frozenset(s.value for s in ACTIVE_STATUSES)
+_KEY_TTL = timedelta(days=1)  # idempotency keys outlive a compaction for this long
+
+
+def _phone_hash(phone: str) -> int:
+    return int.from_bytes(hashlib.blake2b(phone.encode(), digest_size=8).digest(), "little")
+
+
+def _parse_id(order_id: str) -> tuple[str, str, int] | None:
+    """``ord_20260218_merchant001_007`` → ("merchant001", "20260218", 7)."""
+    parts = order_id.split("_")
+    if len(parts) != 4 or parts[0] != "ord" or not parts[3].isdigit():
+        return None
+    return parts[2], parts[1], int(parts[3])
+
+
+def _fsync_dir(directory: Path) -> None:
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+# ── write-ahead log ──────────────────────────────────────────────────────────
+
+
+class OrderLog:
+    """Append-only NDJSON journal of order events, fsynced in groups.
+
+    ``append`` only queues the record; a flusher thread writes everything
+    queued since its last pass with one write and one fsync, so a burst of
+    orders costs one disk flush rather than one each. ``wait_durable`` blocks
+    until a record is on disk.
+
+    The log is split into segments named by their first sequence number;
+    ``rotate`` starts a new one and ``prune`` drops segments a snapshot has
+    made redundant. A torn last line (a crash mid-write) is cut off on open.
+    """
+
+    def __init__(self, directory: str | Path, commit_interval_ms: float = 2.0, start_seq: int = 1, fsync: bool = True):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.commit_interval = commit_interval_ms / 1000
+        self.fsync = fsync
+        self._cond = threading.Condition()
+        self._io = threading.Lock()  # held while writing, so rotate never splits a batch
+        self._pending: list[tuple[int, bytes]] = []
+        self._closed = False
+        self.commits = 0
+        self.records = 0
+
+        self._next = max(start_seq, self._recover())
+        self.durable = self._next - 1
+        self._file = self._open_segment(self._next)
+        self._flusher = threading.Thread(target=self._flush_loop, name="order-log", daemon=True)
+        self._flusher.start()
+
+    def _segments(self) -> list[tuple[int, Path]]:
+        return sorted((int(p.name.split(".")[1]), p) for p in self.directory.glob("wal.*.ndjson"))
+
+    def _recover(self) -> int:
+        """Trim a torn tail off the newest segment; returns the next sequence number."""
+        segments = self._segments()
+        if not segments:
+            return 1
+        start, path = segments[-1]
+        data = path.read_bytes()
+        end = data.rfind(b"\n") + 1
+        last = start - 1
+        while end:
+            line_start = data.rfind(b"\n", 0, end - 1) + 1
+            try:
+                last = json.loads(data[line_start:end])["seq"]
+                break
+            except (ValueError, KeyError):
+                end = line_start
+        if end != len(data):
+            with path.open("r+b") as f:
+                f.truncate(end)
+        return last + 1
+
+    def _open_segment(self, start: int):
+        path = self.directory / _SEGMENT.format(start)
+        f = path.open("ab")
+        _fsync_dir(self.directory)
+        return f
+
+    def append(self, event: dict) -> int:
+        """Queue ``event`` for the next group commit; returns its sequence number."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("order log is closed")
+            seq = self._next
+            self._next += 1
+            line = json.dumps({"seq": seq, **event}, separators=(",", ":"), ensure_ascii=False)
+            self._pending.append((seq, line.encode() + b"\n"))
+            self._cond.notify_all()
+        return seq
+
+    @property
+    def last_seq(self) -> int:
+        return self._next - 1
+
+    def wait_durable(self, seq: int | None = None, timeout: float | None = None) -> bool:
+        """Block until record ``seq`` (default: everything appended so far) is fsynced."""
+        with self._cond:
+            target = self._next - 1 if seq is None else seq
+            return self._cond.wait_for(lambda: self.durable >= target, timeout)
+
+    def _flush_loop(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+            if self.commit_interval:
+                time.sleep(self.commit_interval)  # let concurrent appends join this commit
+            with self._io:
+                with self._cond:
+                    batch, self._pending = self._pending, []
+                self._write(batch)
+
+    def _write(self, batch: list[tuple[int, bytes]]) -> None:
+        """Write and fsync ``batch``. Caller holds ``_io``."""
+        if not batch:
+            return
+        self._file.write(b"".join(line for _, line in batch))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        with self._cond:
+            self.durable = batch[-1][0]
+            self.commits += 1
+            self.records += len(batch)
+            self._cond.notify_all()
+
+    def rotate(self) -> int:
+        """Flush, then start a new segment; returns the last sequence number before it."""
+        with self._io:
+            with self._cond:
+                batch, self._pending = self._pending, []
+                boundary = self._next - 1
+            self._write(batch)
+            self._file.close()
+            self._file = self._open_segment(boundary + 1)
+        return boundary
+
+    def prune(self, upto_seq: int) -> int:
+        """Delete segments holding only records ≤ ``upto_seq``; returns how many."""
+        segments = self._segments()
+        removed = 0
+        for (_, path), (next_start, _) in zip(segments, segments[1:]):
+            if next_start <= upto_seq + 1:
+                path.unlink()
+                removed += 1
+        return removed
+
+    def read_tail(self, after_seq: int = 0) -> Iterator[tuple[int, dict]]:
+        """Records with sequence number > ``after_seq``, in order."""
+        segments = self._segments()
+        for i, (_, path) in enumerate(segments):
+            if i + 1 < len(segments) and segments[i + 1][0] <= after_seq + 1:
+                continue
+            with path.open("rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # written after we opened it; replay happens before appends
+                    record = from_json(line)
+                    seq = record.pop("seq")
+                    if seq > after_seq:
+                        yield seq, record
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._flusher.join()
+        self._file.close()
+
+    def stats(self) -> dict:
+        return {
+            "last_seq": self.last_seq,
+            "durable_seq": self.durable,
+            "commits": self.commits,
+            "records": self.records,
+            "segments": len(self._segments()),
+        }
+
+
+# ── snapshots ────────────────────────────────────────────────────────────────
+#
+# One file, laid out as:
+#   data            one Order JSON per line, sorted by (merchant, IST day, seq)
+#   offsets         u64 × (count + 1) — where each line starts, then the end of data
+#   line phones     u64 × count — customer phone hash per line
+#   phone hashes    u64 × count — the same, sorted
+#   phone ordinals  u32 × count — line number for each sorted hash
+#   header          JSON: seq, count, buckets, open lines, idempotency keys, section offsets
+#   trailer         header offset, header length, magic
+#
+# Lines of a merchant-day bucket are contiguous and, since sequence numbers
+# are dense, the line for seq n sits at bucket start + n - 1.
+
+
+class OrderSnapshot:
+    """Orders as of one log sequence number, read lazily through mmap.
+
+    Opening parses only the header; orders are decoded on lookup, except the
+    open ones, which the engine keeps in memory.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with self.path.open("rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        header_at, header_len, magic = _TRAILER.unpack_from(self._mmap, len(self._mmap) - _TRAILER.size)
+        if magic != _MAGIC:
+            raise ValueError(f"{self.path} is not an order snapshot")
+        header = json.loads(self._mmap[header_at:header_at + header_len])
+        self.seq: int = header["seq"]
+        self.count: int = header["count"]
+        self.keys: dict[str, str] = header["keys"]
+        sections = header["sections"]
+        n = self.count
+        self._data = view[:sections["offsets"]]
+        self._offsets = view[sections["offsets"]:sections["offsets"] + 8 * (n + 1)].cast("Q")
+        self._line_phones = view[sections["line_phones"]:sections["line_phones"] + 8 * n].cast("Q")
+        self._phone_hashes = view[sections["phone_hashes"]:sections["phone_hashes"] + 8 * n].cast("Q")
+        self._phone_ordinals = view[sections["phone_ordinals"]:sections["phone_ordinals"] + 4 * n].cast("I")
+        self._open: list[int] = header["open"]
+
+        self._buckets: dict[tuple[str, date], tuple[int, int, int]] = {}
+        self._days: dict[str, list[date]] = {}
+        self._by_id: dict[tuple[str, str], list[tuple[int, int]]] = {}
+        for merchant_id, day, first, count, max_seq in header["buckets"]:
+            day = date.fromisoformat(day)
+            self._buckets[(merchant_id, day)] = (first, count, max_seq)
+            self._days.setdefault(merchant_id, []).append(day)
+            self._by_id.setdefault((merchant_id.replace("_", ""), f"{day:%Y%m%d}"), []).append((first, count))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[Order]:
+        return (self._order(i) for i in range(self.count))
+
+    def _line(self, ordinal: int) -> memoryview:
+        return self._data[self._offsets[ordinal]:self._offsets[ordinal + 1]]
+
+    def _order(self, ordinal: int) -> Order:
+        return Order.model_validate_json(bytes(self._line(ordinal)))
+
+    def get(self, order_id: str) -> Order | None:
+        parsed = _parse_id(order_id)
+        if parsed is None:
+            return None
+        merchant, day, seq = parsed
+        for first, count in self._by_id.get((merchant, day), ()):
+            if 1 <= seq <= count:
+                order = self._order(first + seq - 1)
+                if order.id == order_id:
+                    return order
+        return None
+
+    def days(self, merchant_id: str) -> list[date]:
+        return list(self._days.get(merchant_id, ()))
+
+    def orders_in(self, merchant_id: str, day: date) -> list[Order]:
+        bucket = self._buckets.get((merchant_id, day))
+        if bucket is None:
+            return []
+        first, count, _ = bucket
+        return [self._order(i) for i in range(first, first + count)]
+
+    def for_customer(self, customer_phone: str) -> list[Order]:
+        h = _phone_hash(customer_phone)
+        i = bisect.bisect_left(self._phone_hashes, h)
+        orders = []
+        while i < self.count and self._phone_hashes[i] == h:
+            order = self._order(self._phone_ordinals[i])
+            if order.customer_phone == customer_phone:
+                orders.append(order)
+            i += 1
+        return orders
+
+    def max_seq(self, merchant_id: str, day: date) -> int:
+        bucket = self._buckets.get((merchant_id, day))
+        return bucket[2] if bucket is not None else 0
+
+    def open_orders(self) -> list[Order]:
+        return [self._order(i) for i in self._open]
+
+    def open_in(self, first: int, count: int) -> list[int]:
+        lo = bisect.bisect_left(self._open, first)
+        hi = bisect.bisect_left(self._open, first + count)
+        return self._open[lo:hi]
+
+
+def write_snapshot(
+    path: str | Path,
+    seq: int,
+    base: OrderSnapshot | None,
+    changed: dict[str, Order],
+    keys: dict[str, str],
+    now: datetime,
+) -> Path:
+    """Write ``base`` updated with ``changed`` orders as a new snapshot at ``seq``.
+
+    Buckets without changes are copied from ``base`` byte for byte; only
+    changed merchant-days are re-encoded. The file is fsynced and renamed
+    into place, so a crash leaves either the old snapshot or the new one.
+    """
+    path = Path(path)
+    changed_buckets: dict[tuple[str, date], dict[int, Order]] = {}
+    for order in changed.values():
+        key = (order.merchant_id, order.created_at.astimezone(IST).date())
+        changed_buckets.setdefault(key, {})[int(order.id.rsplit("_", 1)[1])] = order
+    bucket_keys = sorted(set(base._buckets if base is not None else ()) | changed_buckets.keys())
+
+    offsets, line_phones, open_lines, buckets = array("Q"), array("Q"), [], []
+    pos = 0
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as f:
+        for key in bucket_keys:
+            first = len(line_phones)
+            old = base._buckets.get(key) if base is not None else None
+            updates = changed_buckets.get(key)
+            if updates is None:
+                old_first, count, max_seq = old
+                start, end = base._offsets[old_first], base._offsets[old_first + count]
+                f.write(base._data[start:end])
+                shift = pos - start
+                offsets.extend(base._offsets[i] + shift for i in range(old_first, old_first + count))
+                line_phones.extend(base._line_phones[old_first:old_first + count])
+                open_lines.extend(i - old_first + first for i in base.open_in(old_first, count))
+                pos += end - start
+            else:
+                lines: dict[int, tuple[bytes, int, bool]] = {}
+                if old is not None:
+                    for i in range(old[0], old[0] + old[1]):
+                        raw = bytes(base._line(i))
+                        data = from_json(raw)
+                        lines[int(data["id"].rsplit("_", 1)[1])] = (raw, base._line_phones[i], data["status"] in _OPEN)
+                for s, order in updates.items():
+                    raw = order.model_dump_json().encode() + b"\n"
+                    lines[s] = (raw, _phone_hash(order.customer_phone), order.status in ACTIVE_STATUSES)
+                for s in sorted(lines):
+                    raw, phone, is_open = lines[s]
+                    if is_open:
+                        open_lines.append(len(line_phones))
+                    offsets.append(pos)
+                    line_phones.append(phone)
+                    f.write(raw)
+                    pos += len(raw)
+                count, max_seq = len(lines), max(lines)
+            buckets.append([key[0], key[1].isoformat(), first, count, max_seq])
+        offsets.append(pos)
+
+        def section(data: array) -> int:
+            nonlocal pos
+            pad = -pos % 8
+            f.write(b"\0" * pad)
+            pos += pad
+            at = pos
+            data.tofile(f)
+            pos += len(data) * data.itemsize
+            return at
+
+        order = sorted(range(len(line_phones)), key=line_phones.__getitem__)
+        sections = {
+            "offsets": section(offsets),
+            "line_phones": section(line_phones),
+            "phone_hashes": section(array("Q", (line_phones[i] for i in order))),
+            "phone_ordinals": section(array("I", order)),
+        }
+        cutoff = f"{(now - _KEY_TTL).astimezone(IST):%Y%m%d}"
+        header = json.dumps({
+            "seq": seq,
+            "count": len(line_phones),
+            "buckets": buckets,
+            "open": open_lines,
+            "keys": {k: v for k, v in keys.items() if v.split("_")[1] >= cutoff},
+            "sections": sections,
+        }, separators=(",", ":")).encode()
+        f.write(header)
+        f.write(_TRAILER.pack(pos, len(header), _MAGIC))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _fsync_dir(path.parent)
+    return path
+
+
+# ── engine persistence ──────────────────────────────────────────────────────
+
+
+class OrderStore:
+    """An OrderEngine backed by a snapshot plus the log written since.
+
+    Opening maps the snapshot and replays only the log tail, so restart time
+    tracks recent activity rather than order history. Every
+    ``snapshot_every`` events a background compaction folds the log into a
+    new snapshot and deletes the segments it covers. Engine writes return
+    once their log record is fsynced, or raise NotDurable after
+    ``durable_timeout_s``.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        snapshot_every: int = 10_000,
+        commit_interval_ms: float = 2.0,
+        now: Callable[[], datetime] = lambda: datetime.now(IST),
+        fsync: bool = True,
+        durable_timeout_s: float = 5.0,
+    ):
+        self.directory = Path(directory)
+        self.durable_timeout_s = durable_timeout_s
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.snapshot_every = snapshot_every
+        self.now = now
+        snapshot_path = self.directory / _SNAPSHOT
+        self.snapshot = OrderSnapshot(snapshot_path) if snapshot_path.exists() else None
+        start = self.snapshot.seq if self.snapshot is not None else 0
+
+        started = time.perf_counter()
+        self.engine = OrderEngine(now=now, cold=self.snapshot)
+        self.log = OrderLog(self.directory, commit_interval_ms, start_seq=start + 1, fsync=fsync)
+        self.replayed = 0
+        for _, event in self.log.read_tail(start):
+            self.engine.apply(event)
+            self.replayed += 1
+        self.recovery_s = time.perf_counter() - started
+
+        self._since_snapshot = self.replayed
+        self._compacting = threading.Lock()
+        self._compactor: threading.Thread | None = None
+        self.snapshots = 0
+        self.engine.journal = self._journal
+        self.engine.durable = self._wait_durable
+
+    def _journal(self, event: dict) -> int:
+        seq = self.log.append(event)
+        self._since_snapshot += 1
+        if self._since_snapshot >= self.snapshot_every and not self._compacting.locked():
+            self._since_snapshot = 0
+            self._compactor = threading.Thread(target=self.compact, name="order-compact", daemon=True)
+            self._compactor.start()
+        return seq
+
+    def _wait_durable(self, seq: int | None) -> None:
+        if not self.log.wait_durable(seq, self.durable_timeout_s):
+            raise NotDurable(f"Order log not flushed within {self.durable_timeout_s}s")
+
+    def compact(self) -> None:
+        """Fold everything logged so far into a new snapshot."""
+        with self._compacting:
+            seq, changed, keys = self.engine.checkpoint(lambda orders, keys: (self.log.rotate(), orders, keys))
+            path = write_snapshot(self.directory / _SNAPSHOT, seq, self.snapshot, changed, keys, self.now())
+            self.snapshot = OrderSnapshot(path)
+            self.engine.adopt(self.snapshot, changed)
+            self.log.prune(seq)
+            self.snapshots += 1
+
+    def close(self) -> None:
+        if self._compactor is not None:
+            self._compactor.join()
+        self.log.close()
+
+    def stats(self) -> dict:
+        return {
+            **self.log.stats(),
+            "snapshot_seq": self.snapshot.seq if self.snapshot is not None else 0,
+            "snapshots": self.snapshots,
+            "replayed": self.replayed,
+            "recovery_ms": round(self.recovery_s * 1000, 1),
+        }
@@ -0,0 +1,443 @@
+import threading
+from datetime import date, datetime, timedelta, timezone
+from enum import Enum
+from typing import Callable, Iterable, Iterator, Protocol, TypeVar
+from models.order import Order, OrderItem, OrderStatus, PaymentStatus
+
+T = TypeVar("T")
+
+IST = timezone(timedelta(hours=5, minutes=30), "IST")  # order days roll over at Indian midnight
+
+# Allowed status moves; delivered and cancelled are final
+TRANSITIONS: dict[OrderStatus, frozenset[OrderStatus]] = {
+    OrderStatus.pending: frozenset({OrderStatus.confirmed, OrderStatus.cancelled}),
+    OrderStatus.confirmed: frozenset({OrderStatus.preparing, OrderStatus.cancelled}),
+    OrderStatus.preparing: frozenset({OrderStatus.out_for_delivery, OrderStatus.cancelled}),
+    OrderStatus.out_for_delivery: frozenset({OrderStatus.delivered}),
+    OrderStatus.delivered: frozenset(),
+    OrderStatus.cancelled: frozenset(),
+}
+PAYMENT_TRANSITIONS: dict[PaymentStatus, frozenset[PaymentStatus]] = {
+    PaymentStatus.unpaid: frozenset({PaymentStatus.link_sent, PaymentStatus.paid}),
+    PaymentStatus.link_sent: frozenset({PaymentStatus.link_sent, PaymentStatus.paid, PaymentStatus.unpaid}),
+    PaymentStatus.paid: frozenset({PaymentStatus.refunded}),
+    PaymentStatus.refunded: frozenset(),
+}
+
+
+# Statuses an order can still leave; only these keep a status index (terminal
+# buckets would grow forever and make every append slower)
+ACTIVE_STATUSES = frozenset(s for s, nxt in TRANSITIONS.items() if nxt)
+
+
+class OrderNotFound(LookupError):
+    pass
+
+
+class InvalidTransition(ValueError):
+    pass
+
+
+class NotDurable(RuntimeError):
+    """A write was applied in memory but not confirmed on disk in time; retry it."""
+
+
+def order_id_for(merchant_id: str, day: date, seq: int) -> str:
+    """``ord_20260218_merchant001_001`` — sequence is per merchant per day."""
+    return f"ord_{day:%Y%m%d}_{merchant_id.replace('_', '')}_{seq:03d}"
+
+
+def _added(index: dict, key, order_id: str) -> None:
+    bucket = index.get(key)
+    if bucket is None:
+        index[key] = [order_id]
+    else:
+        bucket.append(order_id)  # in place: readers iterating it see it or not, never a torn list
+
+
+def _removed(index: dict, key, order_id: str) -> None:
+    # A new list swapped in whole, so a reader mid-iteration keeps the old one intact
+    remaining = [i for i in index.get(key, ()) if i != order_id]
+    if remaining:
+        index[key] = remaining
+    else:
+        index.pop(key, None)
+
+
+class ColdOrders(Protocol):
+    """Read-only orders persisted before this process started (see services.order_log)."""
+    keys: dict[str, str]
+
+    def __len__(self) -> int: ...
+    def __iter__(self) -> Iterator[Order]: ...
+    def get(self, order_id: str) -> Order | None: ...
+    def days(self, merchant_id: str) -> list[date]: ...
+    def orders_in(self, merchant_id: str, day: date) -> list[Order]: ...
+    def for_customer(self, customer_phone: str) -> list[Order]: ...
+    def max_seq(self, merchant_id: str, day: date) -> int: ...
+    def open_orders(self) -> list[Order]: ...
+
+
+def _journal_value(value):
+    return value.value if isinstance(value, Enum) else value.isoformat() if isinstance(value, datetime) else value
+
+
+class OrderEngine:
+    """In-process order book: creation, status changes and dashboard lookups.
+
+    Writers serialize on one lock. Readers never take it: orders are
+    immutable once stored (a change swaps in a new Order), index buckets
+    only grow in place and are replaced wholesale when an ID leaves them,
+    so a reader always sees a complete, if possibly one-write-old, bucket.
+    Status lookups re-check each order's current status to hide that lag,
+    and IDs whose order has meanwhile moved out of memory are resolved
+    through ``cold`` or skipped.
+
+    With ``cold`` set, orders restored from disk are read from it on demand;
+    only open orders and anything changed since are held in memory. Every
+    write is passed to ``journal`` (under the lock, so in commit order),
+    which returns a ticket; once the lock is released the write hands that
+    ticket to ``durable``, which blocks until the journal entry is on disk
+    or raises NotDurable. Writes only return once durable.
+    """
+
+    def __init__(
+        self,
+        now: Callable[[], datetime] = lambda: datetime.now(IST),
+        journal: Callable[[dict], int | None] | None = None,
+        cold: ColdOrders | None = None,
+        durable: Callable[[int | None], None] | None = None,
+    ):
+        self.now = now
+        self.journal = journal
+        self.durable = durable
+        self._lock = threading.Lock()
+        self._cold = cold
+        self._orders: dict[str, Order] = {}
+        self._sequences: dict[tuple[str, date], int] = {}
+        self._idempotency: dict[str, str] = dict(cold.keys) if cold is not None else {}
+        self._by_merchant_day: dict[tuple[str, date], list[str]] = {}
+        self._merchant_days: dict[str, tuple[date, ...]] = {}
+        self._by_customer: dict[str, list[str]] = {}
+        self._by_status: dict[tuple[str, OrderStatus], list[str]] = {}
+        self._created = 0  # orders not in cold
+        self.mutations = 0
+        self.listeners: list[Callable[[Order, Order | None], None]] = []
+        if cold is not None:
+            for order in cold.open_orders():
+                self._orders[order.id] = order
+                _added(self._by_status, (order.merchant_id, order.status), order.id)
+
+    def __len__(self) -> int:
+        return self._created + (len(self._cold) if self._cold is not None else 0)
+
+    # ── writes ──────────────────────────────────────────────────────────────
+
+    def create(
+        self,
+        merchant_id: str,
+        customer_phone: str,
+        items: Iterable[OrderItem],
+        message_key: str,
+        delivery_address: str | None = None,
+        notes: str | None = None,
+        commission_pct: float | None = None,
+        wait: bool = True,
+    ) -> tuple[Order, bool]:
+        """Place an order; returns ``(order, created)``.
+
+        ``message_key`` identifies the customer message that placed it (the
+        WhatsApp message ID, say). Repeating a create for the same session and
+        message returns the original order with ``created=False``.
+        ``commission_pct`` is the merchant's rate at checkout, kept on the
+        order so later rate changes don't rewrite past commission. Raises
+        NotDurable when the journal can't confirm the order in time; the
+        retry returns it once it is on disk. With ``wait=False`` it returns
+        as soon as the order is journaled, and the caller must
+        ``wait_durable()`` before reporting it placed.
+        """
+        items = list(items)
+        if not items:
+            raise ValueError("An order needs at least one item")
+        for item in items:
+            if item.quantity <= 0:
+                raise ValueError(f"Quantity must be positive: {item.name}")
+            if item.total_price_inr != item.quantity * item.unit_price_inr:
+                raise ValueError(f"Line total doesn't match quantity x unit price: {item.name}")
+        session_id = f"{merchant_id}:{customer_phone}"
+        key = f"{session_id}:{message_key}"
+
+        with self._lock:
+            existing = self._idempotency.get(key)
+            if existing is not None:
+                order, ticket = self._get(existing), None  # None: wait for all journaled so far
+            else:
+                order, ticket = self._create(merchant_id, customer_phone, session_id, key, items,
+                                             delivery_address, notes, commission_pct)
+        if wait:
+            self.wait_durable(ticket)
+        return order, existing is None
+
+    def _create(
+        self,
+        merchant_id: str,
+        customer_phone: str,
+        session_id: str,
+        key: str,
+        items: list[OrderItem],
+        delivery_address: str | None,
+        notes: str | None,
+        commission_pct: float | None,
+    ) -> tuple[Order, int | None]:
+        """Store and journal a new order; returns it and its journal ticket. Caller holds the lock."""
+        now = self.now()
+        day = now.astimezone(IST).date()
+        seq = self._last_seq(merchant_id, day) + 1
+        self._sequences[(merchant_id, day)] = seq
+        order = Order(
+            id=order_id_for(merchant_id, day, seq),
+            merchant_id=merchant_id,
+            customer_phone=customer_phone,
+            session_id=session_id,
+            items=items,
+            subtotal_inr=sum(i.total_price_inr for i in items),
+            delivery_address=delivery_address,
+            notes=notes,
+            commission_pct=commission_pct,
+            created_at=now,
+            updated_at=now,
+        )
+        self._store(order, None)
+        self._idempotency[key] = order.id
+        ticket = None
+        if self.journal is not None:
+            ticket = self.journal({"op": "create", "key": key, "order": order.model_dump(mode="json")})
+        return order, ticket
+
+    def transition(self, order_id: str, status: OrderStatus) -> Order:
+        """Move an order to ``status``; raises InvalidTransition for disallowed moves."""
+        with self._lock:
+            order = self._get(order_id)
+            if status not in TRANSITIONS[order.status]:
+                raise InvalidTransition(f"{order_id}: {order.status.value} → {status.value} not allowed")
+            updated, ticket = self._replace(order, status=status)
+        self.wait_durable(ticket)
+        return updated
+
+    def set_payment(self, order_id: str, payment_status: PaymentStatus, payment_link: str | None = None) -> Order:
+        with self._lock:
+            order = self._get(order_id)
+            if payment_status not in PAYMENT_TRANSITIONS[order.payment_status]:
+                raise InvalidTransition(
+                    f"{order_id}: payment {order.payment_status.value} → {payment_status.value} not allowed"
+                )
+            update: dict = {"payment_status": payment_status}
+            if payment_link is not None:
+                update["payment_link"] = payment_link
+            updated, ticket = self._replace(order, **update)
+        self.wait_durable(ticket)
+        return updated
+
+    def wait_durable(self, ticket: int | None = None) -> None:
+        """Block until the journaled write ``ticket`` (default: every write so far) is on disk.
+
+        Called without the lock, so concurrent writers share a group commit.
+        """
+        if self.durable is not None:
+            self.durable(ticket)
+
+    def apply(self, event: dict) -> None:
+        """Re-apply a journaled write (log replay); the journal isn't called."""
+        with self._lock:
+            if event["op"] == "create":
+                order = Order.model_validate(event["order"])
+                day = order.created_at.astimezone(IST).date()
+                seq = int(order.id.rsplit("_", 1)[1])
+                self._sequences[(order.merchant_id, day)] = max(seq, self._last_seq(order.merchant_id, day))
+                if order.id not in self._orders:  # events after a snapshot are never in it
+                    self._store(order, None)
+                self._idempotency[event["key"]] = order.id
+            else:
+                previous = self._get(event["id"])
+                order = Order.model_validate({**previous.model_dump(), **event["fields"]})
+                self._store(order, previous)
+
+    def checkpoint(self, callback: Callable[[dict[str, Order], dict[str, str]], T]) -> T:
+        """Call ``callback(in_memory_orders, idempotency_keys)`` with writes paused."""
+        with self._lock:
+            return callback(dict(self._orders), dict(self._idempotency))
+
+    def adopt(self, cold: ColdOrders, persisted: dict[str, Order]) -> None:
+        """Switch to a newer ``cold`` that includes ``persisted`` (from checkpoint).
+
+        In-memory copies identical to what was persisted are released unless
+        still open; orders created since the checkpoint stay indexed here.
+        """
+        with self._lock:
+            self._cold = cold
+            for order_id, order in persisted.items():
+                if self._orders.get(order_id) is order and order.status not in ACTIVE_STATUSES:
+                    del self._orders[order_id]
+            for index in (self._by_merchant_day, self._by_customer):
+                for key, ids in list(index.items()):
+                    remaining = [i for i in ids if i not in persisted]
+                    if remaining:
+                        index[key] = remaining
+                    else:
+                        del index[key]
+            self._merchant_days = {
+                m: tuple(d for d in days if (m, d) in self._by_merchant_day)
+                for m, days in self._merchant_days.items()
+            }
+            self._created = sum(len(ids) for ids in self._by_merchant_day.values())
+            recent = {k: v for k, v in self._idempotency.items() if v not in persisted}
+            self._idempotency = {**cold.keys, **recent}
+
+    def subscribe(
+        self,
+        listener: Callable[[Order, Order | None], None],
+        existing: Callable[[Iterator[Order]], None] | None = None,
+    ) -> None:
+        """Call ``listener(order, previous)`` after every write from now on.
+
+        ``existing``, if given, first receives every order already stored,
+        with writes paused, so the subscriber misses nothing in between.
+        Listeners run under the write lock and should be quick.
+        """
+        with self._lock:
+            if existing is not None:
+                existing(self._every_order())
+            self.listeners.append(listener)
+
+    def _every_order(self) -> Iterator[Order]:
+        orders = dict(self._orders)
+        yield from orders.values()
+        if self._cold is not None:
+            yield from (o for o in self._cold if o.id not in orders)
+
+    def _last_seq(self, merchant_id: str, day: date) -> int:
+        seq = self._sequences.get((merchant_id, day))
+        if seq is None:
+            seq = self._cold.max_seq(merchant_id, day) if self._cold is not None else 0
+        return seq
+
+    def _get(self, order_id: str) -> Order:
+        order = self.get(order_id)
+        if order is None:
+            raise OrderNotFound(order_id)
+        return order
+
+    def _replace(self, order: Order, **update) -> tuple[Order, int | None]:
+        """Store an updated copy of ``order``; returns it and its journal ticket."""
+        updated = order.model_copy(update={**update, "updated_at": self.now()})
+        self._store(updated, order)
+        ticket = None
+        if self.journal is not None:
+            fields = {k: _journal_value(v) for k, v in update.items()}
+            fields["updated_at"] = updated.updated_at.isoformat()
+            ticket = self.journal({"op": "update", "id": order.id, "fields": fields})
+        return updated, ticket
+
+    def _store(self, order: Order, previous: Order | None) -> None:
+        """Publish ``order``, then index it. Caller holds the lock.
+
+        Publishing first means any ID a reader finds in an index resolves.
+        """
+        self._orders[order.id] = order
+        if previous is None:
+            day = order.created_at.astimezone(IST).date()
+            key = (order.merchant_id, day)
+            _added(self._by_merchant_day, key, order.id)
+            if day not in self._merchant_days.get(order.merchant_id, ()):
+                self._merchant_days[order.merchant_id] = self._merchant_days.get(order.merchant_id, ()) + (day,)
+            _added(self._by_customer, order.customer_phone, order.id)
+            self._created += 1
+        if previous is None or previous.status != order.status:
+            if previous is not None and previous.status in ACTIVE_STATUSES:
+                _removed(self._by_status, (order.merchant_id, previous.status), order.id)
+            if order.status in ACTIVE_STATUSES:
+                _added(self._by_status, (order.merchant_id, order.status), order.id)
+        self.mutations += 1
+        for listener in self.listeners:
+            listener(order, previous)
+
+    # ── lock-free reads ─────────────────────────────────────────────────────
+
+    def get(self, order_id: str) -> Order | None:
+        order = self._orders.get(order_id)
+        if order is None and self._cold is not None:
+            order = self._cold.get(order_id)
+        return order
+
+    def _resolve(self, ids: Iterable[str]) -> Iterator[Order]:
+        """Orders for index IDs; an ID a concurrent adopt released comes from cold, or is skipped."""
+        orders = self._orders
+        for order_id in ids:
+            order = orders.get(order_id)
+            if order is None:
+                order = self.get(order_id)
+                if order is None:
+                    continue
+            yield order
+
+    def find(self, merchant_id: str, customer_phone: str, message_key: str) -> Order | None:
+        """The order an earlier create for this session and message placed, if any."""
+        order_id = self._idempotency.get(f"{merchant_id}:{customer_phone}:{message_key}")
+        return self.get(order_id) if order_id is not None else None
+
+    def for_merchant(self, merchant_id: str, day: date | None = None, limit: int | None = None) -> list[Order]:
+        """A merchant's orders, newest first — all days, or one IST day."""
+        cold = self._cold
+        if day is not None:
+            days = [day]
+        else:
+            days = set(self._merchant_days.get(merchant_id, ()))
+            if cold is not None:
+                days.update(cold.days(merchant_id))
+            days = sorted(days, reverse=True)
+        orders = self._orders
+        result: list[Order] = []
+        for d in days:
+            recent = self._by_merchant_day.get((merchant_id, d), ())
+            result.extend(self._resolve(reversed(recent)))
+            if cold is not None:
+                recent = set(recent)
+                result.extend(
+                    orders.get(o.id, o) for o in reversed(cold.orders_in(merchant_id, d)) if o.id not in recent
+                )
+            if limit is not None and len(result) >= limit:
+                return result[:limit]
+        return result
+
+    def for_customer(self, customer_phone: str) -> list[Order]:
+        """A customer's orders across merchants, newest first."""
+        recent = self._by_customer.get(customer_phone, ())
+        result = list(self._resolve(reversed(recent)))
+        if self._cold is not None:
+            recent = set(recent)
+            result.extend(
+                self._orders.get(o.id, o) for o in self._cold.for_customer(customer_phone) if o.id not in recent
+            )
+            result.sort(key=lambda o: o.created_at, reverse=True)
+        return result
+
+    def with_status(self, merchant_id: str, status: OrderStatus, day: date | None = None) -> list[Order]:
+        """A merchant's orders currently in ``status``, oldest first (queue order).
+
+        Open statuses come straight from the status index; delivered and
+        cancelled orders are found by scanning the merchant's days.
+        """
+        if status in ACTIVE_STATUSES:
+            orders = list(self._resolve(self._by_status.get((merchant_id, status), ())))
+            if day is not None:
+                orders = [o for o in orders if o.created_at.astimezone(IST).date() == day]
+        else:
+            orders = self.for_merchant(merchant_id, day)[::-1]
+        return [o for o in orders if o.status == status]
+
+    def open_counts(self, merchant_id: str) -> dict[str, int]:
+        """Orders per open status — the dashboard's live queue sizes."""
+        return {s.value: len(self._by_status.get((merchant_id, s), ())) for s in OrderStatus if s in ACTIVE_STATUSES}
+
+    def stats(self) -> dict:
+        return {"orders": len(self), "in_memory": len(self._orders), "mutations": self.mutations}
@@ -0,0 +1,231 @@
+import asyncio
+import time
+from dataclasses import dataclass, replace
+from typing import AsyncIterator
+from models.merchant import Merchant
+from services.breaker import AgentGuard, AgentUnavailable, fallback_reply
+from services.cart import CartStore
+from services.coalescer import BurstCoalescer
+from services.concurrency import InflightLimiter, QueueTimeout
+from services.context import CatalogContextTracker, ContextTurn
+from services.fastpath import FastPath
+from services.hours import HoursGate
+from services.lyzr import arun_agent, astream_agent, lease_agent
+from services.mailbox import SessionScheduler
+
+
+@dataclass
+class ChatResult:
+    session_id: str
+    reply: str
+    session_wait: float = 0.0  # seconds behind earlier messages of the same session
+    queue_wait: float = 0.0    # seconds waiting for an in-flight slot
+    context: float = 0.0       # seconds building the catalog context and prompt
+    upstream: float = 0.0      # seconds inside the agent call
+    coalesced: bool = False    # merged into another message's agent call
+    source: str = "agent"      # "agent" | "fastpath" | "closed" | "fallback"
+
+
+def session_id_for(merchant: Merchant, sender: str) -> str:
+    return f"{merchant.id}:{sender}"
+
+
+class ChatPipeline:
+    """Customer message → agent reply, shared by /chat and the webhook.
+
+    Each message first waits its turn in its session's mailbox, then for an
+    in-flight slot, and only then leases an agent handle — so a backlog in one
+    conversation never holds capacity other conversations could use.
+    """
+
+    def __init__(
+        self,
+        limiter: InflightLimiter,
+        scheduler: SessionScheduler,
+        coalescer: BurstCoalescer,
+        fastpath: FastPath,
+        context: CatalogContextTracker,
+        carts: CartStore | None = None,
+        hours: HoursGate | None = None,
+        guard: AgentGuard | None = None,
+    ):
+        self.limiter = limiter
+        self.scheduler = scheduler
+        self.coalescer = coalescer
+        self.fastpath = fastpath
+        self.context = context
+        self.carts = carts if carts is not None else CartStore()
+        self.hours = hours  # None = never gate on operating hours
+        self.guard = guard  # None = no deadline or breaker around agent calls
+
+    async def process(self, merchant: Merchant, sender: str, message: str, agent) -> ChatResult:
+        """Raises QueueTimeout when no in-flight slot frees up in time.
+
+        ``agent`` may be a bare agent or an AgentHandlePool to lease from.
+        Merchants with a coalesce window get rapid-fire messages merged into
+        one agent call; every merged message receives the same reply.
+        """
+        session_id = session_id_for(merchant, sender)
+        if merchant.coalesce_window_ms <= 0:
+            return await self._run(merchant, session_id, message, agent)
+
+        result, merged = await self.coalescer.submit(
+            session_id,
+            message,
+            window=merchant.coalesce_window_ms / 1000,
+            run=lambda prompt: self._run(merchant, session_id, prompt, agent),
+        )
+        return replace(result, coalesced=True) if merged else result
+
+    async def _run(self, merchant: Merchant, session_id: str, message: str, agent) -> ChatResult:
+        arrived = time.perf_counter()
+        async with self.scheduler.turn(session_id):
+            session_wait = time.perf_counter() - arrived
+            # Answered inside the session turn so the reply can't overtake earlier ones
+            local_reply, source = self._answer_locally(merchant, message)
+            if local_reply is not None:
+                return ChatResult(
+                    session_id=session_id,
+                    reply=local_reply,
+                    session_wait=session_wait,
+                    source=source,
+                )
+            if self.guard is not None and not self.guard.available(merchant.id):
+                # Breaker open: answer now, without queueing for capacity healthy tenants need
+                return ChatResult(
+                    session_id=session_id,
+                    reply=fallback_reply(merchant),
+                    session_wait=session_wait,
+                    source="fallback",
+                )
+            context_start = time.perf_counter()
+            turn = self.context.prepare(merchant, session_id, message)
+            context = time.perf_counter() - context_start
+            async with self.limiter.slot(merchant.id) as queue_wait:
+                async with lease_agent(agent) as handle:
+                    prompt_start = time.perf_counter()
+                    prompt = self._prompt(merchant, turn)
+                    upstream_start = time.perf_counter()
+                    try:
+                        reply, source = await self._call_agent(merchant, agent, handle, prompt, session_id), "agent"
+                    except AgentUnavailable:
+                        reply, source = fallback_reply(merchant), "fallback"
+                    upstream = time.perf_counter() - upstream_start
+            if source == "agent":
+                self.context.record(turn)  # a lost turn's context is sent again next time
+        return ChatResult(
+            session_id=session_id,
+            reply=reply,
+            session_wait=session_wait,
+            queue_wait=queue_wait,
+            context=context + upstream_start - prompt_start,
+            upstream=upstream,
+            source=source,
+        )
+
+    async def _call_agent(self, merchant: Merchant, agent, handle, prompt: str, session_id: str) -> str:
+        if self.guard is None:
+            return await arun_agent(agent=handle, message=prompt, session_id=session_id)
+        return await self.guard.call(merchant.id, agent, handle, prompt, session_id)
+
+    def _answer_locally(self, merchant: Merchant, message: str) -> tuple[str | None, str]:
+        """A reply that needs no agent: a catalog lookup, or "we're closed"."""
+        reply = self.fastpath.answer(merchant, message)
+        if reply is not None:
+            return reply, "fastpath"
+        if self.hours is not None:
+            reply = self.hours.check(merchant)
+        return reply, "closed"
+
+    def _prompt(self, merchant: Merchant, turn: ContextTurn) -> str:
+        """The turn's prompt with the session's cart state just above the message."""
+        cart = self.carts.summary(merchant, turn.session_id)
+        if cart is None:
+            return turn.prompt
+        context = turn.prompt[: len(turn.prompt) - len(turn.message)]
+        return f"{context}{cart}\n{turn.message}"
+
+    async def stream(
+        self, merchant: Merchant, sender: str, message: str, agent, heartbeat: float = 2.0,
+    ) -> AsyncIterator[tuple[str, dict]]:
+        """Yield ``(event, data)`` pairs while a reply is produced.
+
+        ``status`` events mark progress (queued → thinking) and repeat every
+        ``heartbeat`` seconds of silence, so clients see activity even when
+        the agent can't stream. ``delta`` events carry reply text as it
+        arrives; the stream ends with ``done`` (full reply) or ``error``.
+        Streams bypass burst coalescing — the customer is watching live.
+        """
+        events: asyncio.Queue = asyncio.Queue()
+        producer = asyncio.create_task(self._produce(
+            merchant,
+            session_id_for(merchant, sender),
+            message,
+            agent,
+            emit=lambda event, data: events.put_nowait((event, data)),
+        ))
+        stage = "queued"
+        try:
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(events.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield "status", {"stage": stage}
+                    continue
+                if event == "status":
+                    stage = data["stage"]
+                yield event, data
+                if event in ("done", "error"):
+                    break
+        finally:
+            producer.cancel()
+
+    async def _produce(self, merchant: Merchant, session_id: str, message: str, agent, emit) -> None:
+        try:
+            emit("status", {"stage": "queued"})
+            async with self.scheduler.turn(session_id):
+                local_reply, source = self._answer_locally(merchant, message)
+                if local_reply is None and self.guard is not None and not self.guard.available(merchant.id):
+                    local_reply, source = fallback_reply(merchant), "fallback"
+                if local_reply is not None:
+                    emit("done", {"session_id": session_id, "reply": local_reply, "source": source})
+                    return
+                turn = self.context.prepare(merchant, session_id, message)
+                async with self.limiter.slot(merchant.id):
+                    emit("status", {"stage": "thinking"})
+                    pieces = []
+                    async with lease_agent(agent) as handle:
+                        prompt = self._prompt(merchant, turn)
+                        stream = (
+                            astream_agent(handle, prompt, session_id) if self.guard is None
+                            else self.guard.stream(merchant.id, handle, prompt, session_id)
+                        )
+                        try:
+                            async for piece in stream:
+                                pieces.append(piece)
+                                emit("delta", {"text": piece})
+                        except AgentUnavailable:
+                            if pieces:
+                                raise  # part of a reply is already out; report it cut short
+                            emit("done", {"session_id": session_id, "reply": fallback_reply(merchant),
+                                          "source": "fallback"})
+                            return
+                self.context.record(turn)
+            emit("done", {"session_id": session_id, "reply": "".join(pieces), "source": "agent"})
+        except QueueTimeout:
+            emit("error", {"detail": "Too many conversations in progress. Please retry."})
+        except Exception as exc:
+            emit("error", {"detail": f"Agent error: {exc}"})
+
+    def stats(self) -> dict:
+        return {
+            "limiter": self.limiter.stats(),
+            "sessions": self.scheduler.stats(),
+            "coalescing": self.coalescer.stats(),
+            "fastpath": self.fastpath.stats(),
+            "search": self.fastpath.search.stats(),
+            "context": self.context.stats(),
+            "carts": self.carts.stats(),
+            "hours_gate": self.hours.stats() if self.hours is not None else None,
+            "agent_guard": self.guard.stats() if self.guard is not None else None,
+        }
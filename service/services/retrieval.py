@@ -0,0 +1,129 @@
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from models.merchant import CatalogItem, Merchant
+from services.search import CatalogSearch
+
+
+@dataclass
+class _Outline:
+    version: int
+    size: int                           # available items
+    categories: list[tuple[str, int]]   # (category, available items), largest first
+    firsts: list[CatalogItem]           # first available item of each category
+
+
+def _outline(merchant: Merchant) -> _Outline:
+    items = [i for i in merchant.catalog if i.is_available]
+    firsts: dict[str, CatalogItem] = {}
+    for item in items:
+        firsts.setdefault(item.category, item)
+    categories = Counter(i.category for i in items).most_common()
+    return _Outline(merchant.catalog_version, len(items), categories, list(firsts.values()))
+
+
+def _item_text(item: CatalogItem) -> str:
+    return f"{item.name} (₹{item.price_inr})"
+
+
+class CatalogRetriever:
+    """Picks the catalog items relevant to a conversation, for large catalogs.
+
+    Items are ranked by ``search`` — the same Hinglish-folded CatalogSearch
+    the fast path prices from, so "choco" means the same item to both — with
+    the session's recent messages counting at half weight. Category outlines
+    are rebuilt once per catalog_version.
+    """
+
+    def __init__(
+        self,
+        top_k: int = 12,
+        budget_bytes: int = 1500,
+        min_items: int = 40,
+        cache_size: int = 1024,
+        search: CatalogSearch | None = None,
+    ):
+        self.top_k = top_k
+        self.budget_bytes = budget_bytes
+        self.min_items = min_items
+        self.cache_size = cache_size
+        self.search = search or CatalogSearch()
+        self._outlines: OrderedDict[str, _Outline] = OrderedDict()
+        self.outline_builds = 0
+
+    def _outline(self, merchant: Merchant) -> _Outline:
+        outline = self._outlines.get(merchant.id)
+        if outline is None or outline.version != merchant.catalog_version:
+            outline = _outline(merchant)
+            self.outline_builds += 1
+        self._outlines[merchant.id] = outline
+        self._outlines.move_to_end(merchant.id)
+        while len(self._outlines) > self.cache_size:
+            self._outlines.popitem(last=False)
+        return outline
+
+    def applies(self, merchant: Merchant) -> bool:
+        """True when the catalog is too large to send whole."""
+        return self._outline(merchant).size > self.min_items
+
+    def rank(self, merchant: Merchant, message: str, history: tuple[str, ...] = ()) -> list[CatalogItem]:
+        """Up to top_k matching items, best first.
+
+        When nothing matches (a greeting, say), one item per category stands in
+        so the agent still has something concrete to offer.
+        """
+        hits = self.search.search(merchant, message, limit=self.top_k, history=history)
+        if hits:
+            return [hit.item for hit in hits]
+        return self._outline(merchant).firsts[: self.top_k]
+
+    def summary(self, merchant: Merchant, items: list[CatalogItem]) -> tuple[str, list[CatalogItem]]:
+        """Catalog context with category headers and as many of ``items`` as fit the budget.
+
+        Returns the text and the items that made it in.
+        """
+        outline = self._outline(merchant)
+        hours = merchant.operating_hours
+        head = f"{merchant.name}. "
+        tail = (
+            f" Min order ₹{merchant.min_order_inr}. Delivery: {merchant.delivery_area}. "
+            f"Hours: {hours.open_time}–{hours.close_time}."
+        )
+        used = len(head.encode()) + len(tail.encode())
+
+        categories = []
+        for category, count in outline.categories:
+            part = f"{category} ({count})"
+            cost = len(part.encode()) + 2
+            if used + cost > self.budget_bytes:
+                break
+            categories.append(part)
+            used += cost
+        body = f"Categories: {', '.join(categories)}." if categories else ""
+        used += len(" Relevant items: .".encode())
+
+        included = self.fit(items, self.budget_bytes - used)
+        if included:
+            body += f" Relevant items: {self.render(included)}."
+        return head + body.lstrip() + tail, included
+
+    def fit(self, items: list[CatalogItem], budget: int) -> list[CatalogItem]:
+        """Longest prefix of ``items`` whose rendering stays within ``budget`` bytes."""
+        included, used = [], 0
+        for item in items:
+            cost = len(_item_text(item).encode()) + len(item.category.encode()) + 4
+            if used + cost > budget:
+                break
+            included.append(item)
+            used += cost
+        return included
+
+    @staticmethod
+    def render(items: list[CatalogItem]) -> str:
+        """``cake: Chocolate Cake (₹500), Vanilla Cake (₹400); thali: Veg Thali (₹120)``"""
+        grouped: dict[str, list[str]] = {}
+        for item in items:
+            grouped.setdefault(item.category, []).append(_item_text(item))
+        return "; ".join(f"{category}: {', '.join(texts)}" for category, texts in grouped.items())
+
+    def stats(self) -> dict:
+        return {"outlined_merchants": len(self._outlines), "outline_builds": self.outline_builds}
@@ -0,0 +1,306 @@
+import heapq
+import math
+import re
+import unicodedata
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from models.merchant import CatalogItem, Merchant
+
+_WORD = re.compile(r"[a-z0-9]+")
+# Words that never name an item: Hinglish question/filler words and generic English
+_STOPWORDS = frozenset({
+    "the", "a", "an", "and", "or", "of", "with", "for", "to", "in", "is", "me", "my", "i", "you", "have",
+    "please", "pls", "how", "much", "what", "price", "rate", "cost", "daam",
+    "ka", "ki", "ke", "ko", "hai", "hain", "kya", "wala", "wali", "wale", "vala", "vali",
+    "kitne", "kitna", "kitni", "aur", "bhi", "ek", "mujhe", "chahiye", "de", "do", "dena",
+})
+# Romanized Hindi is spelt many ways; fold the usual variants onto one form
+_FOLDS = [
+    ("ee", "i"), ("oo", "u"), ("ph", "f"), ("kh", "k"), ("gh", "g"), ("bh", "b"), ("dh", "d"), ("th", "t"), ("sh", "s"),
+    ("ck", "k"), ("q", "k"), ("ch", "\0"), ("c", "k"), ("\0", "c"),
+    ("w", "v"), ("z", "j"), ("y", "i"),
+]
+_REPEATS = re.compile(r"(.)\1+")
+_MIN_SIMILARITY = 0.45   # token pairs less alike than this don't match at all
+_MAX_EXPANSIONS = 8      # index tokens considered per query token
+_MAX_COMBINATIONS = 256  # score tiers intersected per query before giving up on filling the limit
+_HISTORY_WEIGHT = 0.5    # tokens from earlier messages of the session count half
+
+
+@lru_cache(maxsize=65536)
+def fold(word: str) -> str:
+    """Spelling-insensitive form of one lowercase word: chocolate → cokolate, paneer → panir."""
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]
+    for old, new in _FOLDS:
+        word = word.replace(old, new)
+    return _REPEATS.sub(r"\1", word)
+
+
+def normalize(text: str) -> list[str]:
+    """Folded search tokens of ``text``, accents stripped and stopwords dropped."""
+    text = unicodedata.normalize("NFKD", text.lower()).encode("ascii", "ignore").decode()
+    return [fold(w) for w in _WORD.findall(text) if w not in _STOPWORDS]
+
+
+def _grams(token: str) -> set[str]:
+    padded = f"${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _similarity(q: str, t: str, shared: int) -> float:
+    if q == t:
+        return 1.0
+    if len(q) >= 2 and t.startswith(q):
+        return 0.6 + 0.4 * len(q) / len(t)  # "choco" → "chocolate"
+    return 2 * shared / (len(q) + len(t))  # trigram Dice; a padded n-char token has n grams
+
+
+@dataclass
+class SearchHit:
+    item: CatalogItem
+    score: float
+
+
+@dataclass
+class _Entry:
+    item: CatalogItem
+    fingerprint: tuple
+    tokens: frozenset[str]
+    slot: int
+
+
+class ItemSearchIndex:
+    """Fuzzy item-name search over one merchant's catalog.
+
+    Names and categories are tokenized, folded for Hinglish spelling variants
+    and indexed by character trigram, so "choco cake", "red velvet wala" and
+    "nonveg thali" find their items. ``sync`` applies catalog changes item
+    by item rather than rebuilding.
+
+    Each item owns a bit slot and each token a bitmask of its items, so a
+    query is scored with whole-catalog AND/OR operations instead of visiting
+    every matching item — large catalogs repeat words like "large" thousands
+    of times.
+    """
+
+    def __init__(self):
+        self.version: int | None = None
+        self._entries: dict[str, _Entry] = {}
+        self._slots: list[_Entry | None] = []
+        self._free: list[int] = []
+        self._token_masks: dict[str, int] = {}
+        self._size_masks: dict[int, int] = {}  # token count -> items; fewer tokens = more specific
+        self._available = 0
+        self._occupied = 0
+        self._gram_tokens: dict[str, set[str]] = {}
+        self._expansions: dict[str, list[tuple[str, float]]] = {}
+        self.updates = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _tokens(item: CatalogItem) -> frozenset[str]:
+        words = normalize(item.name)
+        # Adjacent pairs as compounds too, so "nonveg" finds "Non-veg"
+        compounds = [a + b for a, b in zip(words, words[1:])]
+        return frozenset(words + compounds + normalize(item.category))
+
+    def sync(self, merchant: Merchant) -> int:
+        """Bring the index up to date with ``merchant.catalog``; returns items changed."""
+        if self.version == merchant.catalog_version:
+            return 0
+        changed = 0
+        current = set()
+        for item in merchant.catalog:
+            current.add(item.id)
+            entry = self._entries.get(item.id)
+            fingerprint = (item.name, item.category, item.is_available)
+            if entry is not None and entry.item is item and entry.fingerprint == fingerprint:
+                continue
+            self._remove(item.id)
+            self._add(item, fingerprint)
+            changed += 1
+        for item_id in self._entries.keys() - current:
+            self._remove(item_id)
+            changed += 1
+        self.version = merchant.catalog_version
+        self.updates += changed
+        return changed
+
+    def _add(self, item: CatalogItem, fingerprint: tuple) -> None:
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._slots)
+            self._slots.append(None)
+        tokens = self._tokens(item)
+        entry = self._slots[slot] = self._entries[item.id] = _Entry(item, fingerprint, tokens, slot)
+        bit = 1 << slot
+        for token in tokens:
+            mask = self._token_masks.get(token)
+            if mask is None:
+                mask = 0
+                for gram in _grams(token):
+                    self._gram_tokens.setdefault(gram, set()).add(token)
+                self._expansions.clear()
+            self._token_masks[token] = mask | bit
+        size = len(entry.tokens)
+        self._size_masks[size] = self._size_masks.get(size, 0) | bit
+        self._occupied |= bit
+        if item.is_available:
+            self._available |= bit
+
+    def _remove(self, item_id: str) -> None:
+        entry = self._entries.pop(item_id, None)
+        if entry is None:
+            return
+        bit = 1 << entry.slot
+        for token in entry.tokens:
+            mask = self._token_masks[token] ^ bit
+            if mask:
+                self._token_masks[token] = mask
+            else:
+                del self._token_masks[token]
+                for gram in _grams(token):
+                    self._gram_tokens[gram].discard(token)
+                self._expansions.clear()
+        self._size_masks[len(entry.tokens)] ^= bit
+        self._occupied ^= bit
+        self._available &= ~bit
+        self._slots[entry.slot] = None
+        self._free.append(entry.slot)
+
+    def _expand(self, q: str) -> list[tuple[str, float]]:
+        """Index tokens similar to query token ``q``, most similar first."""
+        matches = self._expansions.get(q)
+        if matches is None:
+            shared = Counter()
+            for gram in _grams(q):
+                shared.update(self._gram_tokens.get(gram, ()))
+            scored = ((t, _similarity(q, t, n)) for t, n in shared.items())
+            matches = heapq.nlargest(
+                _MAX_EXPANSIONS, (m for m in scored if m[1] >= _MIN_SIMILARITY), key=lambda m: m[1]
+            )
+            if len(self._expansions) < 4096:
+                self._expansions[q] = matches
+        return matches
+
+    def search(
+        self, query: str, limit: int = 5, available_only: bool = True, history: tuple[str, ...] = (),
+    ) -> list[SearchHit]:
+        """Best-matching items for ``query``, highest score first.
+
+        An item scores, per query token, the similarity of its best-matching
+        token times the query token's IDF. Each query token splits the catalog into tiers
+        (best match, next best, ..., no match); tier combinations are visited
+        in descending total score, so only as many as ``limit`` needs are
+        ever intersected. Tokens only found in ``history`` (earlier messages)
+        count at half weight.
+        """
+        n = len(self._entries)
+        allowed = self._available if available_only else self._occupied
+        weights: dict[str, float] = {}
+        for text, weight in [(h, _HISTORY_WEIGHT) for h in history] + [(query, 1.0)]:
+            for q in normalize(text):
+                weights[q] = max(weights.get(q, 0.0), weight)
+        tiers: list[list[tuple[float, int]]] = []
+        for q, weight in weights.items():
+            matches = self._expand(q)
+            covered = 0
+            for t, _ in matches:
+                covered |= self._token_masks[t]
+            if not covered:
+                continue
+            # Weight by how rare the query token's matches are, not each match on its
+            # own — otherwise a rare near-miss ("jainveg") outscores the exact word
+            idf = weight * math.log(1 + n / covered.bit_count())
+            seen, q_tiers = 0, []
+            for t, sim in matches:
+                mask = self._token_masks[t]
+                exclusive = mask & allowed & ~seen
+                seen |= mask
+                if exclusive:
+                    q_tiers.append((sim * idf, exclusive))
+            if q_tiers:
+                q_tiers.append((0.0, allowed & ~covered))
+                tiers.append(q_tiers)
+        if not tiers:
+            return []
+
+        first = (0,) * len(tiers)
+        heap = [(-sum(t[0][0] for t in tiers), first)]
+        visited = {first}
+        hits: list[SearchHit] = []
+        for _ in range(_MAX_COMBINATIONS):
+            if not heap or len(hits) >= limit:
+                break
+            neg_score, combo = heapq.heappop(heap)
+            if neg_score >= 0:
+                break  # everything left matches nothing
+            mask = allowed
+            for q_tiers, j in zip(tiers, combo):
+                mask &= q_tiers[j][1]
+                if not mask:
+                    break
+            for slot in self._slots_in(mask, limit - len(hits)):
+                hits.append(SearchHit(self._slots[slot].item, round(-neg_score, 4)))
+            for i, j in enumerate(combo):
+                if j + 1 < len(tiers[i]):
+                    nxt = combo[:i] + (j + 1,) + combo[i + 1:]
+                    if nxt not in visited:
+                        visited.add(nxt)
+                        step = tiers[i][j][0] - tiers[i][j + 1][0]
+                        heapq.heappush(heap, (neg_score + step, nxt))
+        return hits
+
+    def _slots_in(self, mask: int, limit: int) -> list[int]:
+        """Up to ``limit`` slots set in ``mask``, items with fewer tokens first."""
+        slots: list[int] = []
+        for size in sorted(self._size_masks):
+            bits = mask & self._size_masks[size]
+            while bits and len(slots) < limit:
+                low = bits & -bits
+                slots.append(low.bit_length() - 1)
+                bits ^= low
+            if len(slots) >= limit:
+                break
+        return slots
+
+    def stats(self) -> dict:
+        return {"items": len(self._entries), "tokens": len(self._token_masks), "updates": self.updates}
+
+
+class CatalogSearch:
+    """Per-merchant ItemSearchIndex registry, synced lazily on catalog_version."""
+
+    def __init__(self, max_merchants: int = 1024):
+        self.max_merchants = max_merchants
+        self._indexes: OrderedDict[str, ItemSearchIndex] = OrderedDict()
+        self.queries = 0
+
+    def index_for(self, merchant: Merchant) -> ItemSearchIndex:
+        index = self._indexes.get(merchant.id)
+        if index is None:
+            index = self._indexes[merchant.id] = ItemSearchIndex()
+            while len(self._indexes) > self.max_merchants:
+                self._indexes.popitem(last=False)
+        self._indexes.move_to_end(merchant.id)
+        index.sync(merchant)
+        return index
+
+    def search(
+        self, merchant: Merchant, query: str, limit: int = 5, available_only: bool = True,
+        history: tuple[str, ...] = (),
+    ) -> list[SearchHit]:
+        self.queries += 1
+        return self.index_for(merchant).search(query, limit, available_only, history)
+
+    def stats(self) -> dict:
+        return {
+            "indexed_merchants": len(self._indexes),
+            "queries": self.queries,
+            "item_updates": sum(i.updates for i in self._indexes.values()),
+        }
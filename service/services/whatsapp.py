@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable
+import httpx
+from services.mailbox import SessionScheduler
+from services.work_queue import WorkQueue
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Refills ``rate`` tokens per second up to ``burst``; one token per message."""
+
+    def __init__(self, rate: float, burst: float | None = None, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst if burst is not None else rate
+        self._clock = clock
+        self._tokens = self.burst
+        self._updated = clock()
+
+    def try_acquire(self) -> float:
+        """Take a token if available; otherwise return seconds until one will be."""
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    async def acquire(self) -> float:
+        """Wait for a token; returns seconds spent throttled."""
+        waited = 0.0
+        while (delay := self.try_acquire()) > 0:
+            await asyncio.sleep(delay)
+            waited += delay
+        return waited
+
+
+@dataclass
+class OutboundText:
+    phone_number_id: str   # business number's Cloud API ID — the rate-limit key
+    to: str                # "+919876543210"
+    body: str
+
+
+# 429 = throughput exceeded; 5xx = transient Meta errors
+_RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class WhatsAppSender:
+    """Delivers agent replies via the Cloud API ``/{Phone-Number-ID}/messages`` endpoint.
+
+    Replies go into a bounded outbox drained by a worker pool over the shared
+    pooled HTTP client. Each business number has its own token bucket, so no
+    number exceeds its Meta throughput tier however many workers are sending.
+    Replies to one customer go out one at a time, in the order they were
+    queued, retries included. Retryable failures back off exponentially with
+    full jitter; a ``Retry-After`` is honoured up to ``retry_after_max``.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        access_token: str,
+        base_url: str,
+        messages_per_second: float,
+        rate_overrides: dict[str, float] | None = None,
+        workers: int = 16,
+        max_outbox: int = 5000,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        retry_after_max: float = 60.0,
+    ):
+        self.client = client
+        self.access_token = access_token
+        self.base_url = base_url.rstrip("/")
+        self.messages_per_second = messages_per_second
+        self.rate_overrides = rate_overrides or {}
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_after_max = retry_after_max
+        self.outbox = WorkQueue(self.send, workers=workers, max_size=max_outbox)
+        self._buckets: dict[str, TokenBucket] = {}
+        self._recipients = SessionScheduler()  # per-recipient turns keep replies in order
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.throttled_s = 0.0
+
+    def bucket_for(self, phone_number_id: str) -> TokenBucket:
+        bucket = self._buckets.get(phone_number_id)
+        if bucket is None:
+            rate = self.rate_overrides.get(phone_number_id, self.messages_per_second)
+            bucket = self._buckets[phone_number_id] = TokenBucket(rate)
+        return bucket
+
+    def enqueue(self, phone_number_id: str, to: str, body: str) -> None:
+        """Queue a reply for delivery — raises asyncio.QueueFull when the outbox is full."""
+        self.outbox.submit_many([OutboundText(phone_number_id=phone_number_id, to=to, body=body)])
+
+    def _backoff(self, attempt: int, retry_after: str | None) -> float:
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.retry_after_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def send(self, message: OutboundText) -> bool:
+        """Deliver one message, retrying transient failures. Returns False once retries are exhausted.
+
+        Waits for earlier messages to the same recipient to be delivered or
+        given up on first.
+        """
+        async with self._recipients.turn(f"{message.phone_number_id}:{message.to}"):
+            return await self._deliver(message)
+
+    async def _deliver(self, message: OutboundText) -> bool:
+        url = f"{self.base_url}/{message.phone_number_id}/messages"
+        payload = {
+            "messaging_product": "whatsapp",
+            "recipient_type": "individual",
+            "to": message.to.lstrip("+"),
+            "type": "text",
+            "text": {"body": message.body},
+        }
+        headers = {"Authorization": f"Bearer {self.access_token}"}
+        bucket = self.bucket_for(message.phone_number_id)
+
+        for attempt in range(self.max_retries + 1):
+            self.throttled_s += await bucket.acquire()
+            retry_after = None
+            try:
+                resp = await self.client.post(url, json=payload, headers=headers)
+            except httpx.TransportError as exc:
+                reason = repr(exc)
+            else:
+                if resp.status_code < 400:
+                    self.sent += 1
+                    return True
+                if resp.status_code not in _RETRYABLE_STATUSES:
+                    self.failed += 1
+                    logger.error("WhatsApp rejected message to %s: %s %s", message.to, resp.status_code, resp.text)
+                    return False
+                reason = f"HTTP {resp.status_code}"
+                retry_after = resp.headers.get("Retry-After")
+            if attempt == self.max_retries:
+                break
+            self.retries += 1
+            delay = self._backoff(attempt, retry_after)
+            logger.warning("WhatsApp send to %s failed (%s); retrying in %.2fs", message.to, reason, delay)
+            await asyncio.sleep(delay)
+
+        self.failed += 1
+        logger.error("Giving up on WhatsApp message to %s after %d attempts", message.to, self.max_retries + 1)
+        return False
+
+    async def stop(self) -> None:
+        await self.outbox.stop()
+
+    def stats(self) -> dict:
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries,
+            "throttled_s": round(self.throttled_s, 3),
+            "recipients": self._recipients.stats(),
+            "outbox": self.outbox.stats(),
+        }
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class WorkQueue:
+    """Bounded in-process queue drained by a fixed pool of asyncio workers.
+
+    Workers start lazily on the first submit, so the queue can be created
+    outside a running event loop. Each item's lag — time from submit until a
+    worker picks it up — is tracked for observability.
+    """
+
+    def __init__(self, handler: Callable[[Any], Awaitable[None]], workers: int, max_size: int):
+        self.handler = handler
+        self.workers = workers
+        self.max_size = max_size
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self.submitted = 0
+        self.processed = 0
+        self.failed = 0
+        self.busy = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._total_lag = 0.0
+
+    def _ensure_started(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        return self._queue
+
+    def submit_many(self, items: list[Any]) -> None:
+        """Enqueue a batch atomically — raises asyncio.QueueFull and enqueues nothing if it won't fit."""
+        queue = self._ensure_started()
+        if queue.qsize() + len(items) > self.max_size:
+            raise asyncio.QueueFull
+        now = time.monotonic()
+        for item in items:
+            queue.put_nowait((now, item))
+        self.submitted += len(items)
+
+    async def _worker(self) -> None:
+        queue = self._queue
+        while True:
+            enqueued_at, item = await queue.get()
+            lag = time.monotonic() - enqueued_at
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            self._total_lag += lag
+            self.busy += 1
+            try:
+                await self.handler(item)
+                self.processed += 1
+            except Exception:
+                self.failed += 1
+                logger.exception("work queue handler failed")
+            finally:
+                self.busy -= 1
+                queue.task_done()
+
+    async def join(self) -> None:
+        """Wait until every submitted item has been handled."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def stats(self) -> dict:
+        done = self.processed + self.failed
+        return {
+            "depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_size": self.max_size,
+            "busy_workers": self.busy,
+            "workers": self.workers,
+            "submitted": self.submitted,
+            "processed": self.processed,
+            "failed": self.failed,
+            "last_lag_s": round(self.last_lag, 4),
+            "max_lag_s": round(self.max_lag, 4),
+            "avg_lag_s": round(self._total_lag / done, 4) if done else 0.0,
+        }
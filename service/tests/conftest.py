@@ -2,9 +2,16 @@ import pytest
 from unittest.mock import MagicMock
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
+from config import settings
 from routes.chat import router, get_agent
 
 
+@pytest.fixture(autouse=True)
+def hours_gate_off(monkeypatch):
+    """Route tests run at any time of day; merchant hours mustn't decide their outcome."""
+    monkeypatch.setattr(settings, "hours_gate_enabled", False)
+
+
 @pytest.fixture
 def mock_agent():
     agent = MagicMock()
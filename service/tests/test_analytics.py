@@ -0,0 +1,116 @@
+from datetime import date, datetime
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from models.order import OrderItem, OrderStatus
+from routes.analytics import router
+from routes.orders import order_engine_for
+from services.analytics import OrderAnalytics
+from services.orders import IST, OrderEngine
+
+
+def _line(item_id, name, price, qty):
+    return OrderItem(catalog_item_id=item_id, name=name, quantity=qty, unit_price_inr=price, total_price_inr=qty * price)
+
+
+class Clock:
+    def __init__(self, when):
+        self.when = when
+
+    def __call__(self):
+        return self.when
+
+
+def _engine():
+    clock = Clock(datetime(2026, 2, 18, 10, 15, tzinfo=IST))
+    engine = OrderEngine(now=clock)
+    cake, brownie = ("cake_choc_001", "Chocolate Cake", 500), ("brownie_001", "Walnut Brownie", 80)
+    engine.create("merchant_001", "+919800000001", [_line(*cake, 2)], "m1")                       # 1000
+    engine.create("merchant_001", "+919800000002", [_line(*cake, 1), _line(*brownie, 5)], "m2")   # 900
+    clock.when = datetime(2026, 2, 18, 19, 40, tzinfo=IST)
+    late, _ = engine.create("merchant_001", "+919800000003", [_line(*brownie, 10)], "m3")        # 800
+    clock.when = datetime(2026, 2, 19, 9, 0, tzinfo=IST)
+    engine.create("merchant_002", "+919800000001", [_line("thali_veg_001", "Veg Thali", 120, 3)], "m4")  # 360
+    return engine, clock, late
+
+
+def test_rollup_by_day_matches_a_plain_loop():
+    engine, _, _ = _engine()
+    analytics = OrderAnalytics(commission_pct=lambda m: 10.0 if m == "merchant_001" else 12.5)
+    engine.subscribe(analytics.add, analytics.extend)
+
+    assert analytics.rollup(("merchant", "day")) == [
+        {"merchant": "merchant_001", "day": "2026-02-18", "orders": 3, "gmv_inr": 2700,
+         "avg_basket_inr": 900.0, "commission_inr": 270.0},
+        {"merchant": "merchant_002", "day": "2026-02-19", "orders": 1, "gmv_inr": 360,
+         "avg_basket_inr": 360.0, "commission_inr": 45.0},
+    ]
+    assert [r["hour"] for r in analytics.rollup(("hour",), "merchant_001")] == [10, 19]
+    assert analytics.rollup((), start=date(2026, 2, 19))[0]["gmv_inr"] == 360
+
+
+def test_updates_incrementally_from_engine_writes():
+    engine, clock, late = _engine()
+    analytics = OrderAnalytics()
+    engine.subscribe(analytics.add, analytics.extend)
+
+    engine.transition(late.id, OrderStatus.cancelled)
+    clock.when = datetime(2026, 2, 19, 12, 0, tzinfo=IST)
+    engine.create("merchant_001", "+919800000004", [_line("cake_choc_001", "Chocolate Cake", 500, 1)], "m5")
+
+    by_day = analytics.rollup(("day",), "merchant_001")
+    assert [(r["day"], r["orders"], r["gmv_inr"]) for r in by_day] == [("2026-02-18", 2, 1900), ("2026-02-19", 1, 500)]
+    by_status = analytics.rollup(("status",), "merchant_001", statuses=list(OrderStatus))
+    assert {r["status"]: r["orders"] for r in by_status} == {"pending": 3, "cancelled": 1}
+    assert len(analytics) == 5
+
+
+def test_top_items_by_revenue():
+    engine, _, late = _engine()
+    analytics = OrderAnalytics()
+    engine.subscribe(analytics.add, analytics.extend)
+    engine.transition(late.id, OrderStatus.cancelled)
+
+    top = analytics.top_items("merchant_001")
+    assert [(r["item"], r["quantity"], r["revenue_inr"]) for r in top] == [
+        ("Chocolate Cake", 3, 1500), ("Walnut Brownie", 5, 400),
+    ]
+    assert top[0]["item_id"] == "cake_choc_001"
+    assert analytics.top_items("merchant_404") == []
+
+
+def test_commission_uses_the_rate_stored_on_the_order():
+    engine, _, _ = _engine()  # placed without a stored rate
+    lookups = []
+    analytics = OrderAnalytics(commission_pct=lambda m: lookups.append(m) or 10.0)
+    engine.subscribe(analytics.add, analytics.extend)
+    engine.create("merchant_001", "+919800000004", [_line("cake_choc_001", "Chocolate Cake", 500, 1)], "m5",
+                  commission_pct=20.0)
+    engine.create("merchant_003", "+919800000004", [_line("dosa_001", "Masala Dosa", 100, 1)], "m6",
+                  commission_pct=5.0)
+
+    rows = {r["merchant"]: r["commission_inr"] for r in analytics.rollup(("merchant",))}
+    assert rows == {"merchant_001": 370.0, "merchant_002": 36.0, "merchant_003": 5.0}
+    assert sorted(lookups) == ["merchant_001", "merchant_002"]  # once per merchant, during the backfill
+
+
+def test_unknown_group_key():
+    with pytest.raises(ValueError):
+        OrderAnalytics().rollup(("weekday",))
+
+
+def test_analytics_route():
+    app = FastAPI()
+    app.include_router(router)
+    engine, _, _ = _engine()
+    app.state.order_engine = engine
+    client = TestClient(app)
+
+    body = client.get("/analytics", params={"merchant_id": "merchant_001", "by": "day,hour", "top": 1}).json()
+    assert body["by"] == ["day", "hour"]
+    assert [(r["hour"], r["orders"]) for r in body["rows"]] == [(10, 2), (19, 1)]
+    assert body["rows"][0]["commission_inr"] == 190.0  # mock merchant_001 pays 10%
+    assert [r["item"] for r in body["top_items"]] == ["Chocolate Cake"]
+
+    assert order_engine_for(app) is engine
+    assert client.get("/analytics", params={"by": "weekday"}).status_code == 422
@@ -0,0 +1,44 @@
+import pytest
+from benchmarks.baseline import regressions
+from benchmarks.stub_agent import LatencyModel, StubAgent, StubAgentError, ThreadedStubAgent
+from services.lyzr import arun_agent
+
+
+def test_latency_specs():
+    assert LatencyModel("fixed:800").draw() == 0.8
+    assert all(0.2 <= LatencyModel("uniform:200-1500").draw() <= 1.5 for _ in range(100))
+    draws = sorted(LatencyModel("lognormal:100,0.5").draw() for _ in range(2001))
+    assert 0.08 < draws[1000] < 0.12
+    with pytest.raises(ValueError):
+        LatencyModel("gaussian:100")
+
+
+@pytest.mark.asyncio
+async def test_stub_agent_fails_at_its_error_rate():
+    agent = StubAgent("fixed:0", error_rate=0.2, seed=1)
+    failures = 0
+    for _ in range(500):
+        try:
+            assert await arun_agent(agent, "hi", "s1") == agent.reply
+        except StubAgentError:
+            failures += 1
+    assert agent.calls == 500
+    assert failures == agent.errors
+    assert 60 < failures < 140
+
+
+@pytest.mark.asyncio
+async def test_threaded_stub_agent_runs_on_a_worker_thread():
+    agent = ThreadedStubAgent("fixed:1")
+    assert await arun_agent(agent, "hi", "s1") == agent.reply
+    assert agent.calls == 1
+
+
+def test_regressions_compare_timings_only():
+    baseline = {"p99_ms": 100.0, "throughput_per_s": 50.0, "summary_ns": 1000.0, "inflight_max": 4}
+    results = {"p99_ms": 130.0, "throughput_per_s": 45.0, "summary_ns": 1100.0, "inflight_max": 40, "new_ms": 9.0}
+
+    worse = regressions(baseline, results, tolerance=0.25)
+
+    assert len(worse) == 1 and worse[0].startswith("p99_ms")
+    assert regressions(baseline, {"throughput_per_s": 30.0}, tolerance=0.25)[0].startswith("throughput_per_s")
@@ -0,0 +1,184 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from mocks.merchants import get_merchant
+from services.breaker import CLOSED, HALF_OPEN, OPEN, AgentGuard, AgentUnavailable, CircuitBreaker
+from services.coalescer import BurstCoalescer
+from services.concurrency import InflightLimiter
+from services.context import CatalogContextTracker
+from services.fastpath import FastPath
+from services.lyzr import AgentHandlePool
+from services.mailbox import SessionScheduler
+from services.pipeline import ChatPipeline
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Agent:
+    """Replies ``reply`` after ``delay`` seconds, or raises ``error``."""
+
+    def __init__(self, delay=0.0, reply="ok", error=None):
+        self.delay = delay
+        self.reply = reply
+        self.error = error
+        self.calls = 0
+
+    async def arun(self, message, session_id, stream=False):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return SimpleNamespace(response=self.reply)
+
+
+def _breaker(clock, **overrides):
+    options = dict(window=10, min_calls=4, error_rate=0.5, slow_call_s=1.0, slow_rate=0.5, open_s=30.0, probes=2)
+    return CircuitBreaker(clock=clock, **{**options, **overrides})
+
+
+def test_breaker_opens_on_errors_then_probes_and_closes():
+    clock = Clock()
+    breaker = _breaker(clock)
+    for ok in (True, False, True, False):
+        assert breaker.allow()
+        breaker.record(ok, 0.1)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+    clock.now = 30.0
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() and breaker.allow()
+    assert not breaker.allow()  # only two probes at a time
+    breaker.record(True, 0.1)
+    breaker.record(True, 0.1)
+    assert breaker.state == CLOSED
+
+
+def test_breaker_opens_on_slow_calls_and_a_failed_probe_reopens_it():
+    clock = Clock()
+    breaker = _breaker(clock)
+    for seconds in (2.0, 0.1, 2.0, 0.1):
+        breaker.record(True, seconds)
+    assert breaker.state == OPEN
+
+    clock.now = 30.0
+    assert breaker.allow()
+    breaker.record(True, 5.0)  # a slow probe counts as a failed one
+    assert breaker.state == OPEN
+    assert breaker.trips == 2
+
+
+def test_breaker_judges_a_rolling_window():
+    breaker = _breaker(Clock())
+    for ok in [True] * 6 + [False] * 4:
+        breaker.record(ok, 0.1)
+    assert breaker.state == CLOSED  # 4 of 10 failed
+
+    breaker.record(False, 0.1)  # the oldest success leaves the window: 5 of 10
+    assert breaker.state == OPEN
+
+
+def test_cancelled_probe_frees_its_slot():
+    clock = Clock()
+    breaker = _breaker(clock, probes=1)
+    for _ in range(4):
+        breaker.record(False, 0.1)
+    clock.now = 30.0
+    assert breaker.allow()
+    assert breaker.blocked
+    breaker.cancel()
+    assert not breaker.blocked
+
+
+@pytest.mark.asyncio
+async def test_guard_deadline_raises_and_counts_against_the_breaker():
+    guard = AgentGuard(timeout_s=0.01, breaker=lambda: _breaker(Clock(), min_calls=1))
+    agent = Agent(delay=1.0)
+
+    with pytest.raises(AgentUnavailable):
+        await guard.call("m1", agent, agent, "hi", "s1")
+
+    assert guard.timeouts == 1
+    assert guard.breaker("m1").state == OPEN
+    assert not guard.available("m1")
+    assert guard.available("m2")  # other tenants unaffected
+    assert guard.stats()["open"] == ["m1"]
+
+
+@pytest.mark.asyncio
+async def test_agent_errors_propagate_and_are_counted():
+    guard = AgentGuard(breaker=lambda: _breaker(Clock(), min_calls=1))
+    agent = Agent(error=RuntimeError("lyzr down"))
+
+    with pytest.raises(RuntimeError):
+        await guard.call("m1", agent, agent, "hi", "s1")
+    assert guard.breaker("m1").state == OPEN
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged_on_another_handle():
+    slow, fast = Agent(delay=1.0, reply="slow"), Agent(reply="fast")
+    handles = iter([fast])
+
+    async def create():
+        return next(handles)
+
+    pool = AgentHandlePool(create, size=2)
+    guard = AgentGuard(timeout_s=5.0, hedge_after_s=0.02)
+
+    assert await guard.call("m1", pool, slow, "hi", "s1") == "fast"
+    assert (guard.hedged, guard.hedge_wins) == (1, 1)
+    assert pool.leased == 0
+
+
+@pytest.mark.asyncio
+async def test_fast_call_is_not_hedged():
+    guard = AgentGuard(hedge_after_s=0.5)
+    agent = Agent()
+    assert await guard.call("m1", agent, agent, "hi", "s1") == "ok"
+    assert agent.calls == 1 and guard.hedged == 0
+
+
+def _pipeline(guard):
+    return ChatPipeline(
+        limiter=InflightLimiter(max_inflight=8, max_per_tenant=8),
+        scheduler=SessionScheduler(),
+        coalescer=BurstCoalescer(max_wait=1.0),
+        fastpath=FastPath(),
+        context=CatalogContextTracker(),
+        guard=guard,
+    )
+
+
+@pytest.mark.asyncio
+async def test_pipeline_answers_with_fallback_past_the_deadline_and_while_open():
+    merchant = get_merchant("merchant_001")
+    guard = AgentGuard(timeout_s=0.01, breaker=lambda: _breaker(Clock(), min_calls=1))
+    pipeline = _pipeline(guard)
+    agent = Agent(delay=1.0)
+
+    timed_out = await pipeline.process(merchant, "+91", "birthday cake design?", agent)
+    refused = await pipeline.process(merchant, "+92", "birthday cake design?", agent)
+
+    assert timed_out.source == refused.source == "fallback"
+    assert "maaf kijiye" in timed_out.reply and merchant.name in timed_out.reply
+    assert agent.calls == 1  # the second never reached the agent
+    assert pipeline.limiter.stats()["inflight"] == 0
+    assert pipeline.stats()["agent_guard"]["refused"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_falls_back_when_the_agent_times_out():
+    merchant = get_merchant("merchant_001")
+    pipeline = _pipeline(AgentGuard(timeout_s=0.01))
+
+    events = [e async for e in pipeline.stream(merchant, "+91", "birthday cake design?", Agent(delay=1.0))]
+
+    assert events[-1][0] == "done"
+    assert events[-1][1]["source"] == "fallback"
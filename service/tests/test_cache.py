@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+from services.cache import SingleFlightCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load():
+    cache = SingleFlightCache(max_size=10)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "agent"
+
+    results = await asyncio.gather(*(cache.get_or_load("k", loader) for _ in range(5)))
+
+    assert results == ["agent"] * 5
+    assert calls == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["shared_loads"] == 4
+
+
+@pytest.mark.asyncio
+async def test_hit_after_load():
+    cache = SingleFlightCache(max_size=10)
+
+    async def loader():
+        return "agent"
+
+    await cache.get_or_load("k", loader)
+    await cache.get_or_load("k", loader)
+
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_load_is_not_cached():
+    cache = SingleFlightCache(max_size=10)
+
+    async def failing():
+        raise RuntimeError("lyzr down")
+
+    async def ok():
+        return "agent"
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_load("k", failing)
+    assert await cache.get_or_load("k", ok) == "agent"
+
+
+def test_lru_eviction():
+    cache = SingleFlightCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")          # a is now most recently used
+    cache.put("c", 3)       # evicts b
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry():
+    clock = FakeClock()
+    cache = SingleFlightCache(max_size=2, ttl=60, clock=clock)
+    cache.put("a", 1)
+
+    clock.now = 59
+    assert cache.get("a") == 1
+    clock.now = 61
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
@@ -0,0 +1,176 @@
+import asyncio
+from datetime import datetime
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from mocks.merchants import get_merchant
+from routes.cart import router
+from services.cart import CartError, CartStore, ItemNotFound
+from services.orders import IST, NotDurable, OrderEngine
+
+
+class Clock:
+    def __init__(self, when=0.0):
+        self.when = when
+
+    def __call__(self):
+        return self.when
+
+
+def _merchant():
+    return get_merchant("merchant_001").model_copy(deep=True)  # min order ₹300
+
+
+def test_totals_and_min_order_are_computed_locally():
+    merchant, carts = _merchant(), CartStore()
+    carts.add(merchant, "s1", "cake_van_001")            # ₹400
+    carts.add(merchant, "s1", "cake_choc_001", 2)        # ₹1000
+    carts.add(merchant, "s1", "cake_choc_001")           # 3 × ₹500
+    view = carts.view(merchant, "s1")
+
+    assert [(l.item_id, l.quantity, l.total_price_inr) for l in view.lines] == [
+        ("cake_van_001", 1, 400), ("cake_choc_001", 3, 1500),
+    ]
+    assert view.subtotal_inr == 1900 and view.can_checkout
+
+    carts.set_quantity(merchant, "s1", "cake_choc_001", 0)
+    carts.remove(merchant, "s1", "cake_van_001")
+    carts.add(merchant, "s2", "cake_van_001")
+    merchant.min_order_inr = 500
+    view = carts.view(merchant, "s2")
+    assert view.shortfall_inr == 100 and not view.can_checkout
+    assert carts.view(merchant, "s1").lines == []
+
+
+def test_rejects_unknown_unavailable_and_silly_quantities():
+    merchant, carts = _merchant(), CartStore()
+    merchant.catalog[2].is_available = False
+    with pytest.raises(ItemNotFound):
+        carts.add(merchant, "s1", "cake_nope_001")
+    with pytest.raises(CartError):
+        carts.add(merchant, "s1", "cake_rv_001")
+    with pytest.raises(CartError):
+        carts.add(merchant, "s1", "cake_choc_001", 0)
+    with pytest.raises(CartError):
+        carts.set_quantity(merchant, "s1", "cake_choc_001", 100)
+
+
+def test_catalog_changes_reprice_the_cart():
+    merchant, carts = _merchant(), CartStore()
+    carts.add(merchant, "s1", "cake_choc_001", 2)
+    carts.add(merchant, "s1", "cake_van_001")
+    merchant.catalog[0].price_inr = 550
+    merchant.catalog[1].is_available = False
+
+    view = carts.view(merchant, "s1")
+    assert view.subtotal_inr == 1100
+    assert [l.available for l in view.lines] == [True, False]
+    assert "Chocolate Cake is now ₹550 (was ₹500)" in view.issues
+    assert not view.can_checkout
+    assert carts.summary(merchant, "s1") == (
+        "[Cart: 2× Chocolate Cake ₹1100, 1× Vanilla Cake unavailable | Subtotal ₹1100 | Min order ₹300 met"
+        " | Chocolate Cake is now ₹550 (was ₹500); Vanilla Cake is no longer available]"
+    )
+
+
+def test_idle_carts_expire():
+    merchant, clock = _merchant(), Clock()
+    carts = CartStore(ttl_s=60, clock=clock)
+    carts.add(merchant, "s1", "cake_choc_001")
+    clock.when = 30
+    carts.add(merchant, "s2", "cake_choc_001")
+    clock.when = 70
+    assert carts.get(merchant, "s1") is None
+    assert carts.get(merchant, "s2") is not None
+    assert carts.stats()["expired"] == 1 and len(carts) == 1
+
+
+def test_checkout_places_order_once():
+    merchant, carts = _merchant(), CartStore()
+    engine = OrderEngine(now=lambda: datetime(2026, 2, 18, 10, 0, tzinfo=IST))
+    with pytest.raises(CartError):
+        carts.checkout(merchant, "merchant_001:+91", engine, "+91", "wamid.1")
+    carts.add(merchant, "merchant_001:+91", "cake_choc_001", 2)
+
+    order, created = carts.checkout(merchant, "merchant_001:+91", engine, "+91", "wamid.1", notes="Eggless")
+    again, created_again = carts.checkout(merchant, "merchant_001:+91", engine, "+91", "wamid.1")
+
+    assert created and not created_again and again.id == order.id
+    assert order.subtotal_inr == 1000 and order.items[0].total_price_inr == 1000 and order.notes == "Eggless"
+    assert carts.get(merchant, "merchant_001:+91") is None
+
+
+def test_checkout_leaves_the_durability_wait_to_the_caller():
+    def durable(ticket):
+        raise NotDurable("log not flushed")
+
+    merchant, carts = _merchant(), CartStore()
+    engine = OrderEngine(durable=durable)
+    carts.add(merchant, "merchant_001:+91", "cake_choc_001", 2)
+
+    order, created = carts.checkout(merchant, "merchant_001:+91", engine, "+91", "wamid.1")
+
+    assert created and carts.get(merchant, "merchant_001:+91") is None
+    with pytest.raises(NotDurable):
+        engine.wait_durable()
+
+
+def test_checkout_waits_for_the_log_off_the_event_loop():
+    waited_on_loop = []
+
+    def durable(ticket):
+        try:
+            asyncio.get_running_loop()
+            waited_on_loop.append(True)
+        except RuntimeError:
+            waited_on_loop.append(False)
+
+    app = FastAPI()
+    app.include_router(router)
+    app.state.order_engine = OrderEngine(durable=durable)
+    client = TestClient(app)
+    base = "/merchants/merchant_002/carts/+919800000079"
+    client.put(f"{base}/items/thali_veg_001", json={"quantity": 2})
+
+    assert client.post(f"{base}/checkout", json={"message_key": "wamid.12"}).status_code == 200
+    assert waited_on_loop == [False]
+
+
+def test_cart_routes():
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+    base = "/merchants/merchant_002/carts/+919800000077"  # thalis, min order ₹240
+
+    assert client.post(f"{base}/items", json={"item": "veg thaali", "quantity": 1}).json()["shortfall_inr"] == 120
+    view = client.put(f"{base}/items/thali_veg_001", json={"quantity": 2}).json()
+    assert view["subtotal_inr"] == 240 and view["can_checkout"]
+    assert client.post(f"{base}/items", json={"item_id": "nope"}).status_code == 404
+
+    order = client.post(f"{base}/checkout", json={"message_key": "wamid.9"}).json()
+    assert order["subtotal_inr"] == 240 and order["session_id"] == "merchant_002:+919800000077"
+    assert client.get(base).json()["lines"] == []
+    assert client.post(f"{base}/checkout", json={"message_key": "wamid.10"}).status_code == 422
+
+
+def test_checkout_is_503_until_the_order_is_durable():
+    def durable(ticket):
+        if not confirmed:
+            raise NotDurable("log not flushed")
+
+    confirmed = False
+    app = FastAPI()
+    app.include_router(router)
+    app.state.order_engine = OrderEngine(durable=durable)
+    client = TestClient(app)
+    base = "/merchants/merchant_002/carts/+919800000078"
+    client.put(f"{base}/items/thali_veg_001", json={"quantity": 2})
+
+    assert client.post(f"{base}/checkout", json={"message_key": "wamid.11"}).status_code == 503
+    assert client.post(f"{base}/checkout", json={"message_key": "wamid.11"}).status_code == 503
+
+    assert client.get(base).json()["lines"] == []  # placed in memory; only the confirmation is pending
+
+    confirmed = True
+    retry = client.post(f"{base}/checkout", json={"message_key": "wamid.11"})
+    assert retry.status_code == 200 and retry.json()["subtotal_inr"] == 240
@@ -0,0 +1,69 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from mocks.merchants import MERCHANTS
+from routes.catalog import router
+from routes.hours import router as hours_router
+import services.merchant_store as merchant_store
+from services.merchant_store import MemorySource, MerchantStore
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = MerchantStore(MemorySource(m.model_copy(deep=True) for m in MERCHANTS.values()))
+    monkeypatch.setattr(merchant_store, "_default_store", store)
+    return store
+
+
+@pytest.fixture
+def client(store):
+    app = FastAPI()
+    app.include_router(router)
+    app.include_router(hours_router)
+    return TestClient(app)
+
+
+def test_sold_out_toggle_reaches_the_next_reader(client, store):
+    before = store.get("merchant_001")
+    assert "Chocolate Cake" in before.catalog_summary
+
+    r = client.post("/merchants/merchant_001/catalog/availability", json={"items": {"cake_choc_001": False}})
+    assert r.status_code == 200
+    assert r.json()["catalog_version"] != before.catalog_version
+    after = store.get("merchant_001")
+    assert "Chocolate Cake" not in after.catalog_summary
+    assert "Chocolate Cake" in before.catalog_summary  # a reader mid-turn keeps its snapshot
+
+    r = client.post("/merchants/merchant_001/catalog/availability", json={"items": {"cake_choc_001": True}})
+    assert "Chocolate Cake" in store.get("merchant_001").catalog_summary
+
+
+def test_patch_item(client, store):
+    r = client.patch("/merchants/merchant_001/catalog/items/cake_choc_001", json={"price_inr": 550})
+    assert r.status_code == 200
+    item = next(i for i in r.json()["items"] if i["id"] == "cake_choc_001")
+    assert item["price_inr"] == 550
+    assert item["name"] == "Chocolate Cake"
+
+    assert client.patch("/merchants/merchant_001/catalog/items/cake_choc_001", json={"price_inr": 0}).status_code == 422
+    assert client.patch("/merchants/merchant_001/catalog/items/ghost", json={"price_inr": 5}).status_code == 404
+    assert client.patch("/merchants/ghost/catalog/items/cake_choc_001", json={"price_inr": 5}).status_code == 404
+
+
+def test_replace_catalog(client, store):
+    items = client.get("/merchants/merchant_002/catalog").json()["items"][:1]
+    r = client.put("/merchants/merchant_002/catalog", json=items)
+    assert r.status_code == 200
+    assert [i.id for i in store.get("merchant_002").catalog] == [items[0]["id"]]
+    assert client.put("/merchants/merchant_002/catalog", json=items * 2).status_code == 422
+    assert client.get("/merchants/ghost/catalog").status_code == 404
+
+
+def test_hours_index_follows_updates(client, store):
+    at = {"at": "2026-02-22T12:00:00+05:30"}  # Sunday: merchant_002 is closed
+    assert "merchant_002" not in client.get("/merchants/open", params=at).json()["merchant_ids"]
+
+    hours = store.get("merchant_002").operating_hours.model_copy(update={"days": ["Sun"]})
+    store.update("merchant_002", operating_hours=hours)
+
+    assert "merchant_002" in client.get("/merchants/open", params=at).json()["merchant_ids"]
@@ -1,3 +1,11 @@
+import json
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import routes.chat as chat_route
+import services.lyzr as lyzr_service
+from services.cache import SingleFlightCache
+
+
 def test_chat_returns_reply(client, mock_agent):
     response = client.post("/chat", json={
         "merchant_id": "merchant_001",
@@ -38,3 +46,83 @@ def test_chat_unknown_merchant_returns_404(client):
 def test_chat_missing_fields_returns_422(client):
     response = client.post("/chat", json={"merchant_id": "merchant_001"})
     assert response.status_code == 422
+
+
+def test_chat_reports_queue_and_upstream_timing(client):
+    response = client.post("/chat", json={
+        "merchant_id": "merchant_001",
+        "sender": "+919876543210",
+        "message": "Hi",
+    })
+
+    timing = response.headers["Server-Timing"]
+    assert "queue;dur=" in timing
+    assert "upstream;dur=" in timing
+
+
+def test_header_agents_are_cached(monkeypatch, mock_agent):
+    init_calls = []
+
+    def fake_init(api_key, agent_id):
+        init_calls.append((api_key, agent_id))
+        return mock_agent
+
+    monkeypatch.setattr(lyzr_service, "init_lyzr", fake_init)
+    app = FastAPI()
+    app.include_router(chat_route.router)
+    app.state.agents_cache = SingleFlightCache(max_size=4)
+    client = TestClient(app)
+    headers = {"X-Lyzr-Api-Key": "key-1", "X-Lyzr-Agent-Id": "agent-1"}
+    body = {"merchant_id": "merchant_001", "sender": "+919876543210", "message": "Hi"}
+
+    assert client.post("/chat", json=body, headers=headers).status_code == 200
+    assert client.post("/chat", json=body, headers=headers).status_code == 200
+
+    assert init_calls == [("key-1", "agent-1")]
+    assert app.state.agents_cache.stats()["hits"] == 1
+
+
+def test_lookup_questions_skip_the_agent(client, mock_agent):
+    response = client.post("/chat", json={
+        "merchant_id": "merchant_002",
+        "sender": "+919876543210",
+        "message": "timing kya hai?",
+    })
+
+    assert response.status_code == 200
+    assert "11:00 se 15:00" in response.json()["reply"]
+    mock_agent.run.assert_not_called()
+
+
+def _sse(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_chat_stream_emits_status_and_done(client):
+    response = client.post("/chat/stream", json={
+        "merchant_id": "merchant_001",
+        "sender": "+919876543210",
+        "message": "Show me your cakes",
+    })
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _sse(response.text)
+    assert events[0] == ("status", {"stage": "queued"})
+    assert ("status", {"stage": "thinking"}) in events
+    assert events[-2] == ("delta", {"text": "Sure! We have Chocolate (₹500) and Vanilla (₹400)."})
+    assert events[-1][0] == "done"
+    assert events[-1][1]["reply"] == "Sure! We have Chocolate (₹500) and Vanilla (₹400)."
+
+
+def test_chat_stream_unknown_merchant_returns_404(client):
+    response = client.post("/chat/stream", json={
+        "merchant_id": "ghost_merchant",
+        "sender": "+919999999999",
+        "message": "Hello",
+    })
+    assert response.status_code == 404
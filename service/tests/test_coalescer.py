@@ -0,0 +1,122 @@
+import asyncio
+import pytest
+from services.coalescer import BurstCoalescer
+
+
+@pytest.mark.asyncio
+async def test_messages_within_window_share_one_call():
+    coalescer = BurstCoalescer(max_wait=1.0)
+    prompts = []
+
+    async def run(prompt):
+        prompts.append(prompt)
+        return f"reply to {len(prompts)}"
+
+    async def send(text, delay):
+        await asyncio.sleep(delay)
+        return await coalescer.submit("s1", text, window=0.03, run=run)
+
+    results = await asyncio.gather(send("hi", 0), send("menu?", 0.01))
+
+    assert prompts == ["hi\nmenu?"]
+    assert results == [("reply to 1", False), ("reply to 1", True)]
+    assert coalescer.stats()["agent_calls_saved"] == 1
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_not_merged_together():
+    coalescer = BurstCoalescer(max_wait=1.0)
+    prompts = []
+
+    async def run(prompt):
+        prompts.append(prompt)
+        return prompt
+
+    await asyncio.gather(
+        coalescer.submit("s1", "a", window=0.01, run=run),
+        coalescer.submit("s2", "b", window=0.01, run=run),
+    )
+
+    assert sorted(prompts) == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_max_wait_caps_a_never_ending_burst():
+    coalescer = BurstCoalescer(max_wait=0.05)
+    calls = []
+
+    async def run(prompt):
+        calls.append(prompt)
+        return prompt
+
+    async def chatter():
+        for i in range(10):
+            await asyncio.sleep(0.015)
+            asyncio.ensure_future(coalescer.submit("s1", str(i), window=0.03, run=run))
+
+    leader = asyncio.create_task(coalescer.submit("s1", "start", window=0.03, run=run))
+    await chatter()
+    await leader
+    await asyncio.sleep(0.1)
+
+    assert len(calls) >= 2  # the first burst closed at max_wait; later messages started a new one
+    assert calls[0].startswith("start")
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_member():
+    coalescer = BurstCoalescer(max_wait=1.0)
+
+    async def run(prompt):
+        raise RuntimeError("agent down")
+
+    async def send(text, delay):
+        await asyncio.sleep(delay)
+        return await coalescer.submit("s1", text, window=0.02, run=run)
+
+    results = await asyncio.gather(send("a", 0), send("b", 0.005), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_hands_the_burst_to_a_member():
+    coalescer = BurstCoalescer(max_wait=1.0)
+    prompts = []
+
+    async def run(prompt):
+        prompts.append(prompt)
+        return prompt
+
+    leader = asyncio.create_task(coalescer.submit("s1", "hi", window=0.2, run=run))
+    await asyncio.sleep(0.01)
+    member = asyncio.create_task(coalescer.submit("s1", "menu?", window=0.2, run=run))
+    await asyncio.sleep(0.01)
+
+    leader.cancel()  # the first customer's connection dropped mid-window
+
+    assert await asyncio.wait_for(member, 1.0) == ("hi\nmenu?", True)
+    assert prompts == ["hi\nmenu?"]
+    assert coalescer.stats()["handoffs"] == 1
+
+
+@pytest.mark.asyncio
+async def test_leader_cancelled_during_the_call_hands_off_too():
+    coalescer = BurstCoalescer(max_wait=1.0)
+    started = asyncio.Event()
+    calls = []
+
+    async def run(prompt):
+        calls.append(prompt)
+        if len(calls) == 1:
+            started.set()
+            await asyncio.sleep(10)
+        return "reply"
+
+    leader = asyncio.create_task(coalescer.submit("s1", "hi", window=0.02, run=run))
+    member = asyncio.create_task(coalescer.submit("s1", "menu?", window=0.02, run=run))
+    await started.wait()
+    leader.cancel()
+
+    assert await asyncio.wait_for(member, 1.0) == ("reply", True)
+    assert len(calls) == 2
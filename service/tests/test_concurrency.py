@@ -0,0 +1,56 @@
+import asyncio
+import pytest
+from services.concurrency import InflightLimiter, QueueTimeout
+
+
+@pytest.mark.asyncio
+async def test_slot_yields_queue_wait_and_tracks_inflight():
+    limiter = InflightLimiter(max_inflight=2, max_per_tenant=2)
+
+    async with limiter.slot("merchant_001") as queue_wait:
+        assert queue_wait >= 0
+        assert limiter.stats()["inflight"] == 1
+
+    assert limiter.stats()["inflight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_per_tenant_limit_does_not_block_other_tenants():
+    limiter = InflightLimiter(max_inflight=4, max_per_tenant=1, queue_timeout=0.05)
+
+    async with limiter.slot("merchant_001"):
+        # Same tenant is at its cap
+        with pytest.raises(QueueTimeout):
+            async with limiter.slot("merchant_001"):
+                pass
+        # A different tenant still gets through
+        async with limiter.slot("merchant_002"):
+            assert limiter.stats()["inflight"] == 2
+
+    assert limiter.stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_global_limit_queues_until_slot_frees():
+    limiter = InflightLimiter(max_inflight=1, max_per_tenant=5)
+    order = []
+
+    async def worker(name):
+        async with limiter.slot(name):
+            order.append(f"start:{name}")
+            await asyncio.sleep(0.01)
+            order.append(f"end:{name}")
+
+    await asyncio.gather(worker("a"), worker("b"))
+
+    assert order == ["start:a", "end:a", "start:b", "end:b"]
+
+
+@pytest.mark.asyncio
+async def test_idle_tenants_are_reclaimed():
+    limiter = InflightLimiter(max_inflight=2, max_per_tenant=1)
+
+    async with limiter.slot("merchant_001"):
+        pass
+
+    assert limiter._tenants == {}
@@ -0,0 +1,72 @@
+from mocks.merchants import get_merchant
+from services.context import CatalogContextTracker
+
+
+def _merchant():
+    return get_merchant("merchant_001").model_copy(deep=True)
+
+
+def _send(tracker, merchant, message="hi", session_id="s1"):
+    turn = tracker.prepare(merchant, session_id, message)
+    tracker.record(turn)
+    return turn
+
+
+def test_first_turn_sends_full_catalog_then_skips_it():
+    tracker = CatalogContextTracker()
+    merchant = _merchant()
+
+    first = _send(tracker, merchant)
+    second = _send(tracker, merchant, "1 chocolate cake")
+
+    assert first.kind == "full"
+    assert first.prompt.startswith("[Merchant: Amit's Cake Shop | Catalog:")
+    assert second.kind == "none"
+    assert second.prompt == "1 chocolate cake"
+    stats = tracker.stats()
+    assert stats["skipped"] == 1
+    assert stats["bytes_saved"] == first.context_bytes
+
+
+def test_catalog_change_is_sent_as_diff():
+    tracker = CatalogContextTracker()
+    merchant = _merchant()
+    _send(tracker, merchant)
+
+    merchant.catalog[0].price_inr = 550
+    merchant.catalog[1].is_available = False
+    turn = _send(tracker, merchant)
+
+    assert turn.kind == "diff"
+    assert turn.prompt == "[Catalog update: Chocolate Cake now ₹550; Vanilla Cake unavailable]\nhi"
+    assert 0 < turn.context_bytes < turn.full_bytes
+    assert _send(tracker, merchant).kind == "none"
+
+
+def test_full_catalog_is_refreshed_every_n_turns():
+    tracker = CatalogContextTracker(refresh_turns=3)
+    merchant = _merchant()
+
+    kinds = [_send(tracker, merchant).kind for _ in range(7)]
+
+    assert kinds == ["full", "none", "none", "full", "none", "none", "full"]
+
+
+def test_unrecorded_turn_is_resent():
+    tracker = CatalogContextTracker()
+    merchant = _merchant()
+
+    tracker.prepare(merchant, "s1", "hi")  # agent call failed — never recorded
+
+    assert tracker.prepare(merchant, "s1", "hi").kind == "full"
+
+
+def test_sessions_are_tracked_separately_and_bounded():
+    tracker = CatalogContextTracker(max_sessions=2)
+    merchant = _merchant()
+    for session_id in ("s1", "s2", "s3"):
+        _send(tracker, merchant, session_id=session_id)
+
+    assert tracker.stats()["sessions"] == 2
+    assert tracker.prepare(merchant, "s1", "hi").kind == "full"
+    assert tracker.prepare(merchant, "s3", "hi").kind == "none"
@@ -0,0 +1,71 @@
+import pytest
+from mocks.merchants import get_merchant
+from services.fastpath import FastPath, classify
+
+
+@pytest.mark.parametrize("message, intent", [
+    ("menu?", "menu"),
+    ("kya kya milta hai", "menu"),
+    ("timing kya hai?", "hours"),
+    ("kab tak khule ho", "hours"),
+    ("chocolate cake kitne ka?", "price"),
+    ("min order kitna hai", "min_order"),
+    ("hi", None),
+    ("2 chocolate cake order karna hai", None),
+    ("kal ke liye", None),
+    ("menu dekh ke batata hoon, pehle address note kar lo please bhai", None),
+])
+def test_classify(message, intent):
+    assert classify(message) == intent
+
+
+def test_menu_lists_available_items_only():
+    merchant = get_merchant("merchant_001").model_copy(deep=True)
+    merchant.catalog[2].is_available = False
+
+    reply = FastPath().answer(merchant, "menu?")
+
+    assert "Chocolate Cake — ₹500" in reply
+    assert "Red Velvet" not in reply
+    assert "Min order ₹300" in reply
+
+
+def test_hours_include_cutoff():
+    reply = FastPath().answer(get_merchant("merchant_001"), "timing kya hai?")
+    assert "09:00 se 21:00" in reply
+    assert "18:00" in reply
+
+
+def test_price_of_item():
+    reply = FastPath().answer(get_merchant("merchant_001"), "chocolate cake kitne ka?")
+    assert reply == "Chocolate Cake ₹500 ka hai. Order karna hai?"
+
+
+@pytest.mark.parametrize("message, reply", [
+    ("how much for 2 vanilla cakes", "Vanilla Cake ₹400 ka hai, to 2 ka total ₹800. Order karna hai?"),
+    ("teen red velvet kitne ka", "Red Velvet Cake ₹600 ka hai, to 3 ka total ₹1800. Order karna hai?"),
+    ("1 chocolate cake kitne ka?", "Chocolate Cake ₹500 ka hai. Order karna hai?"),
+    ("1 kg chocolate cake kitne ka", None),       # priced by weight: the agent knows
+    ("2 choco aur 1 vanilla kitne ka", None),     # a cart total: the agent's job
+])
+def test_price_multiplies_a_quantity(message, reply):
+    assert FastPath().answer(get_merchant("merchant_001"), message) == reply
+
+
+def test_price_without_item_falls_through():
+    assert FastPath().answer(get_merchant("merchant_001"), "kitne ka hai?") is None
+
+
+def test_disabled_merchant_falls_through():
+    merchant = get_merchant("merchant_001").model_copy(update={"fastpath_enabled": False})
+    assert FastPath().answer(merchant, "menu?") is None
+
+
+def test_hit_rate_stats():
+    fastpath = FastPath()
+    merchant = get_merchant("merchant_002")
+
+    fastpath.answer(merchant, "menu?")
+    fastpath.answer(merchant, "1 veg thali bhej do")
+
+    assert fastpath.stats() == {"checked": 2, "hits": {"menu": 1}, "hit_rate": 0.5}
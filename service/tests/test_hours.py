@@ -0,0 +1,144 @@
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock
+from mocks.merchants import get_merchant
+from models.merchant import OperatingHours
+from routes.hours import router
+from services.hours import AFTER_CUTOFF, CLOSED, OPEN, HoursGate, HoursIndex, compile_hours, schedule_for
+from services.orders import IST
+from services.coalescer import BurstCoalescer
+from services.concurrency import InflightLimiter
+from services.context import CatalogContextTracker
+from services.fastpath import FastPath
+from services.mailbox import SessionScheduler
+from services.pipeline import ChatPipeline
+
+
+def _at(day, hhmm):
+    """2026-02-16 is a Monday."""
+    hours, minutes = map(int, hhmm.split(":"))
+    return datetime(2026, 2, 16 + day, hours, minutes, tzinfo=IST)
+
+
+def test_schedule_states_follow_open_close_and_cutoff():
+    cakes = schedule_for(get_merchant("merchant_001").operating_hours)  # 09:00–21:00, cutoff 18:00, daily
+    assert cakes.state_at(_at(0, "08:59")) == CLOSED
+    assert cakes.state_at(_at(0, "09:00")) == OPEN
+    assert cakes.state_at(_at(0, "17:59")) == OPEN
+    assert cakes.state_at(_at(0, "18:00")) == AFTER_CUTOFF
+    assert cakes.state_at(_at(0, "21:00")) == CLOSED
+
+    lunch = schedule_for(get_merchant("merchant_002").operating_hours)  # 11:00–15:00, Mon–Sat
+    assert lunch.state_at(_at(5, "12:00")) == OPEN
+    assert lunch.state_at(_at(6, "12:00")) == CLOSED
+
+
+def test_state_is_read_in_ist():
+    cakes = schedule_for(get_merchant("merchant_001").operating_hours)
+    assert cakes.state_at(datetime.fromisoformat("2026-02-16T03:30:00+00:00")) == OPEN  # 09:00 IST
+
+
+def test_overnight_schedule_runs_past_midnight_and_wraps_the_week():
+    late = compile_hours("18:00", "02:00", "01:00", ("Sun",))
+    assert late.state_at(_at(6, "23:00")) == OPEN
+    assert late.state_at(_at(0, "00:30")) == OPEN              # Monday morning, still Sunday's shift
+    assert late.state_at(_at(0, "01:30")) == AFTER_CUTOFF
+    assert late.state_at(_at(0, "02:00")) == CLOSED
+    assert late.next_opening(_at(0, "03:00")) == _at(6, "18:00")
+
+
+def test_identical_hours_compile_once():
+    a = OperatingHours(open_time="10:00", close_time="20:00", order_cutoff=None, days=["Mon"])
+    assert schedule_for(a) is schedule_for(a.model_copy())
+
+
+def test_next_opening_skips_closed_days():
+    lunch = schedule_for(get_merchant("merchant_002").operating_hours)
+    assert lunch.next_opening(_at(0, "10:15")) == _at(0, "11:00")
+    assert lunch.next_opening(_at(5, "16:00")) == _at(7, "11:00")  # Sat evening -> Monday
+    assert compile_hours("09:00", "17:00", None, ()).next_opening(_at(0, "10:00")) is None
+
+
+def test_gate_replies_only_while_closed():
+    merchant = get_merchant("merchant_002")
+    now = _at(0, "10:00")
+    gate = HoursGate(clock=lambda: now)
+    assert "aaj 11:00 baje khulenge" in gate.check(merchant)
+
+    now = _at(0, "16:00")
+    assert "kal 11:00 baje" in gate.check(merchant)
+    now = _at(5, "16:00")
+    assert "Monday ko 11:00 baje" in gate.check(merchant)
+    now = _at(0, "12:00")
+    assert gate.check(merchant) is None
+    assert gate.stats() == {"checked": 4, "closed_replies": 3}
+
+
+def test_gate_lets_after_cutoff_messages_through():
+    gate = HoursGate(clock=lambda: _at(0, "19:00"))
+    assert gate.check(get_merchant("merchant_001")) is None
+
+
+def test_index_answers_who_is_open():
+    index = HoursIndex()
+    index.update([
+        ("m1", get_merchant("merchant_001").operating_hours),
+        ("m2", get_merchant("merchant_002").operating_hours),
+        ("m3", get_merchant("merchant_002").operating_hours),
+    ])
+    assert index.stats() == {"merchants": 3, "schedules": 2}
+    assert index.open_at(_at(0, "12:00")) == ["m1", "m2", "m3"]
+    assert index.open_at(_at(0, "19:00")) == ["m1"]
+    assert index.open_at(_at(0, "19:00"), accepting_orders=True) == []
+    assert index.open_at(_at(6, "12:00")) == ["m1"]
+
+    index.update([("m1", OperatingHours(open_time="00:00", close_time="00:00", order_cutoff=None, days=["Mon"]))])
+    assert index.open_at(_at(0, "23:00"), accepting_orders=True) == ["m1"]
+    assert len(index) == 3
+
+
+def test_hours_routes():
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+
+    r = client.get("/merchants/merchant_002/hours", params={"at": "2026-02-21T16:00:00+05:30"})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["open"] is False and body["accepting_orders"] is False
+    assert body["next_opening"] == "2026-02-23T11:00:00+05:30"
+    assert client.get("/merchants/nope/hours").status_code == 404
+
+    r = client.get("/merchants/open", params={"at": "2026-02-16T19:00:00+05:30"})
+    assert "merchant_001" in r.json()["merchant_ids"]
+    assert "merchant_002" not in r.json()["merchant_ids"]
+    r = client.get("/merchants/open", params={"at": "2026-02-16T19:00:00", "accepting_orders": True})
+    assert "merchant_001" not in r.json()["merchant_ids"]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_answers_closed_merchants_without_the_agent():
+    pipeline = ChatPipeline(
+        limiter=InflightLimiter(max_inflight=8, max_per_tenant=8),
+        scheduler=SessionScheduler(),
+        coalescer=BurstCoalescer(max_wait=0.0),
+        fastpath=FastPath(),
+        context=CatalogContextTracker(),
+        hours=HoursGate(clock=lambda: _at(6, "12:00")),
+    )
+    agent = MagicMock()
+
+    async def arun(message, session_id):
+        return SimpleNamespace(response="ok")
+
+    agent.arun = MagicMock(side_effect=arun)
+    result = await pipeline.process(get_merchant("merchant_002"), "+919800000061", "Menu bhejo", agent)
+    assert result.source == "closed"
+    assert "kal 11:00 baje" in result.reply
+    agent.arun.assert_not_called()
+
+    result = await pipeline.process(get_merchant("merchant_001"), "+919800000061", "Menu bhejo", agent)
+    assert result.source == "agent"
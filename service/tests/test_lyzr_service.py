@@ -1,5 +1,9 @@
-from unittest.mock import MagicMock
-from services.lyzr import run_agent
+import asyncio
+import os
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+import services.lyzr as lyzr_service
+from services.lyzr import AgentHandlePool, arun_agent, astream_agent, init_lyzr, run_agent
 
 
 def test_run_agent_calls_lyzr_with_correct_args():
@@ -37,3 +41,177 @@ def test_run_agent_returns_response_string():
 
     assert isinstance(result, str)
     assert result == "We have thali for ₹120"
+
+
+@pytest.mark.asyncio
+async def test_arun_agent_awaits_native_arun():
+    mock_response = MagicMock()
+    mock_response.response = "Async cakes!"
+
+    mock_agent = MagicMock()
+    mock_agent.arun = AsyncMock(return_value=mock_response)
+
+    reply = await arun_agent(
+        agent=mock_agent,
+        message="Show me your cakes",
+        session_id="merchant_001:+919876543210",
+    )
+
+    mock_agent.arun.assert_awaited_once_with(
+        "Show me your cakes",
+        session_id="merchant_001:+919876543210",
+    )
+    mock_agent.run.assert_not_called()
+    assert reply == "Async cakes!"
+
+
+@pytest.mark.asyncio
+async def test_arun_agent_falls_back_to_sync_run():
+    mock_response = MagicMock()
+    mock_response.response = "We have thali for ₹120"
+
+    mock_agent = MagicMock()
+    mock_agent.run.return_value = mock_response
+
+    reply = await arun_agent(
+        agent=mock_agent,
+        message="What do you have?",
+        session_id="merchant_002:+911234567890",
+    )
+
+    mock_agent.run.assert_called_once()
+    assert reply == "We have thali for ₹120"
+
+
+def test_init_lyzr_passes_key_without_touching_environ(monkeypatch):
+    monkeypatch.delenv("LYZR_API_KEY", raising=False)
+    studio_cls = MagicMock()
+    monkeypatch.setattr(lyzr_service, "_studio", lambda: studio_cls)
+
+    init_lyzr(api_key="tenant-key", agent_id="agent-1")
+
+    studio_cls.assert_called_once_with(api_key="tenant-key")
+    studio_cls.return_value.get_agent.assert_called_once_with("agent-1")
+    assert "LYZR_API_KEY" not in os.environ
+
+
+@pytest.mark.asyncio
+async def test_agent_pool_grows_only_under_contention():
+    created = []
+
+    async def create():
+        created.append(object())
+        return created[-1]
+
+    pool = AgentHandlePool(create, size=2, first="first")
+
+    async with pool.lease() as a:
+        assert a == "first"
+    async with pool.lease() as b:
+        assert b == "first"  # idle handle reused, nothing created
+    assert created == []
+
+    async with pool.lease() as first, pool.lease() as second:
+        assert first == "first"
+        assert second is created[0]
+    assert pool.stats() == {"handles": 2, "leased": 0, "size": 2, "ready": True}
+
+
+@pytest.mark.asyncio
+async def test_agent_pool_waits_when_all_handles_leased():
+    async def create():
+        raise AssertionError("pool is full, nothing should be created")
+
+    pool = AgentHandlePool(create, size=1, first="only")
+    handle = await pool.acquire()
+    waiter = asyncio.create_task(pool.acquire())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    pool.release(handle)
+    assert await waiter == "only"
+
+
+@pytest.mark.asyncio
+async def test_agent_pool_waiter_retries_when_a_fetch_fails():
+    attempts = []
+    release_first = asyncio.Event()
+
+    async def create():
+        attempts.append(1)
+        if len(attempts) == 1:
+            await release_first.wait()
+            raise ConnectionError("lyzr unreachable")
+        return "handle"
+
+    pool = AgentHandlePool(create, size=1)
+    first = asyncio.create_task(pool.acquire())
+    waiter = asyncio.create_task(pool.acquire())
+    await asyncio.sleep(0)
+    assert len(attempts) == 1 and not waiter.done()
+
+    release_first.set()
+    with pytest.raises(ConnectionError):
+        await first
+    assert await asyncio.wait_for(waiter, 1.0) == "handle"  # fetched it itself
+    assert pool.stats() == {"handles": 1, "leased": 1, "size": 1, "ready": True}
+
+
+class _Chunk:
+    def __init__(self, content, done=False):
+        self.content = content
+        self.delta = None if done else content
+        self.done = done
+
+
+class StreamingAgent:
+    def __init__(self, pieces):
+        self.pieces = pieces
+
+    async def arun(self, message, session_id, stream=False):
+        async def chunks():
+            for piece in self.pieces:
+                yield _Chunk(piece)
+            yield _Chunk("".join(self.pieces), done=True)
+        return chunks()
+
+
+@pytest.mark.asyncio
+async def test_astream_agent_yields_pieces_once():
+    agent = StreamingAgent(["Namaste! ", "Chocolate Cake ", "₹500."])
+
+    pieces = [p async for p in astream_agent(agent, "menu", "s1")]
+
+    assert pieces == ["Namaste! ", "Chocolate Cake ", "₹500."]
+
+
+@pytest.mark.asyncio
+async def test_astream_agent_without_streaming_yields_whole_reply():
+    mock_agent = MagicMock()
+    mock_agent.run.return_value.response = "Full reply"
+
+    pieces = [p async for p in astream_agent(mock_agent, "menu", "s1")]
+
+    assert pieces == ["Full reply"]
+
+
+@pytest.mark.asyncio
+async def test_prewarm_retries_until_a_handle_is_fetched():
+    attempts = []
+
+    async def create():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("lyzr unreachable")
+        return "handle"
+
+    pool = AgentHandlePool(create, size=2)
+    assert not pool.ready
+
+    await lyzr_service.prewarm(pool, retry_s=0.001)
+
+    assert pool.ready
+    assert len(attempts) == 2
+    assert pool.stats() == {"handles": 1, "leased": 0, "size": 2, "ready": True}
+    assert await pool.acquire() == "handle"  # the warmed handle is reused, not refetched
+    assert len(attempts) == 2
@@ -0,0 +1,73 @@
+import asyncio
+import pytest
+from services.mailbox import SessionScheduler
+
+
+@pytest.mark.asyncio
+async def test_same_session_runs_in_arrival_order():
+    scheduler = SessionScheduler()
+    log = []
+
+    async def message(name, delay):
+        async with scheduler.turn("s1"):
+            log.append(f"start:{name}")
+            await asyncio.sleep(delay)
+            log.append(f"end:{name}")
+
+    # The first message is the slowest — later ones must still wait for it
+    await asyncio.gather(message("a", 0.03), message("b", 0.01), message("c", 0))
+
+    assert log == ["start:a", "end:a", "start:b", "end:b", "start:c", "end:c"]
+
+
+@pytest.mark.asyncio
+async def test_different_sessions_run_in_parallel():
+    scheduler = SessionScheduler()
+    running = 0
+    peak = 0
+
+    async def message(session_id):
+        nonlocal running, peak
+        async with scheduler.turn(session_id):
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(message(f"s{i}") for i in range(5)))
+
+    assert peak == 5
+
+
+@pytest.mark.asyncio
+async def test_idle_mailboxes_are_reclaimed():
+    scheduler = SessionScheduler()
+
+    async with scheduler.turn("s1"):
+        assert scheduler.depth("s1") == 1
+
+    assert scheduler.stats()["active_sessions"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_break_order():
+    scheduler = SessionScheduler()
+    log = []
+    gate = asyncio.Event()
+
+    async def message(name):
+        async with scheduler.turn("s1"):
+            log.append(name)
+            if name == "a":
+                await gate.wait()
+
+    first = asyncio.create_task(message("a"))
+    second = asyncio.create_task(message("b"))
+    third = asyncio.create_task(message("c"))
+    await asyncio.sleep(0)
+    second.cancel()
+    gate.set()
+    await asyncio.gather(first, third)
+
+    assert log == ["a", "c"]
+    assert scheduler.stats()["active_sessions"] == 0
@@ -0,0 +1,87 @@
+import asyncio
+import subprocess
+import sys
+import threading
+import time
+from fastapi.testclient import TestClient
+import main
+import services.lyzr as lyzr_service
+from config import settings
+from main import app
+from routes.chat import pipeline_for
+
+
+def test_lyzr_sdk_is_not_imported_at_startup():
+    code = "import sys, main; print('lyzr' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
+
+
+def test_serves_while_the_default_agent_warms_up(monkeypatch, mock_agent):
+    released = threading.Event()
+
+    def slow_init(api_key, agent_id):
+        released.wait(5)
+        return mock_agent
+
+    monkeypatch.setattr(settings, "lyzr_api_key", "key")
+    monkeypatch.setattr(settings, "comverse_agent_id", "agent")
+    monkeypatch.setattr(lyzr_service, "init_lyzr", slow_init)
+    try:
+        with TestClient(app) as client:
+            assert client.get("/health").json() == {"status": "ok"}
+            assert client.get("/ready").status_code == 503
+            menu = client.post("/chat", json={"merchant_id": "merchant_001", "sender": "+919876543210",
+                                              "message": "menu dikhao"})
+            assert menu.status_code == 200  # fast path: no agent needed
+            mock_agent.run.assert_not_called()
+
+            released.set()
+            deadline = time.monotonic() + 5
+            while client.get("/ready").status_code != 200 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert client.get("/ready").json() == {"status": "ready"}
+            assert client.get("/stats").json()["default_agent_pool"]["ready"] is True
+    finally:
+        released.set()
+        for name in ("agent_pool", "agent_warmup"):
+            if hasattr(app.state, name):
+                delattr(app.state, name)
+
+
+def test_stats_reads_pipeline_counters_on_the_event_loop(monkeypatch):
+    pipeline = pipeline_for(app)
+    on_loop = []
+
+    def stats():
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return {}
+
+    monkeypatch.setattr(pipeline, "stats", stats)
+    with TestClient(app) as client:
+        assert client.get("/stats").status_code == 200
+
+    assert on_loop == [True]
+
+
+def test_shutdown_drains_the_webhook_queue_before_closing_the_store(monkeypatch):
+    closed = []
+
+    class Queue:
+        async def stop(self):
+            closed.append("webhook_queue")
+
+    class Store:
+        def close(self):
+            closed.append("merchant_store")
+
+    monkeypatch.setattr(main, "get_store", Store)
+    with TestClient(app):
+        app.state.webhook_queue = Queue()
+    del app.state.webhook_queue
+
+    assert closed == ["webhook_queue", "merchant_store"]
@@ -0,0 +1,234 @@
+import threading
+import time
+import pytest
+from mocks.merchants import MERCHANTS
+from services.merchant_store import (
+    MemorySource,
+    MerchantStore,
+    NdjsonSource,
+    open_store,
+    write_ndjson,
+    write_sqlite,
+)
+
+
+@pytest.fixture(params=["memory", "ndjson", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MerchantStore(MemorySource(m.model_copy(deep=True) for m in MERCHANTS.values()))
+    if request.param == "ndjson":
+        path = tmp_path / "merchants.ndjson"
+        write_ndjson(path, MERCHANTS.values())
+    else:
+        path = tmp_path / "merchants.db"
+        write_sqlite(path, MERCHANTS.values())
+    return open_store(str(path))
+
+
+def test_get_by_id(store):
+    merchant = store.get("merchant_001")
+    assert merchant.name == "Amit's Cake Shop"
+    assert store.get("merchant_001") is merchant
+    assert store.get("ghost") is None
+
+
+def test_get_by_phone(store):
+    assert store.get_by_phone("+919876500001").id == "merchant_002"
+    assert store.get_by_phone("+910000000000") is None
+
+
+def test_get_by_catalog_id(store):
+    assert store.get_by_catalog_id("cat_mock_001").id == "merchant_001"
+
+
+def test_find_by_retailer_id(store):
+    assert store.find_by_retailer_id("thali_veg_001") == ["merchant_002"]
+    assert store.find_by_retailer_id("nope") == []
+
+
+def test_find_by_category_respects_availability(tmp_path):
+    merchant = MERCHANTS["merchant_002"].model_copy(deep=True)
+    for item in merchant.catalog:
+        item.is_available = False
+    path = tmp_path / "merchants.db"
+    write_sqlite(path, [MERCHANTS["merchant_001"], merchant])
+    store = open_store(str(path))
+
+    assert store.find_by_category("cake") == ["merchant_001"]
+    assert store.find_by_category("thali") == []
+    assert store.find_by_category("thali", available_only=False) == ["merchant_002"]
+
+
+def test_ndjson_source_is_lazy(tmp_path):
+    path = tmp_path / "merchants.ndjson"
+    write_ndjson(path, MERCHANTS.values())
+    source = NdjsonSource(path)
+    assert source._offsets is None
+
+    store = MerchantStore(source)
+    assert store.get("merchant_002").name == "Priya's Thali House"
+    assert len(store) == 2
+
+
+def test_resident_merchants_are_bounded():
+    store = MerchantStore(MemorySource(MERCHANTS.values()), max_resident=1)
+
+    store.get("merchant_001")
+    store.get("merchant_002")
+
+    assert store.stats()["resident"] == 1
+    assert store.stats()["evictions"] == 1
+
+
+def test_unsupported_store_file():
+    with pytest.raises(ValueError):
+        open_store("merchants.csv")
+
+
+def test_update_swaps_in_a_new_revision(store):
+    before = store.get("merchant_002")
+    seen = []
+    store.subscribe(lambda merchant_id, merchant: seen.append((merchant_id, merchant)))
+
+    thalis = {item.id: {"is_available": False} for item in before.catalog if item.category == "thali"}
+    after = store.update_items("merchant_002", thalis)
+
+    assert store.get("merchant_002") is after
+    assert seen == [("merchant_002", after)]
+    assert after.catalog_version != before.catalog_version
+    # The old revision is untouched for readers still holding it
+    assert all(item.is_available for item in before.catalog if item.category == "thali")
+    assert not any(item.is_available for item in after.catalog if item.category == "thali")
+    # Unchanged items are shared, not copied
+    assert [a is b for a, b in zip(before.catalog, after.catalog)] == [i.category != "thali" for i in before.catalog]
+    assert store.find_by_category("thali") == []
+    assert store.find_by_category("thali", available_only=False) == ["merchant_002"]
+    assert store.stats()["updates"] == 1
+
+
+def test_update_rejects_unknown_ids_without_saving(store):
+    with pytest.raises(KeyError):
+        store.update_items("merchant_001", {"cake_choc_001": {"is_available": False}, "ghost": {"is_available": False}})
+    with pytest.raises(KeyError):
+        store.update("ghost", name="Nobody")
+    assert store.get("merchant_001").catalog[0].is_available
+    assert store.stats()["updates"] == 0
+
+
+@pytest.mark.parametrize("suffix", [".ndjson", ".db"])
+def test_updates_persist(tmp_path, suffix):
+    path = tmp_path / f"merchants{suffix}"
+    (write_ndjson if suffix == ".ndjson" else write_sqlite)(path, MERCHANTS.values())
+    store = open_store(str(path))
+    store.update("merchant_001", name="Amit's Bakery", phone="+919999999999")
+
+    reopened = open_store(str(path))
+    assert reopened.get("merchant_001").name == "Amit's Bakery"
+    assert reopened.get_by_phone("+919999999999").id == "merchant_001"
+    assert reopened.get_by_phone("+911234567890") is None
+    assert len(reopened) == 2
+
+
+def test_ndjson_saves_are_compacted(tmp_path):
+    path = tmp_path / "merchants.ndjson"
+    write_ndjson(path, MERCHANTS.values())
+    size = path.stat().st_size
+    store = open_store(str(path))
+    for n in range(20):
+        store.update_items("merchant_001", {"cake_choc_001": {"price_inr": 500 + n}})
+
+    assert path.stat().st_size < 3 * size
+    assert len(path.read_text().splitlines()) <= 4
+    assert open_store(str(path)).get("merchant_001").catalog[0].price_inr == 519
+    assert store.get("merchant_002").name == "Priya's Thali House"
+
+
+def _edit_outside(path, name):
+    merchants = [m.model_copy(update={"name": name}) if m.id == "merchant_002" else m for m in MERCHANTS.values()]
+    (write_ndjson if path.suffix == ".ndjson" else write_sqlite)(path, merchants)
+
+
+@pytest.mark.parametrize("suffix", [".ndjson", ".db"])
+def test_reload_picks_up_outside_edits(tmp_path, suffix):
+    path = tmp_path / f"merchants{suffix}"
+    (write_ndjson if suffix == ".ndjson" else write_sqlite)(path, MERCHANTS.values())
+    store = open_store(str(path))
+    assert store.reload() == 0  # baseline
+    untouched = store.get("merchant_001")
+    store.get("merchant_002")
+    time.sleep(0.01)  # a distinct mtime for the edit
+
+    _edit_outside(path, "Priya's Kitchen")
+
+    assert store.reload() == 1
+    assert store.get("merchant_002").name == "Priya's Kitchen"
+    assert store.get("merchant_001") is untouched
+    assert store.reload() == 0
+
+
+def test_a_half_written_file_is_not_reloaded(tmp_path):
+    path = tmp_path / "merchants.ndjson"
+    write_ndjson(path, MERCHANTS.values())
+    store = open_store(str(path))
+    assert store.reload() == 0  # baseline
+    store.get("merchant_002")
+    renamed = path.read_bytes().replace(b"Priya", b"Priyas")
+    time.sleep(0.01)
+
+    path.write_bytes(renamed[: len(renamed) - 40])  # a writer that truncated and is still writing
+
+    assert store.reload() == 0
+    assert store.get("merchant_002").name == MERCHANTS["merchant_002"].name
+    assert store.source.id_by_phone(MERCHANTS["merchant_002"].phone) == "merchant_002"
+
+    path.write_bytes(renamed)
+
+    assert store.reload() == 1
+    assert store.get("merchant_002").name.startswith("Priyas")
+
+
+def test_watch_reloads_in_the_background(tmp_path):
+    path = tmp_path / "merchants.ndjson"
+    write_ndjson(path, MERCHANTS.values())
+    store = open_store(str(path))
+    store.get("merchant_002")
+    store.watch(0.01)
+    try:
+        time.sleep(0.01)
+        _edit_outside(path, "Priya's Kitchen")
+        deadline = time.monotonic() + 5
+        while store.get("merchant_002").name != "Priya's Kitchen" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert store.get("merchant_002").name == "Priya's Kitchen"
+        assert store.stats()["reloads"] == 1
+    finally:
+        store.close()
+
+
+@pytest.mark.parametrize("suffix", [".ndjson", ".db"])
+def test_a_new_store_file_starts_empty(tmp_path, suffix):
+    store = open_store(str(tmp_path / f"merchants{suffix}"))
+
+    assert store.get("merchant_001") is None
+    assert len(store) == 0
+    store.put(MERCHANTS["merchant_001"])
+    assert open_store(str(tmp_path / f"merchants{suffix}")).get("merchant_001").name == "Amit's Cake Shop"
+
+
+@pytest.mark.asyncio
+async def test_async_gets_load_off_the_event_loop(store, monkeypatch):
+    loop_thread = threading.get_ident()
+    load = store.source.load
+    threads = []
+
+    def tracking_load(merchant_id):
+        threads.append(threading.get_ident())
+        return load(merchant_id)
+
+    monkeypatch.setattr(store.source, "load", tracking_load)
+    merchant = await store.aget("merchant_001")
+    assert await store.aget("merchant_001") is merchant  # resident: no second load
+    assert (await store.aget_by_phone(merchant.phone)) is merchant
+    assert await store.aget("ghost") is None
+
+    assert len(threads) == 2 and loop_thread not in threads
@@ -0,0 +1,77 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import routes.chat as chat_route
+import services.lyzr as lyzr_service
+from main import app as main_app
+from services.cache import SingleFlightCache
+from services.metrics import ChatMetrics, Histogram
+
+
+def test_histogram_renders_cumulative_buckets():
+    h = Histogram("req_seconds", "Request time.", ("merchant",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        h.observe(("m\"1",), value)
+
+    assert h.render() == [
+        "# HELP req_seconds Request time.",
+        "# TYPE req_seconds histogram",
+        'req_seconds_bucket{merchant="m\\"1",le="0.1"} 2',
+        'req_seconds_bucket{merchant="m\\"1",le="1.0"} 3',
+        'req_seconds_bucket{merchant="m\\"1",le="+Inf"} 4',
+        'req_seconds_sum{merchant="m\\"1"} 3.65',
+        'req_seconds_count{merchant="m\\"1"} 4',
+    ]
+
+
+def test_merchants_past_the_cap_share_one_label():
+    metrics = ChatMetrics(max_merchants=2)
+    for merchant_id in ("a", "b", "c", "d"):
+        metrics.record(merchant_id, "agent", 0.2, None, (0.001, 0.0, 0.002, 0.0, 0.15))
+
+    merchants = {labels[0] for labels in metrics.requests._series}
+    assert merchants == {"a", "b", "_other"}
+    assert 'comverse_chat_request_seconds_count{merchant="_other",source="agent"} 2' in metrics.render()
+
+
+def test_every_nth_request_is_traced():
+    metrics = ChatMetrics(trace_every=2, traces_kept=1)
+    for n in range(5):
+        metrics.record("m", "agent", 0.3, (0.01, "cached"), (0.001, 0.002, 0.003, 0.004, 0.2), f"m:{n}")
+
+    assert len(metrics.traces) == 1
+    trace = metrics.traces[0]
+    assert trace["session_id"] == "m:3"
+    assert [s["stage"] for s in trace["spans"]] == [
+        "agent_resolve:cached", "merchant_lookup", "session_wait", "context", "queue_wait", "agent",
+    ]
+    assert trace["spans"][2]["start_ms"] == 11.0
+    assert trace["unaccounted_ms"] == 80.0
+
+
+def test_chat_records_stages_by_merchant(monkeypatch, mock_agent):
+    monkeypatch.setattr(lyzr_service, "init_lyzr", lambda api_key, agent_id: mock_agent)
+    app = FastAPI()
+    app.include_router(chat_route.router)
+    app.state.agents_cache = SingleFlightCache(max_size=4)
+    client = TestClient(app)
+    headers = {"X-Lyzr-Api-Key": "key-1", "X-Lyzr-Agent-Id": "agent-1"}
+    body = {"merchant_id": "merchant_001", "sender": "+919876543210", "message": "Hi"}
+
+    for _ in range(2):
+        assert client.post("/chat", json=body, headers=headers).status_code == 200
+
+    metrics = chat_route.chat_metrics_for(app)
+    text = metrics.render()
+    assert 'comverse_agent_resolve_seconds_count{merchant="merchant_001",outcome="loaded"} 1' in text
+    assert 'comverse_agent_resolve_seconds_count{merchant="merchant_001",outcome="cached"} 1' in text
+    for stage in ChatMetrics.STAGES:
+        assert f'comverse_chat_stage_seconds_count{{merchant="merchant_001",stage="{stage}"}} 2' in text
+    assert 'comverse_chat_request_seconds_count{merchant="merchant_001",source="agent"} 2' in text
+
+
+def test_metrics_endpoint_serves_prometheus_text():
+    with TestClient(main_app) as client:
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert client.get("/debug/traces").json() == []
@@ -1,6 +1,9 @@
+import gc
+import weakref
 import pytest
 from pydantic import ValidationError
 from models.chat import ChatRequest, ChatResponse
+from models.merchant import CatalogItem, Merchant, OperatingHours
 
 
 def test_chat_request_valid():
@@ -19,3 +22,111 @@ def test_chat_response_valid():
     resp = ChatResponse(session_id="merchant_001:+919876543210", reply="Hello!")
     assert resp.session_id == "merchant_001:+919876543210"
     assert resp.reply == "Hello!"
+
+
+def _merchant():
+    return Merchant(
+        id="merchant_test",
+        catalog_id="cat_test",
+        name="Test Bakery",
+        emoji="🧁",
+        phone="+910000000000",
+        delivery_area="Pune",
+        min_order_inr=200,
+        commission_pct=10.0,
+        operating_hours=OperatingHours(open_time="09:00", close_time="21:00", order_cutoff=None, days=["Mon"]),
+        catalog=[
+            CatalogItem(
+                id="cup_001", retailer_id="cup_001", name="Cupcake", description="Vanilla cupcake",
+                price_inr=80, image_url=None, category="cake", is_available=True,
+            ),
+            CatalogItem(
+                id="brw_001", retailer_id="brw_001", name="Brownie", description="Fudge brownie",
+                price_inr=120, image_url=None, category="cake", is_available=True,
+            ),
+        ],
+    )
+
+
+def test_catalog_summary_is_memoized():
+    merchant = _merchant()
+
+    first = merchant.catalog_summary
+    assert merchant.catalog_summary is first
+    assert merchant.summary_builds == 1
+
+
+def test_catalog_summary_rebuilds_on_availability_change():
+    merchant = _merchant()
+    version = merchant.catalog_version
+    assert "Brownie" in merchant.catalog_summary
+
+    merchant.catalog[1].is_available = False
+
+    assert merchant.catalog_version > version
+    assert "Brownie" not in merchant.catalog_summary
+    assert merchant.summary_builds == 2
+
+
+def test_catalog_summary_rebuilds_on_price_change():
+    merchant = _merchant()
+    merchant.catalog_summary
+
+    merchant.catalog[0].price_inr = 90
+
+    assert "Cupcake (₹90)" in merchant.catalog_summary
+
+
+def test_unrelated_item_field_keeps_cache():
+    merchant = _merchant()
+    merchant.catalog_summary
+
+    merchant.catalog[0].description = "Now with sprinkles"
+    merchant.catalog_summary
+
+    assert merchant.summary_builds == 1
+
+
+def test_replacing_catalog_invalidates_and_detaches_old_items():
+    merchant = _merchant()
+    old_items = merchant.catalog
+    merchant.catalog_summary
+
+    merchant.catalog = old_items[:1]
+    assert "Brownie" not in merchant.catalog_summary
+
+    version = merchant.catalog_version
+    old_items[1].price_inr = 1   # no longer part of this merchant's catalog
+    assert merchant.catalog_version == version
+
+
+def test_deep_copy_has_independent_summary():
+    merchant = _merchant()
+    merchant.catalog_summary
+
+    copy = merchant.model_copy(deep=True)
+    copy.catalog[0].price_inr = 10
+
+    assert "Cupcake (₹10)" in copy.catalog_summary
+    assert "Cupcake (₹80)" in merchant.catalog_summary
+
+
+def test_equality_ignores_version_bookkeeping():
+    merchant = _merchant()
+    merchant.catalog_summary
+    item = merchant.catalog[0]
+
+    assert item == item.model_copy()
+    assert merchant == merchant.model_copy(deep=True)
+    assert merchant == merchant.revise()
+    assert merchant != merchant.revise(min_order_inr=250)
+
+
+def test_items_do_not_keep_old_revisions_alive():
+    merchant = _merchant()
+    old = weakref.ref(merchant.revise(name="Old Name"))
+    gc.collect()
+
+    assert old() is None
+    merchant.catalog[0].price_inr = 90  # dead owners are skipped
+    assert "Cupcake (₹90)" in merchant.catalog_summary
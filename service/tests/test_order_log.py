@@ -0,0 +1,151 @@
+from datetime import datetime
+import pytest
+from models.order import OrderItem, OrderStatus, PaymentStatus
+from services.order_log import OrderLog, OrderStore
+from services.orders import IST, NotDurable
+
+
+def _items(qty=2, price=500):
+    return [OrderItem(catalog_item_id="cake_choc_001", name="Chocolate Cake",
+                      quantity=qty, unit_price_inr=price, total_price_inr=qty * price)]
+
+
+class Clock:
+    def __init__(self, when):
+        self.when = when
+
+    def __call__(self):
+        return self.when
+
+
+def _store(path, clock, **kwargs):
+    return OrderStore(path, now=clock, fsync=False, commit_interval_ms=0, **kwargs)
+
+
+def test_log_replays_creates_and_updates(tmp_path):
+    clock = Clock(datetime(2026, 2, 18, 10, 0, tzinfo=IST))
+    store = _store(tmp_path, clock)
+    a, _ = store.engine.create("merchant_001", "+919800000001", _items(), "m1")
+    b, _ = store.engine.create("merchant_001", "+919800000002", _items(), "m2")
+    store.engine.transition(a.id, OrderStatus.confirmed)
+    store.engine.set_payment(a.id, PaymentStatus.link_sent, "https://rzp.io/x")
+    store.close()
+
+    restored = _store(tmp_path, clock)
+    assert restored.replayed == 4
+    order = restored.engine.get(a.id)
+    assert order.status == OrderStatus.confirmed
+    assert order.payment_status == PaymentStatus.link_sent
+    assert order.payment_link == "https://rzp.io/x"
+    assert [o.id for o in restored.engine.for_merchant("merchant_001")] == [b.id, a.id]
+
+    c, _ = restored.engine.create("merchant_001", "+919800000001", _items(), "m3")
+    assert c.id == "ord_20260218_merchant001_003"
+    restored.close()
+
+
+def test_idempotency_survives_restart(tmp_path):
+    clock = Clock(datetime(2026, 2, 18, 10, 0, tzinfo=IST))
+    store = _store(tmp_path, clock)
+    first, _ = store.engine.create("merchant_001", "+919800000001", _items(), "wamid.1")
+    store.compact()
+    store.close()
+
+    restored = _store(tmp_path, clock)
+    again, created = restored.engine.create("merchant_001", "+919800000001", _items(), "wamid.1")
+    assert not created and again.id == first.id
+    restored.close()
+
+
+def test_snapshot_plus_tail(tmp_path):
+    clock = Clock(datetime(2026, 2, 18, 10, 0, tzinfo=IST))
+    store = _store(tmp_path, clock)
+    ids = [store.engine.create("merchant_001", f"+9198000000{n:02d}", _items(), f"m{n}")[0].id for n in range(5)]
+    for order_id in ids[:3]:
+        store.engine.transition(order_id, OrderStatus.cancelled)
+    store.compact()
+    assert store.stats()["segments"] == 1  # everything before the snapshot pruned
+    store.engine.transition(ids[3], OrderStatus.confirmed)
+    later, _ = store.engine.create("merchant_002", "+919800000001", _items(), "x")
+    store.close()
+
+    restored = _store(tmp_path, clock)
+    engine = restored.engine
+    assert restored.snapshot.seq == 8 and restored.replayed == 2
+    assert len(engine) == 6
+    assert [o.id for o in engine.with_status("merchant_001", OrderStatus.cancelled)] == ids[:3]
+    assert [o.id for o in engine.with_status("merchant_001", OrderStatus.confirmed)] == [ids[3]]
+    assert engine.open_counts("merchant_001") == {
+        "pending": 1, "confirmed": 1, "preparing": 0, "out_for_delivery": 0,
+    }
+    assert [o.id for o in engine.for_customer("+919800000001")] == [later.id, ids[1]]
+    assert engine.get("ord_20260218_merchant001_009") is None
+
+    # A second compaction copies untouched buckets and merges changed ones
+    engine.transition(ids[4], OrderStatus.cancelled)
+    restored.compact()
+    assert restored.engine.stats()["in_memory"] == 2  # only the open orders
+    restored.close()
+    final = _store(tmp_path, clock)
+    assert final.replayed == 0
+    assert [o.status for o in final.engine.for_merchant("merchant_001")] == [
+        OrderStatus.cancelled, OrderStatus.confirmed,
+        OrderStatus.cancelled, OrderStatus.cancelled, OrderStatus.cancelled,
+    ]
+    final.close()
+
+
+def test_torn_last_line_is_dropped(tmp_path):
+    clock = Clock(datetime(2026, 2, 18, 10, 0, tzinfo=IST))
+    store = _store(tmp_path, clock)
+    store.engine.create("merchant_001", "+919800000001", _items(), "m1")
+    store.close()
+    segment = sorted(tmp_path.glob("wal.*.ndjson"))[-1]
+    with segment.open("ab") as f:
+        f.write(b'{"seq":2,"op":"create","key":"merch')
+
+    restored = _store(tmp_path, clock)
+    assert restored.replayed == 1 and len(restored.engine) == 1
+    order, _ = restored.engine.create("merchant_001", "+919800000001", _items(), "m2")
+    assert order.id == "ord_20260218_merchant001_002"
+    restored.close()
+    assert _store(tmp_path, clock).replayed == 2
+
+
+def test_group_commit_and_wait_durable(tmp_path):
+    log = OrderLog(tmp_path, commit_interval_ms=5, fsync=False)
+    seqs = [log.append({"op": "noop", "n": n}) for n in range(100)]
+    assert log.wait_durable(timeout=2)
+    assert log.durable == seqs[-1] == 100
+    assert log.commits < 10  # appended in a burst, committed together
+    log.close()
+    assert [seq for seq, _ in OrderLog(tmp_path).read_tail(95)] == [96, 97, 98, 99, 100]
+
+
+def test_create_returns_only_once_the_order_is_on_disk(tmp_path):
+    clock = Clock(datetime(2026, 2, 18, 10, 0, tzinfo=IST))
+    store = OrderStore(tmp_path, now=clock, fsync=False, commit_interval_ms=20)
+
+    order, _ = store.engine.create("merchant_001", "+919800000001", _items(), "m1")
+    confirmed = store.engine.transition(order.id, OrderStatus.confirmed)
+
+    assert store.log.durable == store.log.last_seq == 2
+    # What a crash right now would leave behind: the log as written, no close()
+    events = [event for _, event in store.log.read_tail()]
+    assert [e["op"] for e in events] == ["create", "update"]
+    assert events[0]["order"]["id"] == order.id and confirmed.status == OrderStatus.confirmed
+    store.close()
+
+
+def test_create_fails_when_the_log_is_too_slow_and_the_retry_waits(tmp_path):
+    clock = Clock(datetime(2026, 2, 18, 10, 0, tzinfo=IST))
+    store = OrderStore(tmp_path, now=clock, fsync=False, commit_interval_ms=200, durable_timeout_s=0.01)
+
+    with pytest.raises(NotDurable):
+        store.engine.create("merchant_001", "+919800000001", _items(), "m1")
+
+    store.durable_timeout_s = 5.0
+    order, created = store.engine.create("merchant_001", "+919800000001", _items(), "m1")
+    assert not created
+    assert store.log.durable >= 1
+    store.close()
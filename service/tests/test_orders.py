@@ -0,0 +1,200 @@
+import threading
+from datetime import date, datetime
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import routes.orders as order_routes
+from config import settings
+from models.order import OrderItem, OrderStatus, PaymentStatus
+from routes.orders import order_engine_for, router
+from services.orders import IST, InvalidTransition, OrderEngine, OrderNotFound
+
+
+def _items(qty=2, price=500):
+    return [OrderItem(catalog_item_id="cake_choc_001", name="Chocolate Cake",
+                      quantity=qty, unit_price_inr=price, total_price_inr=qty * price)]
+
+
+class Clock:
+    def __init__(self, when):
+        self.when = when
+
+    def __call__(self):
+        return self.when
+
+
+def test_ids_follow_daily_per_merchant_sequence():
+    clock = Clock(datetime(2026, 2, 18, 10, 0, tzinfo=IST))
+    engine = OrderEngine(now=clock)
+
+    a, _ = engine.create("merchant_001", "+919800000001", _items(), "m1")
+    b, _ = engine.create("merchant_001", "+919800000002", _items(), "m1")
+    c, _ = engine.create("merchant_002", "+919800000001", _items(), "m2")
+    clock.when = datetime(2026, 2, 19, 0, 5, tzinfo=IST)
+    d, _ = engine.create("merchant_001", "+919800000001", _items(), "m3")
+
+    assert [a.id, b.id, c.id, d.id] == [
+        "ord_20260218_merchant001_001",
+        "ord_20260218_merchant001_002",
+        "ord_20260218_merchant002_001",
+        "ord_20260219_merchant001_001",
+    ]
+    assert a.session_id == "merchant_001:+919800000001"
+    assert a.subtotal_inr == 1000
+
+
+def test_create_is_idempotent_per_session_message():
+    engine = OrderEngine()
+
+    first, created = engine.create("merchant_001", "+919800000001", _items(), "wamid.1")
+    again, created_again = engine.create("merchant_001", "+919800000001", _items(qty=5), "wamid.1")
+
+    assert created and not created_again
+    assert again is first
+    assert len(engine) == 1
+
+
+def test_rejects_inconsistent_lines():
+    engine = OrderEngine()
+    bad = [OrderItem(catalog_item_id="x", name="X", quantity=2, unit_price_inr=100, total_price_inr=150)]
+
+    with pytest.raises(ValueError):
+        engine.create("merchant_001", "+919800000001", bad, "m1")
+    with pytest.raises(ValueError):
+        engine.create("merchant_001", "+919800000001", [], "m1")
+
+
+def test_status_machine():
+    engine = OrderEngine()
+    order, _ = engine.create("merchant_001", "+919800000001", _items(), "m1")
+
+    for status in (OrderStatus.confirmed, OrderStatus.preparing, OrderStatus.out_for_delivery):
+        order = engine.transition(order.id, status)
+    with pytest.raises(InvalidTransition):
+        engine.transition(order.id, OrderStatus.cancelled)
+    engine.transition(order.id, OrderStatus.delivered)
+    with pytest.raises(InvalidTransition):
+        engine.transition(order.id, OrderStatus.pending)
+    with pytest.raises(OrderNotFound):
+        engine.transition("ord_missing", OrderStatus.confirmed)
+    assert engine.get(order.id).status == OrderStatus.delivered
+
+
+def test_payment_transitions():
+    engine = OrderEngine()
+    order, _ = engine.create("merchant_001", "+919800000001", _items(), "m1")
+
+    order = engine.set_payment(order.id, PaymentStatus.link_sent, payment_link="https://rzp.io/l/x")
+    order = engine.set_payment(order.id, PaymentStatus.paid)
+    with pytest.raises(InvalidTransition):
+        engine.set_payment(order.id, PaymentStatus.unpaid)
+    assert order.payment_link == "https://rzp.io/l/x"
+
+
+def test_indexes():
+    clock = Clock(datetime(2026, 2, 18, 10, 0, tzinfo=IST))
+    engine = OrderEngine(now=clock)
+    a, _ = engine.create("merchant_001", "+919800000001", _items(), "m1")
+    b, _ = engine.create("merchant_001", "+919800000002", _items(), "m1")
+    clock.when = datetime(2026, 2, 19, 9, 0, tzinfo=IST)
+    c, _ = engine.create("merchant_001", "+919800000001", _items(), "m2")
+    engine.transition(a.id, OrderStatus.confirmed)
+    engine.transition(b.id, OrderStatus.cancelled)
+
+    assert [o.id for o in engine.for_merchant("merchant_001")] == [c.id, b.id, a.id]
+    assert [o.id for o in engine.for_merchant("merchant_001", date(2026, 2, 18))] == [b.id, a.id]
+    assert [o.id for o in engine.for_customer("+919800000001")] == [c.id, a.id]
+    assert [o.id for o in engine.with_status("merchant_001", OrderStatus.pending)] == [c.id]
+    assert [o.id for o in engine.with_status("merchant_001", OrderStatus.cancelled)] == [b.id]
+    assert engine.open_counts("merchant_001")["confirmed"] == 1
+
+
+def test_reads_during_concurrent_writes():
+    engine = OrderEngine()
+    errors = []
+    done = threading.Event()
+
+    def write():
+        for n in range(2000):
+            order, _ = engine.create("merchant_001", f"+9198{n % 50:08d}", _items(), f"m{n}")
+            engine.transition(order.id, OrderStatus.confirmed)
+        done.set()
+
+    def read():
+        while not done.is_set():
+            try:
+                for order in engine.with_status("merchant_001", OrderStatus.pending):
+                    assert order.status == OrderStatus.pending
+                engine.for_merchant("merchant_001")
+                engine.for_customer("+919800000007")
+            except Exception as exc:  # pragma: no cover - surfaced below
+                errors.append(exc)
+                return
+
+    threads = [threading.Thread(target=write)] + [threading.Thread(target=read) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert engine.open_counts("merchant_001") == {
+        "pending": 0, "confirmed": 2000, "preparing": 0, "out_for_delivery": 0,
+    }
+
+
+def test_index_buckets_grow_in_place_and_reads_skip_released_ids():
+    clock = Clock(datetime(2026, 2, 18, 10, 0, tzinfo=IST))
+    engine = OrderEngine(now=clock)
+    a, _ = engine.create("merchant_001", "+919800000001", _items(), "m1")
+    bucket = engine._by_merchant_day[("merchant_001", date(2026, 2, 18))]
+    b, _ = engine.create("merchant_001", "+919800000001", _items(), "m2")
+    assert engine._by_merchant_day[("merchant_001", date(2026, 2, 18))] is bucket  # appended, not copied
+
+    del engine._orders[a.id]  # a concurrent adopt released it before the reader's bucket was rebuilt
+
+    assert [o.id for o in engine.for_merchant("merchant_001")] == [b.id]
+    assert [o.id for o in engine.for_customer("+919800000001")] == [b.id]
+    assert [o.id for o in engine.with_status("merchant_001", OrderStatus.pending)] == [b.id]
+
+
+def test_dashboard_route():
+    app = FastAPI()
+    app.include_router(router)
+    engine = app.state.order_engine = OrderEngine()
+    a, _ = engine.create("merchant_001", "+919800000001", _items(), "m1")
+    engine.create("merchant_001", "+919800000002", _items(), "m1")
+    engine.transition(a.id, OrderStatus.confirmed)
+    client = TestClient(app)
+
+    listed = client.get("/merchants/merchant_001/orders").json()
+    confirmed = client.get("/merchants/merchant_001/orders", params={"status": "confirmed"}).json()
+
+    assert len(listed) == 2
+    assert [o["id"] for o in confirmed] == [a.id]
+    assert client.get(f"/orders/{a.id}").json()["status"] == "confirmed"
+    assert client.get("/orders/ord_nope").status_code == 404
+
+
+def test_concurrent_first_requests_open_one_order_store(monkeypatch, tmp_path):
+    opened = []
+    real = order_routes.OrderStore
+
+    def slow_store(*args, **kwargs):
+        opened.append(args[0])
+        threading.Event().wait(0.05)  # replaying the log takes a while
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(settings, "order_log_dir", str(tmp_path))
+    monkeypatch.setattr(order_routes, "OrderStore", slow_store)
+    app = FastAPI()
+    engines = []
+    threads = [threading.Thread(target=lambda: engines.append(order_engine_for(app))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    app.state.order_store.close()
+
+    assert opened == [str(tmp_path)]
+    assert len({id(e) for e in engines}) == 1
@@ -0,0 +1,155 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from unittest.mock import MagicMock
+from mocks.merchants import get_merchant
+from services.coalescer import BurstCoalescer
+from services.concurrency import InflightLimiter
+from services.context import CatalogContextTracker
+from services.fastpath import FastPath
+from services.mailbox import SessionScheduler
+from services.pipeline import ChatPipeline
+
+
+class SlowAgent:
+    """Replies echo the message; the first call is slow to expose reordering."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def arun(self, message, session_id):
+        self.calls += 1
+        await asyncio.sleep(0.03 if self.calls == 1 else 0)
+        response = MagicMock()
+        response.response = message.splitlines()[-1]
+        return response
+
+
+def _pipeline():
+    return ChatPipeline(
+        limiter=InflightLimiter(max_inflight=8, max_per_tenant=8),
+        scheduler=SessionScheduler(),
+        coalescer=BurstCoalescer(max_wait=1.0),
+        fastpath=FastPath(),
+        context=CatalogContextTracker(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_replies_for_one_session_come_back_in_order():
+    pipeline = _pipeline()
+    merchant = get_merchant("merchant_001")
+    agent = SlowAgent()
+    finished = []
+
+    async def send(text):
+        result = await pipeline.process(merchant, "+919876543210", text, agent)
+        finished.append(result.reply)
+
+    await asyncio.gather(send("hi"), send("1 choco cake"), send("kal ke liye"))
+
+    assert finished == ["hi", "1 choco cake", "kal ke liye"]
+
+
+@pytest.mark.asyncio
+async def test_result_reports_session_wait():
+    pipeline = _pipeline()
+    merchant = get_merchant("merchant_001")
+    agent = SlowAgent()
+
+    first, second = await asyncio.gather(
+        pipeline.process(merchant, "+919876543210", "hi", agent),
+        pipeline.process(merchant, "+919876543210", "menu", agent),
+    )
+
+    assert second.session_wait >= first.upstream * 0.5
+
+
+@pytest.mark.asyncio
+async def test_burst_is_merged_into_one_agent_call():
+    pipeline = _pipeline()
+    merchant = get_merchant("merchant_001").model_copy(update={"coalesce_window_ms": 30})
+    agent = MagicMock()
+    agent.run.return_value.response = "Done!"
+
+    async def send(text, delay):
+        await asyncio.sleep(delay)
+        return await pipeline.process(merchant, "+919876543210", text, agent)
+
+    results = await asyncio.gather(send("hi", 0), send("1 choco cake", 0.01), send("kal ke liye", 0.02))
+
+    agent.run.assert_called_once()
+    prompt = agent.run.call_args.args[0]
+    assert prompt.endswith("hi\n1 choco cake\nkal ke liye")
+    assert [r.coalesced for r in results] == [False, True, True]
+    assert {r.reply for r in results} == {"Done!"}
+    assert pipeline.coalescer.stats()["agent_calls_saved"] == 2
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_heartbeats_while_agent_is_silent():
+    pipeline = _pipeline()
+    merchant = get_merchant("merchant_001")
+
+    class QuietAgent:
+        async def arun(self, message, session_id, stream=False):
+            await asyncio.sleep(0.05)
+            return SimpleNamespace(response="Ho gaya!")  # no stream support upstream
+
+    events = [e async for e in pipeline.stream(merchant, "+91", "Show me your cakes", QuietAgent(), heartbeat=0.01)]
+
+    thinking = [e for e in events if e == ("status", {"stage": "thinking"})]
+    assert len(thinking) >= 2
+    assert events[-1] == ("done", {"session_id": "merchant_001:+91", "reply": "Ho gaya!", "source": "agent"})
+
+
+@pytest.mark.asyncio
+async def test_stream_reports_agent_errors():
+    pipeline = _pipeline()
+    agent = MagicMock()
+    agent.run.side_effect = RuntimeError("lyzr down")
+
+    events = [e async for e in pipeline.stream(get_merchant("merchant_001"), "+91", "Show me your cakes", agent)]
+
+    assert events[-1][0] == "error"
+
+
+@pytest.mark.asyncio
+async def test_catalog_context_is_sent_once_per_session():
+    pipeline = _pipeline()
+    merchant = get_merchant("merchant_001")
+    agent = MagicMock()
+    prompts = []
+
+    async def arun(message, session_id):
+        prompts.append(message)
+        return SimpleNamespace(response="ok")
+
+    agent.arun = arun
+    await pipeline.process(merchant, "+919800000050", "Show me your cakes", agent)
+    await pipeline.process(merchant, "+919800000050", "2 of them please", agent)
+
+    assert prompts[0].startswith("[Merchant: ")
+    assert prompts[1] == "2 of them please"
+    assert pipeline.stats()["context"]["bytes_saved"] > 0
+
+
+@pytest.mark.asyncio
+async def test_cart_state_rides_along_with_each_turn():
+    pipeline = _pipeline()
+    merchant = get_merchant("merchant_001")
+    agent = MagicMock()
+    prompts = []
+
+    async def arun(message, session_id):
+        prompts.append(message)
+        return SimpleNamespace(response="ok")
+
+    agent.arun = arun
+    pipeline.carts.add(merchant, "merchant_001:+919800000051", "cake_choc_001", 2)
+    await pipeline.process(merchant, "+919800000051", "Show me your cakes", agent)
+    await pipeline.process(merchant, "+919800000051", "checkout karo", agent)
+
+    assert prompts[0].startswith("[Merchant: ")
+    assert prompts[0].endswith("\n[Cart: 2× Chocolate Cake ₹1000 | Subtotal ₹1000 | Min order ₹300 met]\nShow me your cakes")
+    assert prompts[1] == "[Cart: 2× Chocolate Cake ₹1000 | Subtotal ₹1000 | Min order ₹300 met]\ncheckout karo"
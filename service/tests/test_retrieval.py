@@ -0,0 +1,85 @@
+from mocks.catalogs import large_cafe
+from mocks.merchants import get_merchant
+from services.context import CatalogContextTracker
+from services.retrieval import CatalogRetriever
+from services.search import CatalogSearch
+
+
+def test_ranks_items_matching_the_message_first():
+    retriever = CatalogRetriever(top_k=5)
+    items = retriever.rank(large_cafe(), "cold brew milega?")
+
+    assert len(items) == 5
+    assert all("Cold Brew" in i.name for i in items)
+
+
+def test_prefixes_and_session_history_steer_ranking():
+    retriever = CatalogRetriever(top_k=3)
+    merchant = large_cafe()
+
+    assert all("Brownie" in i.name for i in retriever.rank(merchant, "brown"))
+    followup = retriever.rank(merchant, "large wala", history=("cheesecake hai?",))
+    assert all("Cheesecake (Large)" in i.name for i in followup)
+
+
+def test_no_match_offers_one_item_per_category():
+    items = CatalogRetriever().rank(large_cafe(), "hello")
+
+    assert len({i.category for i in items}) == len(items) == 8
+
+
+def test_summary_respects_byte_budget():
+    retriever = CatalogRetriever(top_k=50, budget_bytes=600)
+    merchant = large_cafe()
+
+    summary, shown = retriever.summary(merchant, retriever.rank(merchant, "pizza"))
+
+    assert len(summary.encode()) <= 600
+    assert "Categories: " in summary and "Hours: 08:00–23:00." in summary
+    assert 0 < len(shown) < 50
+
+
+def test_small_catalogs_are_left_alone():
+    retriever = CatalogRetriever()
+
+    assert not retriever.applies(get_merchant("merchant_001"))
+    assert retriever.applies(large_cafe())
+
+
+def test_outline_rebuilt_only_on_catalog_change():
+    retriever = CatalogRetriever()
+    merchant = large_cafe()
+    retriever.summary(merchant, retriever.rank(merchant, "latte"))
+    retriever.summary(merchant, retriever.rank(merchant, "mocha"))
+    merchant.catalog[0].price_inr += 10
+    retriever.summary(merchant, retriever.rank(merchant, "latte"))
+
+    assert retriever.stats()["outline_builds"] == 2
+
+
+def test_tracker_sends_relevant_slice_then_new_matches():
+    tracker = CatalogContextTracker(retriever=CatalogRetriever(top_k=4))
+    merchant = large_cafe()
+
+    first = tracker.prepare(merchant, "s1", "pizza hai?")
+    tracker.record(first)
+    second = tracker.prepare(merchant, "s1", "aur tiramisu?")
+    tracker.record(second)
+
+    assert first.kind == "full" and "Pizza" in first.prompt and "Tiramisu" not in first.prompt
+    assert first.context_bytes < first.full_bytes / 10
+    assert second.kind == "diff"
+    assert second.prompt.startswith("[Catalog update: Relevant items: dessert: ")
+    assert "Tiramisu" in second.prompt and "Pizza" not in second.prompt
+
+
+def test_ranks_with_the_fastpath_search():
+    search = CatalogSearch()
+    retriever = CatalogRetriever(top_k=3, search=search)
+    merchant = large_cafe()
+
+    ranked = retriever.rank(merchant, "chocolate brownie")
+    assert ranked and all("Brownie" in i.name for i in ranked)
+    # Hinglish spellings fold the same way the fast path folds them
+    assert retriever.rank(merchant, "chokolate brownies") == ranked
+    assert search.stats()["indexed_merchants"] == 1
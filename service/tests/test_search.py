@@ -0,0 +1,64 @@
+import pytest
+from mocks.catalogs import large_cafe
+from mocks.merchants import get_merchant
+from services.search import CatalogSearch, ItemSearchIndex, fold
+
+
+def _top(merchant_id, query):
+    hits = CatalogSearch().search(get_merchant(merchant_id), query, limit=1)
+    return hits[0].item.id if hits else None
+
+
+@pytest.mark.parametrize("merchant_id,query,item_id", [
+    ("merchant_001", "choco cake", "cake_choc_001"),
+    ("merchant_001", "red velvet wala", "cake_rv_001"),
+    ("merchant_001", "vanila", "cake_van_001"),
+    ("merchant_001", "chocolate cakes", "cake_choc_001"),
+    ("merchant_002", "nonveg thali", "thali_nveg_001"),
+    ("merchant_002", "non veg", "thali_nveg_001"),
+    ("merchant_002", "veg thaali", "thali_veg_001"),
+    ("merchant_001", "kitne ka hai?", None),
+])
+def test_hinglish_queries(merchant_id, query, item_id):
+    assert _top(merchant_id, query) == item_id
+
+
+def test_spelling_variants_fold_together():
+    assert fold("paneer") == fold("panir")
+    assert fold("biryani") == fold("biriyani")
+    assert fold("wala") == fold("vala")
+
+
+def test_unavailable_items_only_when_asked():
+    merchant = get_merchant("merchant_001").model_copy(deep=True)
+    merchant.catalog[2].is_available = False
+    search = CatalogSearch()
+
+    assert all(h.item.id != "cake_rv_001" for h in search.search(merchant, "red velvet"))
+    assert search.search(merchant, "red velvet", available_only=False)[0].item.id == "cake_rv_001"
+
+
+def test_sync_updates_only_changed_items():
+    merchant = large_cafe(400)
+    index = ItemSearchIndex()
+
+    assert index.sync(merchant) == 400
+    assert index.sync(merchant) == 0
+
+    merchant.catalog[0].name = "Hazelnut Frappe"
+    merchant.catalog[1].price_inr += 10  # price isn't searchable — re-indexed as unchanged
+    del merchant.catalog[5]
+    merchant.bump_catalog_version()
+
+    assert index.sync(merchant) == 2
+    assert index.search("hazelnut frape")[0].item.name == "Hazelnut Frappe"
+    assert len(index) == 399
+
+
+def test_large_catalog_search():
+    index = ItemSearchIndex()
+    index.sync(large_cafe(2000))
+
+    hits = index.search("vegan mocha large", limit=3)
+
+    assert [h.item.name for h in hits][0] == "Vegan Mocha (Large)"
@@ -0,0 +1,69 @@
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+
+HEADERS = {"X-Lyzr-Api-Key": "key-1", "X-Lyzr-Agent-Id": "agent-1"}
+
+
+@pytest.fixture
+def lyzr_calls():
+    calls = []
+    status = {"code": 200}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(status["code"], json={})
+
+    app.state.http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    yield calls, status
+    del app.state.http
+    if hasattr(app.state, "validation_cache"):
+        del app.state.validation_cache
+
+
+def test_valid_key(lyzr_calls):
+    calls, _ = lyzr_calls
+    response = TestClient(app).get("/validate", headers=HEADERS)
+
+    assert response.status_code == 200
+    assert response.json() == {"valid": True}
+    assert calls[0].url.path == "/v3/agents/agent-1"
+    assert calls[0].headers["x-api-key"] == "key-1"
+
+
+def test_repeated_validation_is_served_from_cache(lyzr_calls):
+    calls, _ = lyzr_calls
+    client = TestClient(app)
+
+    for _ in range(3):
+        assert client.get("/validate", headers=HEADERS).status_code == 200
+
+    assert len(calls) == 1
+
+
+def test_invalid_key_is_cached_too(lyzr_calls):
+    calls, status = lyzr_calls
+    status["code"] = 401
+    client = TestClient(app)
+
+    assert client.get("/validate", headers=HEADERS).status_code == 401
+    assert client.get("/validate", headers=HEADERS).status_code == 401
+    assert len(calls) == 1
+
+
+def test_upstream_errors_are_not_cached(lyzr_calls):
+    calls, status = lyzr_calls
+    status["code"] = 502
+    client = TestClient(app)
+
+    assert client.get("/validate", headers=HEADERS).status_code == 502
+    status["code"] = 200
+    assert client.get("/validate", headers=HEADERS).status_code == 200
+    assert len(calls) == 2
+
+
+def test_missing_headers():
+    client = TestClient(app)
+    assert client.get("/validate").status_code == 400
+    assert client.get("/validate", headers={"X-Lyzr-Api-Key": "k"}).status_code == 400
@@ -0,0 +1,160 @@
+import hashlib
+import hmac
+import json
+import time
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import routes.webhook as webhook_routes
+from config import settings
+from mocks.merchants import MERCHANTS
+from routes.webhook import router, verify_signature
+from services.lyzr import AgentHandlePool
+from services.merchant_store import open_store, write_ndjson
+
+
+def _payload(*texts, business="911234567890", sender="919876543210"):
+    return {
+        "object": "whatsapp_business_account",
+        "entry": [{
+            "id": "waba_1",
+            "changes": [{
+                "field": "messages",
+                "value": {
+                    "messaging_product": "whatsapp",
+                    "metadata": {"display_phone_number": business, "phone_number_id": "pn_1"},
+                    "messages": [
+                        {"from": sender, "id": f"wamid.{i}", "timestamp": "1700000000",
+                         "type": "text", "text": {"body": text}}
+                        for i, text in enumerate(texts)
+                    ],
+                },
+            }],
+        }],
+    }
+
+
+@pytest.fixture
+def webhook_app(mock_agent, monkeypatch):
+    monkeypatch.setattr(settings, "whatsapp_verify_token", "verify-me")
+    monkeypatch.setattr(settings, "whatsapp_app_secret", "")
+    app = FastAPI()
+    app.include_router(router)
+
+    async def no_new_handles():
+        raise AssertionError("single handle is enough")
+
+    app.state.agent_pool = AgentHandlePool(no_new_handles, size=1, first=mock_agent)
+    return app
+
+
+def _wait_for_processed(app, count, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if app.state.webhook_queue.stats()["processed"] >= count:
+            return
+        time.sleep(0.01)
+    raise AssertionError(f"webhook queue did not process {count} messages")
+
+
+def test_get_verification_echoes_challenge(webhook_app):
+    client = TestClient(webhook_app)
+    response = client.get("/webhook", params={
+        "hub.mode": "subscribe", "hub.verify_token": "verify-me", "hub.challenge": "12345",
+    })
+    assert response.status_code == 200
+    assert response.text == "12345"
+
+
+def test_get_verification_rejects_wrong_token(webhook_app):
+    client = TestClient(webhook_app)
+    response = client.get("/webhook", params={
+        "hub.mode": "subscribe", "hub.verify_token": "nope", "hub.challenge": "12345",
+    })
+    assert response.status_code == 403
+
+
+def test_batch_is_acked_and_processed(webhook_app, mock_agent):
+    with TestClient(webhook_app) as client:
+        response = client.post("/webhook", json=_payload("menu?", "1 choco cake"))
+
+        assert response.status_code == 200
+        assert response.json() == {"received": 2}
+        _wait_for_processed(webhook_app, 2)
+
+    sessions = {kwargs["session_id"] for _, kwargs in mock_agent.run.call_args_list}
+    assert sessions == {"merchant_001:+919876543210"}
+    assert webhook_app.state.webhook_queue.stats()["submitted"] == 2
+
+
+def test_invalid_signature_rejected(webhook_app, monkeypatch):
+    monkeypatch.setattr(settings, "whatsapp_app_secret", "s3cret")
+    client = TestClient(webhook_app)
+    body = json.dumps(_payload("hi")).encode()
+
+    bad = client.post("/webhook", content=body, headers={"X-Hub-Signature-256": "sha256=deadbeef"})
+    assert bad.status_code == 401
+
+    signature = "sha256=" + hmac.new(b"s3cret", body, hashlib.sha256).hexdigest()
+    with TestClient(webhook_app) as client:
+        good = client.post("/webhook", content=body, headers={"X-Hub-Signature-256": signature})
+    assert good.status_code == 200
+
+
+def test_non_text_messages_are_acked_but_skipped(webhook_app):
+    payload = _payload("hi")
+    payload["entry"][0]["changes"][0]["value"]["messages"][0]["type"] = "image"
+    client = TestClient(webhook_app)
+
+    response = client.post("/webhook", json=payload)
+
+    assert response.json() == {"received": 0}
+
+
+def test_malformed_payload_returns_400(webhook_app):
+    client = TestClient(webhook_app)
+    response = client.post("/webhook", content=b"{not json")
+    assert response.status_code == 400
+
+
+def test_verify_signature():
+    body = b'{"object":"whatsapp_business_account"}'
+    digest = hmac.new(b"k", body, hashlib.sha256).hexdigest()
+    assert verify_signature(body, f"sha256={digest}", "k")
+    assert not verify_signature(body, digest, "k")
+    assert not verify_signature(body, None, "k")
+
+
+def test_replies_are_sent_through_whatsapp(webhook_app, monkeypatch):
+    delivered = []
+
+    def cloud_api(request):
+        delivered.append(json.loads(request.content))
+        return httpx.Response(200, json={"messages": [{"id": "wamid.out"}]})
+
+    monkeypatch.setattr(settings, "whatsapp_access_token", "tok")
+    webhook_app.state.http = httpx.AsyncClient(transport=httpx.MockTransport(cloud_api))
+
+    with TestClient(webhook_app) as client:
+        client.post("/webhook", json=_payload("Show me your cakes"))
+        _wait_for_processed(webhook_app, 1)
+        deadline = time.monotonic() + 2
+        while not delivered and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    assert delivered[0]["to"] == "919876543210"
+    assert delivered[0]["text"]["body"] == "Sure! We have Chocolate (₹500) and Vanilla (₹400)."
+
+
+def test_batch_from_one_sender_reaches_the_agent_in_order(webhook_app, mock_agent, monkeypatch, tmp_path):
+    path = tmp_path / "merchants.ndjson"
+    write_ndjson(path, MERCHANTS.values())
+    monkeypatch.setattr(webhook_routes, "get_store", lambda: open_store(str(path)))  # lookups go off the loop
+    texts = [f"message {n}" for n in range(8)]
+
+    with TestClient(webhook_app) as client:
+        assert client.post("/webhook", json=_payload(*texts)).status_code == 200
+        _wait_for_processed(webhook_app, len(texts))
+
+    assert [args[0].rsplit("\n", 1)[-1] for args, _ in mock_agent.run.call_args_list] == texts
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import httpx
+import pytest
+from services.whatsapp import OutboundText, TokenBucket, WhatsAppSender
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _sender(handler, **kwargs):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    options = {"messages_per_second": 1000.0, "backoff_base": 0.001, "backoff_max": 0.002}
+    options.update(kwargs)
+    return WhatsAppSender(client=client, access_token="tok", base_url="http://stub/v23.0", **options)
+
+
+def test_token_bucket_limits_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, clock=clock)
+
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == pytest.approx(0.5)
+
+    clock.now = 0.5
+    assert bucket.try_acquire() == 0
+
+
+@pytest.mark.asyncio
+async def test_send_posts_cloud_api_text_message():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"messages": [{"id": "wamid.out"}]})
+
+    sender = _sender(handler)
+    assert await sender.send(OutboundText("pn_1", "+919876543210", "Namaste!"))
+
+    request = requests[0]
+    assert request.url == "http://stub/v23.0/pn_1/messages"
+    assert request.headers["Authorization"] == "Bearer tok"
+    assert json.loads(request.content) == {
+        "messaging_product": "whatsapp",
+        "recipient_type": "individual",
+        "to": "919876543210",
+        "type": "text",
+        "text": {"body": "Namaste!"},
+    }
+
+
+@pytest.mark.asyncio
+async def test_retryable_errors_are_retried():
+    statuses = iter([429, 503, 200])
+
+    def handler(request):
+        return httpx.Response(next(statuses))
+
+    sender = _sender(handler)
+
+    assert await sender.send(OutboundText("pn_1", "+91", "hi"))
+    assert sender.stats()["retries"] == 2
+    assert sender.stats()["sent"] == 1
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(400, json={"error": {"message": "bad number"}})
+
+    sender = _sender(handler)
+
+    assert not await sender.send(OutboundText("pn_1", "+91", "hi"))
+    assert len(calls) == 1
+    assert sender.stats()["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_retries():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(500)
+
+    sender = _sender(handler, max_retries=2)
+
+    assert not await sender.send(OutboundText("pn_1", "+91", "hi"))
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_outbox_delivers_and_respects_per_number_rate():
+    sent_at = []
+
+    def handler(request):
+        sent_at.append(asyncio.get_running_loop().time())
+        return httpx.Response(200)
+
+    sender = _sender(handler, messages_per_second=50.0, workers=8)
+    sender._buckets["pn_1"] = TokenBucket(rate=50.0, burst=1)
+
+    for i in range(5):
+        sender.enqueue("pn_1", "+91", f"msg {i}")
+    await sender.outbox.join()
+
+    assert sender.stats()["sent"] == 5
+    # One token up front, then 50/s: the 5th send can't start before ~80ms
+    assert sent_at[-1] - sent_at[0] >= 0.07
+    await sender.stop()
+
+
+@pytest.mark.asyncio
+async def test_replies_to_one_customer_stay_in_order_across_retries():
+    delivered, failures = [], {"first": 1}
+
+    def handler(request):
+        body = json.loads(request.content)["text"]["body"]
+        if failures.get(body):
+            failures[body] -= 1
+            return httpx.Response(503)
+        delivered.append((json.loads(request.content)["to"], body))
+        return httpx.Response(200)
+
+    sender = _sender(handler, workers=4)
+    sender.enqueue("pn_1", "+91", "first")
+    sender.enqueue("pn_1", "+91", "second")
+    sender.enqueue("pn_1", "+92", "other customer")
+    await sender.outbox.join()
+
+    assert [b for to, b in delivered if to == "91"] == ["first", "second"]
+    assert ("92", "other customer") in delivered
+    await sender.stop()
+
+
+def test_retry_after_is_capped():
+    sender = _sender(lambda request: httpx.Response(200), retry_after_max=5.0)
+
+    assert sender._backoff(0, "2") == 2.0
+    assert sender._backoff(0, "86400") == 5.0
@@ -0,0 +1,57 @@
+import asyncio
+import pytest
+from services.work_queue import WorkQueue
+
+
+@pytest.mark.asyncio
+async def test_items_are_processed_and_lag_recorded():
+    seen = []
+
+    async def handler(item):
+        seen.append(item)
+
+    queue = WorkQueue(handler, workers=2, max_size=10)
+    queue.submit_many(["a", "b", "c"])
+    await queue.join()
+
+    assert sorted(seen) == ["a", "b", "c"]
+    stats = queue.stats()
+    assert stats["processed"] == 3
+    assert stats["depth"] == 0
+    assert stats["max_lag_s"] >= 0
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_batch_that_does_not_fit_is_rejected_whole():
+    release = asyncio.Event()
+
+    async def handler(item):
+        await release.wait()
+
+    queue = WorkQueue(handler, workers=1, max_size=2)
+    queue.submit_many(["a", "b"])
+    await asyncio.sleep(0)  # worker takes "a"; "b" stays queued
+
+    with pytest.raises(asyncio.QueueFull):
+        queue.submit_many(["c", "d"])
+    assert queue.stats()["depth"] == 1
+
+    release.set()
+    await queue.join()
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_handler_errors_are_counted_not_fatal():
+    async def handler(item):
+        if item == "bad":
+            raise ValueError(item)
+
+    queue = WorkQueue(handler, workers=1, max_size=10)
+    queue.submit_many(["bad", "good"])
+    await queue.join()
+
+    assert queue.stats()["failed"] == 1
+    assert queue.stats()["processed"] == 1
+    await queue.stop()